@@ -1,36 +1,41 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
-from app.db.session import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.session import get_async_db
 from app.models.models import User
 from app.schemas import UserCreate, LoginResponse, LoginRequest
 from app.core.security import (
-    get_password_hash, verify_password, create_access_token, 
-    create_refresh_token, get_refresh_token_user, revoke_refresh_token
+    create_access_token, create_refresh_token, get_refresh_token_user, revoke_refresh_token,
+    rotate_refresh_family, revoke_refresh_family
 )
+from app.core.password_hashing import password_hasher
 
 router = APIRouter()
 
 @router.post("/register", response_model=LoginResponse)
-def register(user: UserCreate, db: Session = Depends(get_db)):
+async def register(user: UserCreate, db: AsyncSession = Depends(get_async_db)):
     # Check if user already exists
-    db_user = db.query(User).filter(User.email == user.email).first()
+    db_user = (await db.execute(select(User).where(User.email == user.email))).scalars().first()
     if db_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
+    # Hand the connection back to the pool while bcrypt runs
+    await db.commit()
     
     # Create new user
-    hashed_password = get_password_hash(user.password)
+    # Hashed on the dedicated password pool, not the shared threadpool
+    hashed_password = await password_hasher.hash(user.password)
     db_user = User(email=user.email, hashed_password=hashed_password)
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
     
     # Generate tokens
-    access_token = create_access_token(data={"sub": db_user.email})
-    refresh_token = create_refresh_token(data={"sub": db_user.email, "user_id": db_user.id}, db=db)
+    access_token = create_access_token(data={"sub": db_user.email, "uid": db_user.id})
+    refresh_token = await create_refresh_token(data={"sub": db_user.email, "user_id": db_user.id}, db=db)
     
     return {
         "id": db_user.id,
@@ -41,19 +46,29 @@ def register(user: UserCreate, db: Session = Depends(get_db)):
     }
 
 @router.post("/login", response_model=LoginResponse)
-def login(login_data: LoginRequest, db: Session = Depends(get_db)):
+async def login(login_data: LoginRequest, db: AsyncSession = Depends(get_async_db)):
     # Authenticate user
-    user = db.query(User).filter(User.email == login_data.email).first()
-    if not user or not verify_password(login_data.password, user.hashed_password):
+    user = (await db.execute(select(User).where(User.email == login_data.email))).scalars().first()
+    # Hand the connection back to the pool while bcrypt runs
+    await db.commit()
+    verified = False
+    if user:
+        verified, new_hash = await password_hasher.verify_and_update(login_data.password, user.hashed_password)
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    if new_hash:
+        # Hashed with a different BCRYPT_ROUNDS: store it at the current cost
+        user.hashed_password = new_hash
+        await db.commit()
+    
     # Generate tokens
-    access_token = create_access_token(data={"sub": user.email})
-    refresh_token = create_refresh_token(data={"sub": user.email, "user_id": user.id}, db=db)
+    access_token = create_access_token(data={"sub": user.email, "uid": user.id})
+    refresh_token = await create_refresh_token(data={"sub": user.email, "user_id": user.id}, db=db)
     
     return {
         "id": user.id,
@@ -64,16 +79,32 @@ def login(login_data: LoginRequest, db: Session = Depends(get_db)):
     }
 
 @router.post("/refresh-token", response_model=LoginResponse)
-def refresh_token(refresh_data = Depends(get_refresh_token_user), db: Session = Depends(get_db)):
+async def refresh_token(refresh_data = Depends(get_refresh_token_user), db: AsyncSession = Depends(get_async_db)):
     user = refresh_data["user"]
     token_jti = refresh_data["token_jti"]
     
-    # Revoke the current refresh token
-    revoke_refresh_token(token_jti, db)
+    token_data = {"sub": user.email, "user_id": user.id}
+    
+    if refresh_data["family_id"] is not None:
+        # Stateless token: move its family on to the next generation
+        refresh_token = await rotate_refresh_family(
+            token_data, refresh_data["family_id"], refresh_data["generation"], db
+        )
+    elif await revoke_refresh_token(token_jti, db):
+        # Revoke the current refresh token; losing the race to a concurrent
+        # refresh (or another process) with the same token means it was replayed
+        refresh_token = await create_refresh_token(data=token_data, db=db)
+    else:
+        refresh_token = None
+    if refresh_token is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate refresh token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     
     # Generate new tokens
-    access_token = create_access_token(data={"sub": user.email})
-    refresh_token = create_refresh_token(data={"sub": user.email, "user_id": user.id}, db=db)
+    access_token = create_access_token(data={"sub": user.email, "uid": user.id})
     
     return {
         "id": user.id,
@@ -84,7 +115,19 @@ def refresh_token(refresh_data = Depends(get_refresh_token_user), db: Session =
     }
 
 @router.post("/logout")
-def logout(refresh_data = Depends(get_refresh_token_user), db: Session = Depends(get_db)):
+async def logout(refresh_data = Depends(get_refresh_token_user), db: AsyncSession = Depends(get_async_db)):
     # Revoke the refresh token
-    revoke_refresh_token(refresh_data["token_jti"], db)
+    if refresh_data["family_id"] is not None:
+        revoked = await revoke_refresh_family(
+            refresh_data["family_id"], refresh_data["generation"],
+            refresh_data["user"].id, refresh_data["expires_at"], db
+        )
+    else:
+        revoked = await revoke_refresh_token(refresh_data["token_jti"], db)
+    if not revoked:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate refresh token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     return {"message": "Successfully logged out"}
@@ -1,88 +1,166 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
-from app.db.session import get_db
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from app.db.session import get_async_db
+from app.db.pagination import MAX_PAGE_SIZE, count_total, keyset_page, next_page
+from app.db.authorization import check_job_owner, get_authorized_candidate, job_owned_by
 from app.models.models import Candidate, Job, User
-from app.schemas import CandidateCreate, CandidateOut, CandidateList
+from app.schemas import CandidateCreate, CandidateOut, CandidateList, CandidateImportResult
 from app.core.security import get_current_user
+from app.api.responses import FastJSONResponse, response_columns, row_dicts, selected_fields, with_key_columns
+from app.services.skill_index import SKILL_LISTING_KEY, skill_filter, skill_matches
+from app.services.candidate_import import (
+    MAX_IMPORT_SIZE, ImportFormatError, import_candidates, import_format, validate_records
+)
 
 router = APIRouter()
 
+# Listings read just the columns CandidateOut needs, as plain rows
+CANDIDATE_COLUMNS = response_columns(Candidate, CandidateOut)
+
 @router.post("/", response_model=CandidateOut)
-def create_candidate(
+async def create_candidate(
     candidate: CandidateCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     # Verify job exists
-    job = db.query(Job).filter(Job.id == candidate.job_id).first()
+    job = await db.get(Job, candidate.job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     
     db_candidate = Candidate(**candidate.dict())
     db.add(db_candidate)
-    db.commit()
-    db.refresh(db_candidate)
+    await db.commit()
+    await db.refresh(db_candidate)
     return db_candidate
 
+@router.post("/import", response_model=CandidateImportResult)
+async def import_candidates_endpoint(
+    request: Request,
+    fmt: Optional[str] = Query(None, alias="format"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Create many candidates from a JSON array, NDJSON or CSV body (chosen by
+    Content-Type, or format=json|ndjson|csv). Each record is validated like
+    POST /candidates/ and must belong to one of your jobs. Valid records are
+    imported even when others fail; failures are listed by input position.
+    """
+    try:
+        fmt = import_format(request.headers.get("content-type"), fmt)
+    except ImportFormatError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    body = bytearray()
+    async for chunk in request.stream():
+        body.extend(chunk)
+        if len(body) > MAX_IMPORT_SIZE:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Import too large. Maximum size is {MAX_IMPORT_SIZE // (1024 * 1024)}MB."
+            )
+    
+    try:
+        rows, errors = await asyncio.to_thread(validate_records, bytes(body), fmt)
+    except ImportFormatError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    candidate_ids = await import_candidates(db, rows, errors, current_user.id)
+    return {
+        "imported": len(candidate_ids),
+        "failed": len(errors),
+        "candidate_ids": candidate_ids,
+        "errors": errors
+    }
+
 @router.get("/", response_model=CandidateList)
-def read_candidates(
-    skip: int = 0,
+async def read_candidates(
     limit: int = 100,
+    cursor: Optional[str] = None,
+    skip: int = 0,
     job_id: int = None,
-    db: Session = Depends(get_db),
+    skill: Optional[str] = None,
+    min_years: Optional[float] = None,
+    min_confidence: Optional[float] = None,
+    exact_total: bool = False,
+    fields: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    query = db.query(Candidate)
+    """
+    Candidates, newest first, paged like GET /jobs/. With skill, only
+    candidates listing that skill (case-insensitive) with at least
+    min_years of experience and min_confidence. fields works like on
+    GET /jobs/.
+    """
+    if skill is None and (min_years is not None or min_confidence is not None):
+        raise HTTPException(status_code=400, detail="min_years and min_confidence need a skill")
+    
+    limit = min(max(limit, 1), MAX_PAGE_SIZE)
+    names = selected_fields(fields, CandidateOut)
+    columns = response_columns(Candidate, CandidateOut, names) if names else CANDIDATE_COLUMNS
+    # Paging needs created_at and id even when they are not asked for
+    query = select(*with_key_columns(columns, Candidate.created_at, Candidate.id))
+    
+    if job_id:
+        query = query.where(Candidate.job_id == job_id)
+    
+    key = None
+    counted = query
+    if skill:
+        query = skill_filter(query, skill, min_years, min_confidence, job_id or None)
+        # One candidate_skills row per matching candidate: count those alone
+        counted = skill_matches(skill, min_years, min_confidence, job_id or None)
+        key = SKILL_LISTING_KEY
     
     if job_id:
-        # Verify user has permission to view candidates for this job
-        job = db.query(Job).filter(Job.id == job_id).first()
-        if not job:
-            raise HTTPException(status_code=404, detail="Job not found")
-        
-        if job.created_by != current_user.id:
-            raise HTTPException(status_code=403, detail="Not authorized to view candidates for this job")
-        
-        query = query.filter(Candidate.job_id == job_id)
+        # Only the job's creator sees its candidates. Checked inside both
+        # queries; the job is only looked up on its own to explain an empty page.
+        owned = job_owned_by(job_id, current_user.id)
+        query = query.where(owned)
+        counted = counted.where(owned)
     
-    total = query.count()
-    candidates = query.offset(skip).limit(limit).all()
+    total, total_exact = await count_total(db, counted, exact_total)
+    page_query = keyset_page(query, Candidate, cursor, limit, key)
+    if skip:
+        page_query = page_query.offset(skip)
+    rows, next_cursor = next_page((await db.execute(page_query)).all(), limit)
+    if job_id and not rows:
+        await check_job_owner(db, job_id, current_user.id, "view")
     
-    return {"candidates": candidates, "total": total}
+    return FastJSONResponse({
+        "candidates": row_dicts(rows, columns),
+        "total": total,
+        "total_exact": total_exact,
+        "next_cursor": next_cursor
+    })
 
 @router.get("/{candidate_id}", response_model=CandidateOut)
-def read_candidate(
+async def read_candidate(
     candidate_id: int,
-    db: Session = Depends(get_db),
+    fields: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    db_candidate = db.query(Candidate).filter(Candidate.id == candidate_id).first()
-    if db_candidate is None:
-        raise HTTPException(status_code=404, detail="Candidate not found")
-    
-    # Check if user has permission to view this candidate
-    job = db.query(Job).filter(Job.id == db_candidate.job_id).first()
-    if job and job.created_by != current_user.id:
-        raise HTTPException(status_code=403, detail="Not authorized to view this candidate")
-    
+    names = selected_fields(fields, CandidateOut)
+    # The candidate and its job's owner in one query
+    db_candidate = await get_authorized_candidate(db, candidate_id, current_user.id, "view", names)
+    if names:
+        return FastJSONResponse({name: getattr(db_candidate, name) for name in names})
     return db_candidate
 
 @router.delete("/{candidate_id}")
-def delete_candidate(
+async def delete_candidate(
     candidate_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    db_candidate = db.query(Candidate).filter(Candidate.id == candidate_id).first()
-    if db_candidate is None:
-        raise HTTPException(status_code=404, detail="Candidate not found")
-    
-    # Check if user has permission to delete this candidate
-    job = db.query(Job).filter(Job.id == db_candidate.job_id).first()
-    if job and job.created_by != current_user.id:
-        raise HTTPException(status_code=403, detail="Not authorized to delete this candidate")
+    db_candidate = await get_authorized_candidate(db, candidate_id, current_user.id, "delete")
     
-    db.delete(db_candidate)
-    db.commit()
+    await db.delete(db_candidate)
+    await db.commit()
     
     return {"message": "Candidate deleted successfully"}
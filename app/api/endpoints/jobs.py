@@ -1,62 +1,104 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-from app.db.session import get_db
+from app.db.session import get_async_db
+from app.db.pagination import MAX_PAGE_SIZE, count_total, keyset_page, next_page
+from app.db.job_search import search_jobs, ranked_page, next_ranked_page
 from app.models.models import Job, User
 from app.schemas import JobCreate, JobOut, JobList
 from app.core.security import get_current_user
+from app.api.responses import FastJSONResponse, response_columns, row_dicts, selected_fields, with_key_columns
 
 router = APIRouter()
 
+# Listings read just the columns JobOut needs, as plain rows
+JOB_COLUMNS = response_columns(Job, JobOut)
+
 @router.post("/", response_model=JobOut)
-def create_job(
+async def create_job(
     job: JobCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     db_job = Job(**job.dict(), created_by=current_user.id)
     db.add(db_job)
-    db.commit()
-    db.refresh(db_job)
+    await db.commit()
+    await db.refresh(db_job)
     return db_job
 
 @router.get("/", response_model=JobList)
-def read_jobs(
-    skip: int = 0,
+async def read_jobs(
     limit: int = 100,
+    cursor: Optional[str] = None,
+    skip: int = 0,
     search: Optional[str] = None,
-    db: Session = Depends(get_db)
+    exact_total: bool = False,
+    fields: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
 ):
-    query = db.query(Job)
+    """
+    Jobs, newest first, or most relevant first when searching. Pass a
+    page's next_cursor as cursor to get the next one; skip still works but
+    reads every skipped row. total is the database's estimate
+    (total_exact=false) unless exact_total is set. fields (comma-separated)
+    limits each job to those fields; the other columns are not read.
+    """
+    limit = min(max(limit, 1), MAX_PAGE_SIZE)
+    names = selected_fields(fields, JobOut)
+    columns = response_columns(Job, JobOut, names) if names else JOB_COLUMNS
+    # Paging needs created_at and id even when they are not asked for
+    query = select(*with_key_columns(columns, Job.created_at, Job.id))
+    rank = None
     
     if search:
-        search_term = f"%{search}%"
-        query = query.filter(
-            (Job.title.ilike(search_term)) |
-            (Job.company.ilike(search_term)) |
-            (Job.description.ilike(search_term))
-        )
+        query, rank = search_jobs(query, search, db.bind.dialect.name)
     
-    total = query.count()
-    jobs = query.offset(skip).limit(limit).all()
+    total, total_exact = await count_total(db, query, exact_total)
+    if rank is not None:
+        page_query = ranked_page(query, rank, cursor, limit)
+    else:
+        page_query = keyset_page(query, Job, cursor, limit)
+    if skip:
+        page_query = page_query.offset(skip)
     
-    return {"jobs": jobs, "total": total}
+    rows = (await db.execute(page_query)).all()
+    if rank is not None:
+        rows, next_cursor = next_ranked_page(rows, limit)
+    else:
+        rows, next_cursor = next_page(rows, limit)
+    
+    return FastJSONResponse({
+        "jobs": row_dicts(rows, columns),
+        "total": total,
+        "total_exact": total_exact,
+        "next_cursor": next_cursor
+    })
 
 @router.get("/{job_id}", response_model=JobOut)
-def read_job(job_id: int, db: Session = Depends(get_db)):
-    db_job = db.query(Job).filter(Job.id == job_id).first()
+async def read_job(job_id: int, fields: Optional[str] = None, db: AsyncSession = Depends(get_async_db)):
+    names = selected_fields(fields, JobOut)
+    if names:
+        # Just the requested columns, e.g. without the description
+        columns = response_columns(Job, JobOut, names)
+        row = (await db.execute(select(*columns).where(Job.id == job_id))).first()
+        if row is None:
+            raise HTTPException(status_code=404, detail="Job not found")
+        return FastJSONResponse(row_dicts([row], columns)[0])
+    
+    db_job = await db.get(Job, job_id)
     if db_job is None:
         raise HTTPException(status_code=404, detail="Job not found")
     return db_job
 
 @router.put("/{job_id}", response_model=JobOut)
-def update_job(
+async def update_job(
     job_id: int,
     job: JobCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    db_job = db.query(Job).filter(Job.id == job_id).first()
+    db_job = await db.get(Job, job_id)
     if db_job is None:
         raise HTTPException(status_code=404, detail="Job not found")
     
@@ -66,24 +108,25 @@ def update_job(
     for key, value in job.dict().items():
         setattr(db_job, key, value)
     
-    db.commit()
-    db.refresh(db_job)
+    # Nothing is generated on update and the session keeps loaded values
+    # across commits, so there is no need to read the row back
+    await db.commit()
     return db_job
 
 @router.delete("/{job_id}")
-def delete_job(
+async def delete_job(
     job_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    db_job = db.query(Job).filter(Job.id == job_id).first()
+    db_job = await db.get(Job, job_id)
     if db_job is None:
         raise HTTPException(status_code=404, detail="Job not found")
     
     if db_job.created_by != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized to delete this job")
     
-    db.delete(db_job)
-    db.commit()
+    await db.delete(db_job)
+    await db.commit()
     
     return {"message": "Job deleted successfully"}
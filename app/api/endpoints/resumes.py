@@ -1,16 +1,25 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException, Depends
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Depends
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from datetime import datetime
-import uuid
+from pathlib import Path
+import asyncio
+import hashlib
+import json
 import os
-from typing import Optional
+import zipfile
+from typing import List, Optional, Tuple
 import aiofiles
-from app.db.session import get_db
+from app.db.authorization import get_authorized_job
+from app.db.session import get_async_db, get_db
 from app.core.security import get_current_user
-from app.models.models import User
-import requests
-from app.config import settings
+from app.models.models import User, ResumeUpload
+from app.services.resume_store import resume_store
+from app.services.virus_scanner import scan_service, ScannerUnavailable
+from app.services.resume_ingest import (
+    ResumeIngestPipeline, IngestError, archive_items, copy_and_hash, detach_upload,
+    reference_existing_blob, store_new_blob
+)
 
 router = APIRouter()
 
@@ -20,37 +29,68 @@ ALLOWED_EXTENSIONS = {'.pdf', '.doc', '.docx'}
 # Maximum file size (10MB)
 MAX_FILE_SIZE = 10 * 1024 * 1024
 
+# Uploads are streamed in chunks of this size so memory per request stays flat
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Bulk uploads: files per request and size of a zip archive
+MAX_BULK_FILES = 500
+MAX_ARCHIVE_SIZE = 500 * 1024 * 1024
+
 def is_valid_file_type(filename: str) -> bool:
     """
     Check if file extension is allowed
     """
     return os.path.splitext(filename)[1].lower() in ALLOWED_EXTENSIONS
 
-async def scan_file_for_viruses(file_content: bytes) -> bool:
+def file_too_large_exception() -> HTTPException:
+    return HTTPException(
+        status_code=400,
+        detail="File too large. Maximum size is 10MB."
+    )
+
+async def stream_upload_to_disk(file: UploadFile, file_path: str, max_size: int = MAX_FILE_SIZE) -> Tuple[int, str]:
+    """
+    Stream an upload to disk chunk by chunk, hashing it on the way.
+    Rejects the upload as soon as it grows past max_size.
+    Returns the size in bytes and the SHA-256 hex digest of the content.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    async with aiofiles.open(file_path, "wb") as out:
+        while True:
+            chunk = await file.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > max_size:
+                raise file_too_large_exception()
+            digest.update(chunk)
+            await out.write(chunk)
+    return size, digest.hexdigest()
+
+async def scan_file_for_viruses(file_path: str, content_hash: str, extension: str) -> bool:
     """
-    Scan file for viruses using ClamAV API
+    Scan file for viruses with the configured scanner backend
     Returns True if file is clean, False if infected
     """
     try:
-        # You can replace this with your preferred virus scanning service
-        # This is a placeholder for ClamAV API integration
-        response = requests.post(
-            "https://api.clamav.net/scan",
-            files={"file": file_content},
-            headers={"Authorization": f"Bearer {settings.CLAMAV_API_KEY}"}
-        )
-        return response.status_code == 200
-    except Exception as e:
-        # Log the error and fail safely
+        verdict = await scan_service.scan(file_path, content_hash, extension)
+    except ScannerUnavailable as e:
         print(f"Virus scanning error: {str(e)}")
-        return False
+        raise HTTPException(
+            status_code=503,
+            detail="Virus scanner unavailable, please retry later"
+        )
+    if not verdict.clean:
+        print(f"Virus scan rejected upload {content_hash}: {verdict.reason}")
+    return verdict.clean
 
 @router.post("/upload-resume")
 async def upload_resume(
     file: UploadFile = File(...),
-    db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
+    temp_path: Optional[Path] = None
     try:
         # Validate file type
         if not is_valid_file_type(file.filename):
@@ -59,54 +99,135 @@ async def upload_resume(
                 detail="Only PDF, DOC, and DOCX files are allowed"
             )
         
-        # Read file content
-        content = await file.read()
+        # Reject early when the multipart parser already knows the size
+        if file.size is not None and file.size > MAX_FILE_SIZE:
+            raise file_too_large_exception()
         
-        # Scan for viruses
-        if not await scan_file_for_viruses(content):
-            raise HTTPException(
-                status_code=400,
-                detail="File failed virus scan"
-            )
+        # Stream to a temp file; it only enters the blob store once it passes the scan
+        temp_path = resume_store.temp_path()
+        file_size, content_hash = await stream_upload_to_disk(file, str(temp_path))
         
-        # Check file size
-        file_size = len(content)
-        if file_size > MAX_FILE_SIZE:
-            raise HTTPException(
-                status_code=400,
-                detail="File too large. Maximum size is 10MB."
-            )
-        
-        # Generate unique filename
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        file_id = str(uuid.uuid4())
-        filename = f"{current_user.id}_{timestamp}_{file_id}{os.path.splitext(file.filename)[1]}"
+        # Identical content was already stored (and scanned): just add a reference
+        upload = await asyncio.to_thread(reference_existing_blob, current_user.id, content_hash, file.filename)
+        duplicate = upload is not None
         
-        # Save file
-        upload_dir = "uploads"
-        os.makedirs(upload_dir, exist_ok=True)
-        file_path = os.path.join(upload_dir, filename)
-        
-        with open(file_path, "wb") as f:
-            f.write(content)
+        if upload is None:
+            # Scan for viruses
+            extension = os.path.splitext(file.filename)[1]
+            if not await scan_file_for_viruses(str(temp_path), content_hash, extension):
+                raise HTTPException(
+                    status_code=400,
+                    detail="File failed virus scan"
+                )
+            
+            upload = await asyncio.to_thread(
+                store_new_blob, current_user.id, temp_path, content_hash, file_size, file.filename
+            )
+            temp_path = None
         
         # Return success response with file details
         return JSONResponse(
             status_code=200,
             content={
-                "message": "Resume uploaded successfully",
-                "file_id": file_id,
-                "filename": filename,
+                "message": "Resume already uploaded" if duplicate else "Resume uploaded successfully",
+                "file_id": upload.id,
+                "blob_id": content_hash,
+                "filename": upload.original_filename,
                 "size": file_size,
-                "uploaded_at": timestamp
+                "duplicate": duplicate,
+                "uploaded_at": upload.created_at.strftime("%Y%m%d_%H%M%S")
             }
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
-        # Clean up file if it exists
-        if 'file_path' in locals() and os.path.exists(file_path):
-            os.remove(file_path)
         raise HTTPException(
             status_code=500,
             detail=f"Error uploading file: {str(e)}"
-        ) 
\ No newline at end of file
+        )
+    finally:
+        # Clean up the temp file if it was not moved into the store
+        if temp_path and temp_path.exists():
+            os.remove(temp_path)
+
+@router.post("/bulk-upload")
+async def bulk_upload_resumes(
+    files: List[UploadFile] = File(...),
+    job_id: Optional[int] = Form(None),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Upload many resumes at once, as several files and/or zip archives.
+    Every file goes through validate, hash, scan, store and, when job_id is
+    given, analysis against that job. Progress is streamed back as NDJSON,
+    one line per file and stage, followed by a summary line.
+    """
+    job_description = None
+    if job_id is not None:
+        job = await get_authorized_job(db, job_id, current_user.id, "analyze resumes against")
+        job_description = job.description
+    
+    items = []
+    archives = []
+    staged_paths = []
+    try:
+        for upload in files:
+            if os.path.splitext(upload.filename)[1].lower() == ".zip":
+                # Stage the archive on disk; its entries are extracted by the pipeline
+                staged_path = resume_store.temp_path()
+                staged_paths.append(staged_path)
+                await asyncio.to_thread(copy_and_hash, upload.file, staged_path, MAX_ARCHIVE_SIZE)
+                archive = zipfile.ZipFile(staged_path)
+                archives.append(archive)
+                items.extend(archive_items(archive, MAX_BULK_FILES - len(items)))
+            else:
+                if len(items) >= MAX_BULK_FILES:
+                    raise IngestError("validated", f"Too many files. Maximum is {MAX_BULK_FILES} per request.")
+                items.append(await asyncio.to_thread(detach_upload, upload.filename, upload.file))
+    except (IngestError, zipfile.BadZipFile) as e:
+        for item in items:
+            item.close()
+        for archive in archives:
+            archive.close()
+        for staged_path in staged_paths:
+            os.remove(staged_path)
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    pipeline = ResumeIngestPipeline(
+        user_id=current_user.id,
+        allowed_extensions=ALLOWED_EXTENSIONS,
+        max_file_size=MAX_FILE_SIZE,
+        job_description=job_description,
+        job_id=job_id
+    )
+    
+    async def progress():
+        try:
+            async for event in pipeline.run(items):
+                yield json.dumps(event) + "\n"
+        finally:
+            for archive in archives:
+                archive.close()
+            for staged_path in staged_paths:
+                os.remove(staged_path)
+    
+    return StreamingResponse(progress(), media_type="application/x-ndjson")
+
+@router.delete("/{file_id}")
+def delete_resume(
+    file_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    upload = db.query(ResumeUpload).filter(ResumeUpload.id == file_id).first()
+    if upload is None:
+        raise HTTPException(status_code=404, detail="Resume not found")
+    
+    if upload.user_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Not authorized to delete this resume")
+    
+    resume_store.release(db, upload)
+    
+    return {"message": "Resume deleted successfully"}
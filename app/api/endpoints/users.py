@@ -1,6 +1,4 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from app.db.session import get_db
 from app.models.models import User
 from app.schemas import UserOut
 from app.core.security import get_current_user
@@ -8,5 +6,5 @@ from app.core.security import get_current_user
 router = APIRouter()
 
 @router.get("/me", response_model=UserOut)
-def read_users_me(current_user: User = Depends(get_current_user)):
+async def read_users_me(current_user: User = Depends(get_current_user)):
     return current_user
@@ -1,4 +1,5 @@
 import os
+from typing import Optional
 from pydantic_settings import BaseSettings
 from dotenv import load_dotenv
 
@@ -6,25 +7,83 @@ load_dotenv()
 
 class Settings(BaseSettings):
     DATABASE_URL: str = os.getenv("DATABASE_URL")
+    # Connection pools: the sync engine (threadpool endpoints and background
+    # work) and the async engine (CRUD and auth endpoints) are sized separately
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", 5))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", 10))
+    ASYNC_DB_POOL_SIZE: int = int(os.getenv("ASYNC_DB_POOL_SIZE", 20))
+    ASYNC_DB_MAX_OVERFLOW: int = int(os.getenv("ASYNC_DB_MAX_OVERFLOW", 10))
+    DB_POOL_TIMEOUT_SECONDS: float = float(os.getenv("DB_POOL_TIMEOUT_SECONDS", 30))
     ACCESS_TOKEN_SECRET_KEY: str = os.getenv("ACCESS_TOKEN_SECRET_KEY", "access_token_secret")
     REFRESH_TOKEN_SECRET_KEY: str = os.getenv("REFRESH_TOKEN_SECRET_KEY", "refresh_token_secret")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30))
     REFRESH_TOKEN_EXPIRE_DAYS: int = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", 7))
     ALGORITHM: str = "HS256"
-
-settings = Settings()
-import os
-from pydantic_settings import BaseSettings
-from dotenv import load_dotenv
-
-load_dotenv()
-
-class Settings(BaseSettings):
-    DATABASE_URL: str = os.getenv("DATABASE_URL")
-    ACCESS_TOKEN_SECRET_KEY: str = os.getenv("ACCESS_TOKEN_SECRET_KEY", "access_token_secret")
-    REFRESH_TOKEN_SECRET_KEY: str = os.getenv("REFRESH_TOKEN_SECRET_KEY", "refresh_token_secret")
-    ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30))
-    REFRESH_TOKEN_EXPIRE_DAYS: int = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", 7))
-    ALGORITHM: str = "HS256"
+    # Password hashing: bcrypt cost factor (existing hashes are upgraded on
+    # login), dedicated worker processes and how many requests may wait for one
+    BCRYPT_ROUNDS: int = int(os.getenv("BCRYPT_ROUNDS", 12))
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", 2))
+    PASSWORD_HASH_MAX_QUEUED: int = int(os.getenv("PASSWORD_HASH_MAX_QUEUED", 32))
+    # Issue signed family/generation refresh tokens instead of one row per token
+    REFRESH_TOKEN_STATELESS: bool = os.getenv("REFRESH_TOKEN_STATELESS", "false").lower() == "true"
+    # Refresh token revocation cache and purge of expired/revoked rows
+    REFRESH_REVOCATION_BLOOM_CAPACITY: int = int(os.getenv("REFRESH_REVOCATION_BLOOM_CAPACITY", 1000000))
+    REFRESH_REVOCATION_BLOOM_ERROR_RATE: float = float(os.getenv("REFRESH_REVOCATION_BLOOM_ERROR_RATE", 0.001))
+    REFRESH_REVOCATION_RECENT_SIZE: int = int(os.getenv("REFRESH_REVOCATION_RECENT_SIZE", 10000))
+    REFRESH_TOKEN_PURGE_INTERVAL_SECONDS: float = float(os.getenv("REFRESH_TOKEN_PURGE_INTERVAL_SECONDS", 3600))
+    REFRESH_TOKEN_PURGE_BATCH_SIZE: int = int(os.getenv("REFRESH_TOKEN_PURGE_BATCH_SIZE", 1000))
+    # Access token -> user snapshot cache used by get_current_user
+    PRINCIPAL_CACHE_ENABLED: bool = os.getenv("PRINCIPAL_CACHE_ENABLED", "true").lower() == "true"
+    PRINCIPAL_CACHE_TTL_SECONDS: float = float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", 30))
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = int(os.getenv("PRINCIPAL_CACHE_MAX_ENTRIES", 10000))
+    # Candidates written per transaction by POST /candidates/import
+    CANDIDATE_IMPORT_CHUNK_SIZE: int = int(os.getenv("CANDIDATE_IMPORT_CHUNK_SIZE", 1000))
+    UPLOAD_DIR: str = os.getenv("UPLOAD_DIR", "uploads")
+    # Virus scanning: "signature" (in-process) or "clamd" (local daemon)
+    VIRUS_SCANNER: str = os.getenv("VIRUS_SCANNER", "signature")
+    CLAMD_HOST: str = os.getenv("CLAMD_HOST", "localhost")
+    CLAMD_PORT: int = int(os.getenv("CLAMD_PORT", 3310))
+    CLAMD_SOCKET: Optional[str] = os.getenv("CLAMD_SOCKET")
+    SCAN_WORKERS: int = int(os.getenv("SCAN_WORKERS", 4))
+    SCAN_TIMEOUT_SECONDS: float = float(os.getenv("SCAN_TIMEOUT_SECONDS", 30))
+    SCAN_CACHE_TTL_SECONDS: int = int(os.getenv("SCAN_CACHE_TTL_SECONDS", 24 * 60 * 60))
+    SCAN_CACHE_MAX_ENTRIES: int = int(os.getenv("SCAN_CACHE_MAX_ENTRIES", 100000))
+    # Number of files the bulk upload pipeline processes at the same time
+    BULK_UPLOAD_CONCURRENCY: int = int(os.getenv("BULK_UPLOAD_CONCURRENCY", os.cpu_count() or 4))
+    # Data science service client
+    DS_SERVICE_URL: str = os.getenv("DS_SERVICE_URL", "http://localhost:5000")
+    DS_MAX_CONNECTIONS: int = int(os.getenv("DS_MAX_CONNECTIONS", 100))
+    DS_MAX_KEEPALIVE_CONNECTIONS: int = int(os.getenv("DS_MAX_KEEPALIVE_CONNECTIONS", 20))
+    DS_KEEPALIVE_EXPIRY_SECONDS: float = float(os.getenv("DS_KEEPALIVE_EXPIRY_SECONDS", 30))
+    # HTTP/2 needs the optional h2 package (pip install "httpx[http2]")
+    DS_HTTP2: bool = os.getenv("DS_HTTP2", "false").lower() == "true"
+    DS_CONNECT_TIMEOUT_SECONDS: float = float(os.getenv("DS_CONNECT_TIMEOUT_SECONDS", 5))
+    DS_ANALYZE_TIMEOUT_SECONDS: float = float(os.getenv("DS_ANALYZE_TIMEOUT_SECONDS", 30))
+    DS_ANALYZE_BATCH_TIMEOUT_SECONDS: float = float(os.getenv("DS_ANALYZE_BATCH_TIMEOUT_SECONDS", 120))
+    DS_HISTORY_TIMEOUT_SECONDS: float = float(os.getenv("DS_HISTORY_TIMEOUT_SECONDS", 10))
+    # Adaptive concurrency limit and circuit breaker for data science calls
+    DS_LIMIT_INITIAL: int = int(os.getenv("DS_LIMIT_INITIAL", 20))
+    DS_LIMIT_MIN: int = int(os.getenv("DS_LIMIT_MIN", 1))
+    DS_LIMIT_MAX: int = int(os.getenv("DS_LIMIT_MAX", 100))
+    DS_LATENCY_TARGET_SECONDS: float = float(os.getenv("DS_LATENCY_TARGET_SECONDS", 5))
+    DS_LIMIT_QUEUE_TIMEOUT_SECONDS: float = float(os.getenv("DS_LIMIT_QUEUE_TIMEOUT_SECONDS", 2))
+    DS_BREAKER_FAILURE_THRESHOLD: int = int(os.getenv("DS_BREAKER_FAILURE_THRESHOLD", 5))
+    DS_BREAKER_RESET_SECONDS: float = float(os.getenv("DS_BREAKER_RESET_SECONDS", 30))
+    # Analysis result cache; bump SCORING_MODEL_VERSION when scoring changes
+    SCORING_MODEL_VERSION: str = os.getenv("SCORING_MODEL_VERSION", "v1")
+    ANALYSIS_CACHE_TTL_SECONDS: int = int(os.getenv("ANALYSIS_CACHE_TTL_SECONDS", 7 * 24 * 60 * 60))
+    ANALYSIS_CACHE_MEMORY_ENTRIES: int = int(os.getenv("ANALYSIS_CACHE_MEMORY_ENTRIES", 1000))
+    ANALYSIS_CACHE_MAX_ROWS: int = int(os.getenv("ANALYSIS_CACHE_MAX_ROWS", 100000))
+    # How stale another process's invalidation can leave the in-memory tier
+    ANALYSIS_CACHE_GENERATION_CHECK_SECONDS: float = float(os.getenv("ANALYSIS_CACHE_GENERATION_CHECK_SECONDS", 5))
+    # Background analysis job workers
+    ANALYSIS_WORKERS: int = int(os.getenv("ANALYSIS_WORKERS", 4))
+    ANALYSIS_POLL_INTERVAL_SECONDS: float = float(os.getenv("ANALYSIS_POLL_INTERVAL_SECONDS", 1.0))
+    ANALYSIS_MAX_ATTEMPTS: int = int(os.getenv("ANALYSIS_MAX_ATTEMPTS", 3))
+    # A running job whose worker has not renewed its lease for this long is requeued
+    ANALYSIS_LEASE_SECONDS: float = float(os.getenv("ANALYSIS_LEASE_SECONDS", 60))
+    # Batch analysis: pairs per data science request, and requests in flight
+    ANALYSIS_BATCH_SIZE: int = int(os.getenv("ANALYSIS_BATCH_SIZE", 20))
+    ANALYSIS_BATCH_CONCURRENCY: int = int(os.getenv("ANALYSIS_BATCH_CONCURRENCY", 4))
 
 settings = Settings()
@@ -0,0 +1,146 @@
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Optional, Tuple
+import asyncio
+import multiprocessing
+import time
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+from app.config import settings
+
+# Number of recent hash/verify calls kept for the latency metrics
+LATENCY_WINDOW = 1000
+
+_contexts: Dict[int, CryptContext] = {}
+
+def password_context(rounds: int) -> CryptContext:
+    """
+    bcrypt context for a cost factor. Hashes made with any other cost are
+    reported as needing an update, so they are rehashed on the next login.
+    """
+    context = _contexts.get(rounds)
+    if context is None:
+        context = _contexts[rounds] = CryptContext(
+            schemes=["bcrypt"],
+            deprecated="auto",
+            bcrypt__default_rounds=rounds,
+            bcrypt__min_rounds=rounds,
+            bcrypt__max_rounds=rounds
+        )
+    return context
+
+# Run in the worker processes
+def _hash(password: str, rounds: int) -> str:
+    return password_context(rounds).hash(password)
+
+def _verify_and_update(password: str, hashed_password: str, rounds: int) -> Tuple[bool, Optional[str]]:
+    return password_context(rounds).verify_and_update(password, hashed_password)
+
+class PasswordHasher:
+    """
+    bcrypt on a dedicated, fixed-size process pool.
+
+    A hash or verify burns ~250ms of CPU; doing it on the shared threadpool
+    let a burst of logins starve every sync endpoint. Here at most `workers`
+    run at once, up to `max_queued` more wait their turn, and anything beyond
+    that is turned away with 429 instead of piling up.
+    """
+
+    def __init__(self, rounds: int, workers: int, max_queued: int):
+        self.rounds = rounds
+        self.workers = workers
+        self.max_queued = max_queued
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pending = 0
+        self.rejected = 0
+        self.rehashed = 0
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+
+    def start(self):
+        if self._pool is None:
+            # spawn: forking a process that runs an event loop and threads is unsafe
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+
+    def stop(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+    async def hash(self, password: str) -> str:
+        return await self._submit(_hash, password, self.rounds)
+
+    async def verify_and_update(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """
+        Verify a password; when it matches but was hashed with another cost
+        factor, also return a fresh hash to store in its place
+        """
+        verified, new_hash = await self._submit(_verify_and_update, password, hashed_password, self.rounds)
+        if new_hash is not None:
+            self.rehashed += 1
+        return verified, new_hash
+
+    async def _submit(self, fn, *args):
+        if self._pending >= self.workers + self.max_queued:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many authentication requests, please retry shortly",
+                headers={"Retry-After": "1"}
+            )
+
+        self._pending += 1
+        started = time.monotonic()
+        try:
+            try:
+                return await self._run(fn, *args)
+            except BrokenProcessPool:
+                # A worker died (OOM kill, segfault); the pool refuses all
+                # further work, so replace it and give the call one retry
+                return await self._run(fn, *args)
+        finally:
+            self._pending -= 1
+            self._latencies.append(time.monotonic() - started)
+
+    async def _run(self, fn, *args):
+        self.start()
+        pool = self._pool
+        try:
+            return await asyncio.get_running_loop().run_in_executor(pool, fn, *args)
+        except BrokenProcessPool:
+            # Concurrent callers all see the same breakage; only the first
+            # discards the pool, the rest retry on its replacement
+            if self._pool is pool:
+                pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+            raise
+
+    def stats(self) -> Dict[str, Any]:
+        latencies = sorted(self._latencies)
+
+        def percentile(q: float) -> Optional[float]:
+            return latencies[min(int(len(latencies) * q), len(latencies) - 1)] if latencies else None
+
+        return {
+            "rounds": self.rounds,
+            "workers": self.workers,
+            "in_flight": min(self._pending, self.workers),
+            "queue_depth": max(self._pending - self.workers, 0),
+            "rejected": self.rejected,
+            "rehashed": self.rehashed,
+            "latency_seconds": {
+                "count": len(latencies),
+                "p50": percentile(0.5),
+                "p95": percentile(0.95),
+                "max": latencies[-1] if latencies else None
+            }
+        }
+
+password_hasher = PasswordHasher(
+    rounds=settings.BCRYPT_ROUNDS,
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_queued=settings.PASSWORD_HASH_MAX_QUEUED
+)
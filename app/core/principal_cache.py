@@ -0,0 +1,128 @@
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Optional, Set, Tuple
+import threading
+import time
+from sqlalchemy import event
+from app.models.models import User
+from app.config import settings
+
+class UserSnapshot:
+    """
+    Read-only copy of the user columns request handlers use.
+
+    Returned by get_current_user in place of a session-bound User, so a
+    cached principal never drags a closed session or lazy loads along.
+    """
+
+    def __init__(self, id: int, email: str, is_active: bool, created_at: Optional[datetime]):
+        self.id = id
+        self.email = email
+        self.is_active = is_active
+        self.created_at = created_at
+
+    @classmethod
+    def from_user(cls, user: User) -> "UserSnapshot":
+        return cls(id=user.id, email=user.email, is_active=user.is_active, created_at=user.created_at)
+
+class PrincipalCache:
+    """
+    Bounded LRU of access token -> UserSnapshot.
+
+    A hit skips both the JWT decode and the users lookup. Entries live for
+    ttl_seconds at most, and never past the token's own expiry. Updating or
+    deleting a User through the ORM drops its entries at once (see the mapper
+    events below); other processes pick the change up within ttl_seconds.
+    Lookups come from the event loop, but the mapper events fire wherever a
+    sync session commits (threadpool handlers, asyncio.to_thread work), hence
+    the lock.
+    """
+
+    def __init__(self, enabled: bool, ttl_seconds: float, max_entries: int):
+        self.enabled = enabled
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, UserSnapshot]]" = OrderedDict()
+        self._tokens_by_user: Dict[int, Set[str]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, token: str) -> Optional[UserSnapshot]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, snapshot = entry
+            if expires_at <= time.monotonic():
+                self._remove(token)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(token)
+            self.hits += 1
+            return snapshot
+
+    def put(self, token: str, snapshot: UserSnapshot, token_expires_at: Optional[float] = None):
+        """
+        token_expires_at is the token's "exp" claim (epoch seconds)
+        """
+        if not self.enabled:
+            return
+        ttl = self.ttl_seconds
+        if token_expires_at is not None:
+            ttl = min(ttl, token_expires_at - time.time())
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._entries[token] = (time.monotonic() + ttl, snapshot)
+            self._entries.move_to_end(token)
+            self._tokens_by_user.setdefault(snapshot.id, set()).add(token)
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+
+    def invalidate_user(self, user_id: int):
+        with self._lock:
+            for token in self._tokens_by_user.pop(user_id, set()):
+                self._entries.pop(token, None)
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tokens_by_user.clear()
+
+    def _remove(self, token: str):
+        _, snapshot = self._entries.pop(token)
+        tokens = self._tokens_by_user.get(snapshot.id)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_by_user[snapshot.id]
+
+    def stats(self) -> Dict[str, object]:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else None,
+            "invalidations": self.invalidations
+        }
+
+principal_cache = PrincipalCache(
+    enabled=settings.PRINCIPAL_CACHE_ENABLED,
+    ttl_seconds=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+    max_entries=settings.PRINCIPAL_CACHE_MAX_ENTRIES
+)
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_cached_principal(mapper, connection, target):
+    # Deactivated, changed or deleted users must not keep authenticating from cache
+    principal_cache.invalidate_user(target.id)
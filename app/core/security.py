@@ -1,16 +1,23 @@
 from datetime import datetime, timedelta
 from typing import Optional
+import logging
 import uuid
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
-from app.db.session import get_db
-from app.models.models import User, RefreshToken
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.session import get_async_db
+from app.models.models import User, RefreshToken, RefreshTokenFamily
+from app.core.principal_cache import UserSnapshot, principal_cache
+from app.core.password_hashing import password_context
+from app.core.token_revocation import revocation_cache
 from app.config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+logger = logging.getLogger(__name__)
+
+pwd_context = password_context(settings.BCRYPT_ROUNDS)
 security = HTTPBearer()
 
 def verify_password(plain_password, hashed_password):
@@ -30,7 +37,11 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, settings.ACCESS_TOKEN_SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
-def create_refresh_token(data: dict, db: Session):
+async def create_refresh_token(data: dict, db: AsyncSession):
+    if settings.REFRESH_TOKEN_STATELESS:
+        # Nothing is written until the token is rotated or revoked
+        return create_family_refresh_token(data, str(uuid.uuid4()), 0)
+    
     # Generate unique token
     token_value = str(uuid.uuid4())
     expires_at = datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
@@ -42,8 +53,7 @@ def create_refresh_token(data: dict, db: Session):
         expires_at=expires_at
     )
     db.add(refresh_token)
-    db.commit()
-    db.refresh(refresh_token)
+    await db.commit()
     
     # Create JWT with reference to this token
     to_encode = data.copy()
@@ -52,17 +62,35 @@ def create_refresh_token(data: dict, db: Session):
     
     return encoded_jwt
 
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), db: Session = Depends(get_db)):
+def create_family_refresh_token(data: dict, family_id: str, generation: int, expires_at: Optional[datetime] = None):
+    if expires_at is None:
+        expires_at = datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    to_encode = data.copy()
+    to_encode.update({"exp": expires_at, "type": "refresh", "fid": family_id, "gen": generation})
+    return jwt.encode(to_encode, settings.REFRESH_TOKEN_SECRET_KEY, algorithm=settings.ALGORITHM)
+
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), db: AsyncSession = Depends(get_async_db)) -> UserSnapshot:
+    return await authenticate_access_token(credentials.credentials, db)
+
+async def authenticate_access_token(token: str, db: AsyncSession) -> UserSnapshot:
+    """
+    The user an access token belongs to, or 401. For callers that cannot
+    use the Authorization header (WebSockets) as well as get_current_user.
+    """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
     
+    cached = principal_cache.get(token)
+    if cached is not None:
+        return cached
+    
     try:
-        token = credentials.credentials
         payload = jwt.decode(token, settings.ACCESS_TOKEN_SECRET_KEY, algorithms=[settings.ALGORITHM])
         email: str = payload.get("sub")
+        user_id: Optional[int] = payload.get("uid")
         token_type: str = payload.get("type")
         
         if email is None or token_type != "access":
@@ -70,13 +98,22 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(securit
     except JWTError:
         raise credentials_exception
     
-    user = db.query(User).filter(User.email == email).first()
-    if user is None:
+    if user_id is not None:
+        user = await db.get(User, user_id)
+        if user is not None and user.email != email:
+            # Email changed since the token was issued
+            user = None
+    else:
+        # Tokens issued before the uid claim existed
+        user = (await db.execute(select(User).where(User.email == email))).scalars().first()
+    if user is None or not user.is_active:
         raise credentials_exception
     
-    return user
+    snapshot = UserSnapshot.from_user(user)
+    principal_cache.put(token, snapshot, payload.get("exp"))
+    return snapshot
 
-def get_refresh_token_user(credentials: HTTPAuthorizationCredentials = Depends(security), db: Session = Depends(get_db)):
+async def get_refresh_token_user(credentials: HTTPAuthorizationCredentials = Depends(security), db: AsyncSession = Depends(get_async_db)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate refresh token",
@@ -87,28 +124,117 @@ def get_refresh_token_user(credentials: HTTPAuthorizationCredentials = Depends(s
         token = credentials.credentials
         payload = jwt.decode(token, settings.REFRESH_TOKEN_SECRET_KEY, algorithms=[settings.ALGORITHM])
         email: str = payload.get("sub")
+        user_id: Optional[int] = payload.get("user_id")
         token_type: str = payload.get("type")
-        jti: str = payload.get("jti")
+        jti: Optional[str] = payload.get("jti")
+        family_id: Optional[str] = payload.get("fid")
+        generation: Optional[int] = payload.get("gen")
         
-        if email is None or token_type != "refresh" or jti is None:
+        if email is None or token_type != "refresh":
             raise credentials_exception
-        
-        # Verify token exists in database and is not revoked
-        db_token = db.query(RefreshToken).filter(RefreshToken.token == jti).first()
-        if not db_token or db_token.is_revoked or db_token.expires_at < datetime.utcnow():
+        if jti is None and (family_id is None or not isinstance(generation, int)):
             raise credentials_exception
-            
     except JWTError:
         raise credentials_exception
     
-    user = db.query(User).filter(User.email == email).first()
-    if user is None:
+    if jti is not None:
+        # Known revocations are rejected and never-revoked tokens skip the
+        # lookup; the conditional UPDATE in revoke_refresh_token has the final say
+        revoked = revocation_cache.check(jti)
+        if revoked:
+            raise credentials_exception
+        if revoked is None:
+            db_token = (await db.execute(select(RefreshToken).where(RefreshToken.token == jti))).scalars().first()
+            if not db_token or db_token.is_revoked or db_token.expires_at < datetime.utcnow():
+                raise credentials_exception
+    # Family tokens are not looked up here: rotate_refresh_family and
+    # revoke_refresh_family reject stale generations when they write
+    
+    if user_id is not None:
+        user = await db.get(User, user_id)
+    else:
+        user = (await db.execute(select(User).where(User.email == email))).scalars().first()
+    if user is None or user.email != email or not user.is_active:
         raise credentials_exception
     
-    return {"user": user, "token_jti": jti}
+    return {
+        "user": user,
+        "token_jti": jti,
+        "family_id": family_id,
+        "generation": generation,
+        "expires_at": datetime.utcfromtimestamp(payload["exp"])
+    }
+
+async def revoke_refresh_token(jti: str, db: AsyncSession) -> bool:
+    """
+    Revoke a refresh token. Returns False when it was already revoked,
+    expired or unknown, so a replayed token cannot be rotated twice.
+    """
+    result = await db.execute(
+        update(RefreshToken).where(
+            RefreshToken.token == jti,
+            RefreshToken.is_revoked == False,
+            RefreshToken.expires_at > datetime.utcnow()
+        ).values(is_revoked=True).execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    revocation_cache.add(jti)
+    return result.rowcount > 0
 
-def revoke_refresh_token(jti: str, db: Session):
-    db_token = db.query(RefreshToken).filter(RefreshToken.token == jti).first()
-    if db_token:
-        db_token.is_revoked = True
-        db.commit()
+async def _advance_refresh_family(db: AsyncSession, family_id: str, generation: int, user_id: int, values: dict) -> bool:
+    """
+    Apply `values` to a refresh token family if `generation` is still its
+    current one. A stale generation means an already rotated token was
+    presented again, so the whole family is revoked and False returned.
+    """
+    if generation == 0:
+        # First use of the family: create its row. Losing the insert to a
+        # concurrent request means generation 0 was already spent.
+        columns = {"generation": 0, "is_revoked": False}
+        columns.update(values)
+        db.add(RefreshTokenFamily(id=family_id, user_id=user_id, **columns))
+        try:
+            await db.commit()
+            return True
+        except IntegrityError:
+            await db.rollback()
+    else:
+        result = await db.execute(
+            update(RefreshTokenFamily).where(
+                RefreshTokenFamily.id == family_id,
+                RefreshTokenFamily.generation == generation,
+                RefreshTokenFamily.is_revoked == False
+            ).values(**values).execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        if result.rowcount:
+            return True
+    
+    logger.warning("Refresh token reuse detected for family %s, revoking it", family_id)
+    await db.execute(
+        update(RefreshTokenFamily).where(RefreshTokenFamily.id == family_id)
+        .values(is_revoked=True).execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    return False
+
+async def rotate_refresh_family(data: dict, family_id: str, generation: int, db: AsyncSession) -> Optional[str]:
+    """
+    Exchange a family refresh token for the next generation with one write.
+    Returns None (and revokes the family) if the token was already used.
+    """
+    expires_at = datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    rotated = await _advance_refresh_family(
+        db, family_id, generation, data["user_id"],
+        {"generation": generation + 1, "expires_at": expires_at}
+    )
+    if not rotated:
+        return None
+    return create_family_refresh_token(data, family_id, generation + 1, expires_at)
+
+async def revoke_refresh_family(family_id: str, generation: int, user_id: int, expires_at: datetime, db: AsyncSession) -> bool:
+    # The row has to outlive the family's tokens, or they would become usable again
+    return await _advance_refresh_family(
+        db, family_id, generation, user_id,
+        {"is_revoked": True, "expires_at": expires_at}
+    )
@@ -0,0 +1,181 @@
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Optional
+import asyncio
+import hashlib
+import math
+import threading
+import time
+from sqlalchemy import or_
+from app.db.session import SessionLocal
+from app.models.models import RefreshToken, RefreshTokenFamily
+from app.config import settings
+
+class BloomFilter:
+    """
+    Fixed-size set membership with no false negatives and a false positive
+    rate of about error_rate once `capacity` items have been added
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def add(self, item: str):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+class RevocationCache:
+    """
+    What this process knows about revoked refresh tokens, in bounded memory.
+
+    A Bloom filter answers "never revoked here" without touching the
+    database, which is the common case for a valid refresh. An LRU of recent
+    revocations rejects replays of just-rotated tokens outright. Anything in
+    between (a filter false positive, or a revocation that fell out of the
+    LRU) is checked against refresh_tokens.
+
+    This is only a shortcut: rotation and logout still revoke with a
+    conditional UPDATE, which rejects tokens revoked by other processes.
+    The filter is rebuilt from the LRU when it fills up.
+    """
+
+    def __init__(self, capacity: int, error_rate: float, recent_size: int):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.recent_size = recent_size
+        self._filter = BloomFilter(capacity, error_rate)
+        self._recent: "OrderedDict[str, None]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.fast_accepts = 0
+        self.fast_rejects = 0
+        self.db_checks = 0
+
+    def add(self, jti: str):
+        with self._lock:
+            if self._filter.count >= self.capacity:
+                self._filter = BloomFilter(self.capacity, self.error_rate)
+                for recent in self._recent:
+                    self._filter.add(recent)
+            self._filter.add(jti)
+            self._recent[jti] = None
+            self._recent.move_to_end(jti)
+            while len(self._recent) > self.recent_size:
+                self._recent.popitem(last=False)
+
+    def check(self, jti: str) -> Optional[bool]:
+        """
+        True: revoked. False: not revoked as far as this process knows.
+        None: unknown, look it up.
+        """
+        with self._lock:
+            if jti in self._recent:
+                self.fast_rejects += 1
+                return True
+            if jti not in self._filter:
+                self.fast_accepts += 1
+                return False
+            self.db_checks += 1
+            return None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "bloom_entries": self._filter.count,
+            "bloom_capacity": self.capacity,
+            "recent_revocations": len(self._recent),
+            "fast_accepts": self.fast_accepts,
+            "fast_rejects": self.fast_rejects,
+            "db_checks": self.db_checks
+        }
+
+class RefreshTokenPurger:
+    """
+    Periodically deletes expired and revoked refresh_tokens rows, batch by
+    batch so no single statement holds locks on a large part of the table.
+    Revoked refresh_token_families rows are kept until they expire: their
+    tokens carry no row of their own to reject them otherwise.
+    """
+
+    def __init__(self, interval_seconds: float, batch_size: int):
+        self.interval_seconds = interval_seconds
+        self.batch_size = batch_size
+        self._task: Optional[asyncio.Task] = None
+        self.purged = 0
+        self.last_run: Optional[float] = None
+
+    async def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await self.purge()
+            except Exception as e:
+                print(f"Refresh token purge failed: {str(e)}")
+            await asyncio.sleep(self.interval_seconds)
+
+    async def purge(self) -> int:
+        now = datetime.utcnow()
+        targets = [
+            (RefreshToken, or_(RefreshToken.is_revoked == True, RefreshToken.expires_at < now)),
+            (RefreshTokenFamily, RefreshTokenFamily.expires_at < now)
+        ]
+        removed = 0
+        for model, condition in targets:
+            while True:
+                deleted = await asyncio.to_thread(self._delete_batch, model, condition)
+                removed += deleted
+                if deleted < self.batch_size:
+                    break
+                # Let other writers in between batches
+                await asyncio.sleep(0.1)
+        self.purged += removed
+        self.last_run = time.time()
+        if removed:
+            print(f"Purged {removed} expired or revoked refresh tokens and families")
+        return removed
+
+    def _delete_batch(self, model, condition) -> int:
+        db = SessionLocal()
+        try:
+            ids = [row.id for row in db.query(model.id).filter(condition).limit(self.batch_size)]
+            if not ids:
+                return 0
+            deleted = db.query(model).filter(model.id.in_(ids)).delete(synchronize_session=False)
+            db.commit()
+            return deleted
+        finally:
+            db.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"purged": self.purged, "last_run": self.last_run}
+
+revocation_cache = RevocationCache(
+    capacity=settings.REFRESH_REVOCATION_BLOOM_CAPACITY,
+    error_rate=settings.REFRESH_REVOCATION_BLOOM_ERROR_RATE,
+    recent_size=settings.REFRESH_REVOCATION_RECENT_SIZE
+)
+
+refresh_token_purger = RefreshTokenPurger(
+    interval_seconds=settings.REFRESH_TOKEN_PURGE_INTERVAL_SECONDS,
+    batch_size=settings.REFRESH_TOKEN_PURGE_BATCH_SIZE
+)
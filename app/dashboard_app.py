@@ -1,13 +1,30 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.routers.dashboard import router as dashboard_router
+from app.db.session import engine
+from app.models.models import Base
+from app.services.analysis_jobs import analysis_queue
+from app.services.ds_client import ds_client
+
+# Create database tables (analysis jobs are stored in the main database)
+Base.metadata.create_all(bind=engine)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await ds_client.start()
+    await analysis_queue.start()
+    yield
+    await analysis_queue.stop()
+    await ds_client.stop()
 
 app = FastAPI(
     title="Zordie Dashboard",
     description="Dashboard for resume analysis",
     version="0.1.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -0,0 +1,80 @@
+"""
+Ownership checks folded into the query that loads the rows.
+
+A candidate belongs to whoever created its job. Instead of loading the
+candidate and then its job to compare created_by, these helpers select
+both in one statement; relationships are set to raise so that a response
+that starts needing one fails loudly instead of issuing a query per row.
+"""
+from typing import Optional, Sequence
+from fastapi import HTTPException
+from sqlalchemy import exists, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only, raiseload
+from app.models.models import Candidate, Job
+
+def candidate_with_owner(candidate_id: int, fields: Optional[Sequence[str]] = None):
+    """
+    One row: the candidate, its job's id (None when it has none) and the
+    id of the user who created that job. With fields, only those columns
+    of the candidate are loaded; reading any other attribute raises.
+    """
+    stmt = (
+        select(Candidate, Job.id, Job.created_by)
+        .outerjoin(Job, Job.id == Candidate.job_id)
+        .where(Candidate.id == candidate_id)
+        .options(raiseload("*"))
+    )
+    if fields:
+        stmt = stmt.options(load_only(*(getattr(Candidate, name) for name in fields), raiseload=True))
+    return stmt
+
+async def get_authorized_candidate(
+    db: AsyncSession,
+    candidate_id: int,
+    user_id: int,
+    action: str,
+    fields: Optional[Sequence[str]] = None
+) -> Candidate:
+    """
+    Load a candidate the user may `action` with a single query: 404 if it
+    does not exist, 403 if its job belongs to someone else.
+    """
+    row = (await db.execute(candidate_with_owner(candidate_id, fields))).first()
+    if row is None:
+        raise HTTPException(status_code=404, detail="Candidate not found")
+
+    candidate, job_id, owner_id = row
+    if job_id is not None and owner_id != user_id:
+        raise HTTPException(status_code=403, detail=f"Not authorized to {action} this candidate")
+    return candidate
+
+def job_owned_by(job_id: int, user_id: int):
+    """
+    Condition that is true only when the job exists and belongs to the user.
+    It does not reference the outer query, so the database evaluates it once.
+    """
+    return exists().where(Job.id == job_id, Job.created_by == user_id)
+
+async def check_job_owner(db: AsyncSession, job_id: int, user_id: int, action: str):
+    """
+    Tell a missing job (404) from someone else's (403). For listings that
+    were scoped with job_owned_by and came back empty.
+    """
+    row = (await db.execute(select(Job.created_by).where(Job.id == job_id))).first()
+    if row is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if row[0] != user_id:
+        raise HTTPException(status_code=403, detail=f"Not authorized to {action} candidates for this job")
+
+async def get_authorized_job(db: AsyncSession, job_id: int, user_id: int, action: str) -> Job:
+    """
+    Load a job the user may `action`: 404 if it does not exist, 403 if it
+    belongs to someone else
+    """
+    job = (await db.execute(select(Job).where(Job.id == job_id).options(raiseload("*")))).scalar_one_or_none()
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.created_by != user_id:
+        raise HTTPException(status_code=403, detail=f"Not authorized to {action} this job")
+    return job
@@ -0,0 +1,147 @@
+from typing import Optional, Tuple
+import base64
+import binascii
+import re
+from fastapi import HTTPException
+from sqlalchemy import Column, Integer, MetaData, Select, Table, Text, and_, false, func, literal_column, or_, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
+from app.models.models import Job
+
+# Title matches count most, then company, then description. The index and
+# the queries must use this exact expression for Postgres to match them up.
+JOB_DOCUMENT_SQL = (
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(company, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'C')"
+)
+
+# Same weighting for SQLite's bm25() (one weight per jobs_fts column)
+FTS5_WEIGHTS = "10.0, 5.0, 1.0"
+
+SQLITE_FTS_DDL = [
+    # External content table: the text stays in jobs, jobs_fts only holds the index
+    """CREATE VIRTUAL TABLE jobs_fts USING fts5(
+        title, company, description, content='jobs', content_rowid='id', tokenize='porter unicode61'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS jobs_fts_after_insert AFTER INSERT ON jobs BEGIN
+        INSERT INTO jobs_fts(rowid, title, company, description)
+        VALUES (new.id, new.title, new.company, new.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS jobs_fts_after_delete AFTER DELETE ON jobs BEGIN
+        INSERT INTO jobs_fts(jobs_fts, rowid, title, company, description)
+        VALUES ('delete', old.id, old.title, old.company, old.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS jobs_fts_after_update AFTER UPDATE ON jobs BEGIN
+        INSERT INTO jobs_fts(jobs_fts, rowid, title, company, description)
+        VALUES ('delete', old.id, old.title, old.company, old.description);
+        INSERT INTO jobs_fts(rowid, title, company, description)
+        VALUES (new.id, new.title, new.company, new.description);
+    END""",
+    # Index the jobs that existed before the table did
+    "INSERT INTO jobs_fts(jobs_fts) VALUES ('rebuild')",
+]
+
+# The SQLite FTS5 table, for joins only; it lives outside Base.metadata
+# because install_job_search creates it, not create_all
+jobs_fts = Table(
+    "jobs_fts", MetaData(),
+    Column("rowid", Integer, primary_key=True),
+    Column("title", Text),
+    Column("company", Text),
+    Column("description", Text),
+)
+
+_fts_available = {}
+
+def install_job_search(engine: Engine):
+    """
+    Create the full-text index over jobs if it does not exist yet: a GIN
+    expression index on Postgres, an FTS5 table kept in sync by triggers on
+    SQLite. Postgres maintains the expression index itself on every write.
+    """
+    dialect = engine.dialect.name
+    try:
+        with engine.begin() as connection:
+            if dialect == "postgresql":
+                connection.exec_driver_sql(
+                    f"CREATE INDEX IF NOT EXISTS ix_jobs_search_document ON jobs USING GIN (({JOB_DOCUMENT_SQL}))"
+                )
+            elif dialect == "sqlite":
+                exists = connection.exec_driver_sql(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'jobs_fts'"
+                ).first()
+                if not exists:
+                    print("Building jobs_fts full-text index")
+                    for statement in SQLITE_FTS_DDL:
+                        connection.exec_driver_sql(statement)
+        _fts_available[dialect] = dialect in ("postgresql", "sqlite")
+    except OperationalError as e:
+        # e.g. an SQLite build without FTS5: searches fall back to ILIKE
+        print(f"Job full-text search unavailable, using ILIKE: {str(e)}")
+        _fts_available[dialect] = False
+
+def fts5_query(search: str) -> Optional[str]:
+    """
+    Free text as an FTS5 query: every word must match, as a prefix. Each
+    word is quoted so FTS5 operators in the input are taken literally.
+    """
+    words = re.findall(r"\w+", search)
+    if not words:
+        return None
+    return " ".join(f'"{word}"*' for word in words)
+
+def search_jobs(stmt: Select, search: str, dialect: str) -> Tuple[Select, Optional[object]]:
+    """
+    Narrow stmt to jobs matching search. Returns the statement and a
+    relevance expression (higher is better), or None when only the ILIKE
+    fallback is available.
+    """
+    if dialect == "postgresql" and _fts_available.get(dialect):
+        document = literal_column(f"({JOB_DOCUMENT_SQL})")
+        query = func.websearch_to_tsquery(literal_column("'english'"), search)
+        return stmt.where(document.op("@@")(query)), func.ts_rank_cd(document, query)
+
+    if dialect == "sqlite" and _fts_available.get(dialect):
+        match = fts5_query(search)
+        if match is None:
+            return stmt.where(false()), None
+        stmt = stmt.join(jobs_fts, jobs_fts.c.rowid == Job.id).where(
+            text("jobs_fts MATCH :job_search").bindparams(job_search=match)
+        )
+        return stmt, -literal_column(f"bm25(jobs_fts, {FTS5_WEIGHTS})")
+
+    search_term = f"%{search}%"
+    return stmt.where(
+        (Job.title.ilike(search_term)) |
+        (Job.company.ilike(search_term)) |
+        (Job.description.ilike(search_term))
+    ), None
+
+def encode_rank_cursor(rank: float, job_id: int) -> str:
+    return base64.urlsafe_b64encode(f"{rank!r}|{job_id}".encode("utf-8")).decode("ascii")
+
+def decode_rank_cursor(cursor: str) -> Tuple[float, int]:
+    try:
+        rank, job_id = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8").split("|", 1)
+        return float(rank), int(job_id)
+    except (ValueError, UnicodeError, binascii.Error):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def ranked_page(stmt: Select, rank, cursor: Optional[str], limit: int) -> Select:
+    """
+    Search results, most relevant first, starting after cursor. stmt
+    selects Job columns; a rank column is added. Use next_ranked_page to
+    split the rows.
+    """
+    if cursor:
+        last_rank, last_id = decode_rank_cursor(cursor)
+        stmt = stmt.where(or_(rank < last_rank, and_(rank == last_rank, Job.id < last_id)))
+    return stmt.add_columns(rank.label("rank")).order_by(rank.desc(), Job.id.desc()).limit(limit + 1)
+
+def next_ranked_page(rows, limit: int) -> Tuple[list, Optional[str]]:
+    next_cursor = None
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        next_cursor = encode_rank_cursor(last.rank, last.id)
+    return rows[:limit], next_cursor
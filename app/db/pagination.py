@@ -0,0 +1,77 @@
+from datetime import datetime
+from typing import Any, Callable, Optional, Tuple
+import base64
+import binascii
+import json
+from fastapi import HTTPException
+from sqlalchemy import Select, func, literal_column, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+MAX_PAGE_SIZE = 500
+
+def encode_keyset_cursor(created_at: datetime, row_id: Any) -> str:
+    """
+    Opaque token for the position after the row (created_at, row_id)
+    """
+    raw = f"{created_at.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+def decode_keyset_cursor(cursor: str, id_type: Callable[[str], Any] = str) -> Tuple[datetime, Any]:
+    try:
+        created_at, row_id = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8").split("|", 1)
+        return datetime.fromisoformat(created_at), id_type(row_id)
+    except (ValueError, UnicodeError, binascii.Error):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def keyset_page(stmt: Select, model, cursor: Optional[str], limit: int, key: Optional[Tuple] = None) -> Select:
+    """
+    `stmt` ordered newest first on (created_at, id), starting after cursor.
+    With an index on (created_at, id) every page is one index range scan,
+    however deep it is. `key` orders on other columns holding the same
+    values, e.g. copies in a joined table whose index should drive the scan.
+    """
+    created_at_column, id_column = key or (model.created_at, model.id)
+    if cursor:
+        created_at, row_id = decode_keyset_cursor(cursor, id_column.type.python_type)
+        stmt = stmt.where(tuple_(created_at_column, id_column) < tuple_(created_at, row_id))
+    # One extra row tells whether there is a next page
+    return stmt.order_by(created_at_column.desc(), id_column.desc()).limit(limit + 1)
+
+def next_page(rows, limit: int):
+    """
+    Split the rows of a keyset_page query into the page and the next cursor
+    """
+    if len(rows) <= limit:
+        return rows, None
+    last = rows[limit - 1]
+    return rows[:limit], encode_keyset_cursor(last.created_at, last.id)
+
+async def estimate_count(db: AsyncSession, stmt: Select) -> Optional[int]:
+    """
+    The planner's row estimate for stmt: on Postgres this reads table
+    statistics instead of the rows. None where no estimate is available.
+    """
+    if db.bind.dialect.name != "postgresql":
+        return None
+    compiled = stmt.compile(dialect=db.bind.dialect)
+    params = compiled.params
+    if compiled.positiontup:
+        params = tuple(params[name] for name in compiled.positiontup)
+    connection = await db.connection()
+    plan = (await connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", params)).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+async def count_total(db: AsyncSession, stmt: Select, exact: bool = False) -> Tuple[int, bool]:
+    """
+    (total, is_exact) for the rows of stmt. Estimated unless exact is asked
+    for or the database cannot estimate, in which case rows are counted.
+    """
+    if not exact:
+        estimate = await estimate_count(db, stmt)
+        if estimate is not None:
+            return estimate, False
+    # Count the matching rows without selecting (or sorting) their columns
+    counted = stmt.with_only_columns(literal_column("1"), maintain_column_froms=True).order_by(None)
+    return await db.scalar(select(func.count()).select_from(counted.subquery())), True
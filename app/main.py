@@ -1,12 +1,34 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.routes import api_router
 from app.routers.dashboard import router as dashboard_router
-from app.db.session import engine
+from app.db.session import engine, async_engine
 from app.models.models import Base
+from app.db.job_search import install_job_search
+from app.services.skill_index import backfill_candidate_skills
+from app.services.analysis_jobs import analysis_queue
+from app.services.ds_client import ds_client
+from app.core.password_hashing import password_hasher
+from app.core.token_revocation import refresh_token_purger
 
 # Create database tables
 Base.metadata.create_all(bind=engine)
+install_job_search(engine)
+backfill_candidate_skills(engine)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    password_hasher.start()
+    await ds_client.start()
+    await analysis_queue.start()
+    await refresh_token_purger.start()
+    yield
+    await refresh_token_purger.stop()
+    await analysis_queue.stop()
+    await ds_client.stop()
+    password_hasher.stop()
+    await async_engine.dispose()
 
 app = FastAPI(
     title="Zordie API",
@@ -14,7 +36,8 @@ app = FastAPI(
     version="0.1.0",
     docs_url="/docs",
     redoc_url="/redoc",
-    openapi_url="/openapi.json"
+    openapi_url="/openapi.json",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -1 +1 @@
-from app.models.models import User, RefreshToken, Job, Candidate
+from app.models.models import User, RefreshToken, RefreshTokenFamily, Job, Candidate, CandidateSkill, ResumeBlob, ResumeUpload, AnalysisJob, AnalysisCacheEntry, AnalysisRecord
\ No newline at end of file
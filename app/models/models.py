@@ -1,8 +1,14 @@
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, Text, DateTime, Float, JSON
+from sqlalchemy import Boolean, Column, ForeignKey, Index, Integer, String, Text, DateTime, Float, JSON
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
+from datetime import datetime, timezone
 from app.db.session import Base
 
+def utcnow() -> datetime:
+    # Keyset cursors compare created_at exactly. A second-resolution server
+    # default (SQLite's CURRENT_TIMESTAMP) would tie rows and not round-trip.
+    return datetime.now(timezone.utc)
+
 class User(Base):
     __tablename__ = "users"
 
@@ -14,6 +20,7 @@ class User(Base):
 
     jobs = relationship("Job", back_populates="creator")
     refresh_tokens = relationship("RefreshToken", back_populates="user")
+    resume_uploads = relationship("ResumeUpload", back_populates="user")
 
 class RefreshToken(Base):
     __tablename__ = "refresh_tokens"
@@ -27,8 +34,27 @@ class RefreshToken(Base):
 
     user = relationship("User", back_populates="refresh_tokens")
 
+class RefreshTokenFamily(Base):
+    """
+    One row per chain of stateless refresh tokens (REFRESH_TOKEN_STATELESS).
+    Tokens carry the family id and their generation; the row records the
+    current generation and is only written when a token is rotated or the
+    family is revoked, never when a token is issued.
+    """
+    __tablename__ = "refresh_token_families"
+
+    id = Column(String, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
+    generation = Column(Integer, nullable=False, default=0)
+    is_revoked = Column(Boolean, nullable=False, default=False)
+    expires_at = Column(DateTime(timezone=True), index=True)
+
 class Job(Base):
     __tablename__ = "jobs"
+    __table_args__ = (
+        # Listings are keyed on (created_at, id), newest first
+        Index("ix_jobs_created_at_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, index=True)
@@ -37,13 +63,19 @@ class Job(Base):
     location = Column(String)
     salary_range = Column(String, nullable=True)
     created_by = Column(Integer, ForeignKey("users.id"))
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Set in Python so it has microsecond precision everywhere (see utcnow)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), default=utcnow)
 
     creator = relationship("User", back_populates="jobs")
     candidates = relationship("Candidate", back_populates="job")
 
 class Candidate(Base):
     __tablename__ = "candidates"
+    __table_args__ = (
+        # Listings are keyed on (created_at, id), newest first, optionally per job
+        Index("ix_candidates_created_at_id", "created_at", "id"),
+        Index("ix_candidates_job_id_created_at_id", "job_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True)
@@ -51,7 +83,7 @@ class Candidate(Base):
     phone = Column(String, nullable=True)
     resume_url = Column(String, nullable=True)
     job_id = Column(Integer, ForeignKey("jobs.id"))
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), default=utcnow)
     
     # Skills as JSON array
     skills = Column(JSON, default=list)  # Will store: [{"name": str, "yearsExperience": float, "context": str, "confidence": float}]
@@ -60,3 +92,124 @@ class Candidate(Base):
     github_links = Column(JSON, default=list)  # Will store: [{"url": str, "username": str, "repositoryCount": int, "profileCreatedAt": str, "extractedFrom": str}]
 
     job = relationship("Job", back_populates="candidates")
+
+class CandidateSkill(Base):
+    """
+    One row per entry of Candidate.skills, so skill filters are index range
+    scans instead of a pass over every candidate's JSON. Written only by
+    app.services.skill_index; Candidate.skills stays the source of truth.
+    """
+    __tablename__ = "candidate_skills"
+    __table_args__ = (
+        # "Python, >= 3 years, newest candidates first", across all
+        # candidates or within one job: the page is read in index order and
+        # the years/confidence filters are checked without touching the table
+        Index(
+            "ix_candidate_skills_name_created_at",
+            "name", "created_at", "candidate_id", "years_experience", "confidence"
+        ),
+        Index(
+            "ix_candidate_skills_job_id_name_created_at",
+            "job_id", "name", "created_at", "candidate_id", "years_experience", "confidence"
+        ),
+    )
+
+    id = Column(Integer, primary_key=True)
+    candidate_id = Column(Integer, ForeignKey("candidates.id", ondelete="CASCADE"), nullable=False, index=True)
+    # Copied from the candidate so a per-job filter stays inside the index
+    job_id = Column(Integer, nullable=True)
+    # Lower-cased
+    name = Column(String, nullable=False)
+    years_experience = Column(Float, nullable=False, default=0)
+    confidence = Column(Float, nullable=False, default=0)
+    # Copied from the candidate: listings are keyed on it
+    created_at = Column(DateTime(timezone=True))
+
+
+class ResumeBlob(Base):
+    __tablename__ = "resume_blobs"
+
+    # Content address: SHA-256 of the file bytes
+    sha256 = Column(String(64), primary_key=True)
+    size = Column(Integer)
+    # Number of ResumeUpload rows pointing at this blob
+    ref_count = Column(Integer, default=0, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    uploads = relationship("ResumeUpload", back_populates="blob")
+
+class ResumeUpload(Base):
+    __tablename__ = "resume_uploads"
+
+    id = Column(String, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
+    blob_sha256 = Column(String(64), ForeignKey("resume_blobs.sha256"), index=True)
+    original_filename = Column(String)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    user = relationship("User", back_populates="resume_uploads")
+    blob = relationship("ResumeBlob", back_populates="uploads")
+
+class AnalysisJob(Base):
+    __tablename__ = "analysis_jobs"
+    __table_args__ = (
+        # Workers claim the oldest queued job
+        Index("ix_analysis_jobs_status_created_at", "status", "created_at"),
+    )
+
+    id = Column(String, primary_key=True, index=True)
+    # Who submitted it; its analysis record belongs to them
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    # queued -> running -> completed | failed
+    status = Column(String, default="queued", nullable=False)
+    resume_path = Column(String)
+    job_description = Column(Text)
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    attempts = Column(Integer, default=0, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    # Lease of the worker running the job: its id and when it last renewed
+    claimed_by = Column(String, nullable=True)
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)
+
+class AnalysisCacheEntry(Base):
+    __tablename__ = "analysis_cache"
+
+    # "<model_version>:<resume sha256>:<job description sha256>"
+    key = Column(String, primary_key=True)
+    resume_hash = Column(String(64), index=True)
+    job_description_hash = Column(String(64), index=True)
+    model_version = Column(String)
+    result = Column(JSON)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    expires_at = Column(DateTime(timezone=True), index=True)
+
+class AnalysisCacheGeneration(Base):
+    __tablename__ = "analysis_cache_generation"
+
+    # A single row, bumped by every invalidation; processes drop their
+    # in-memory cache tier when they see it change
+    id = Column(Integer, primary_key=True)
+    generation = Column(Integer, default=0, nullable=False)
+
+class AnalysisRecord(Base):
+    __tablename__ = "analysis_records"
+    __table_args__ = (
+        # History pages are keyed on (created_at, id), newest first,
+        # optionally narrowed to a user's or a job's analyses
+        Index("ix_analysis_records_created_at_id", "created_at", "id"),
+        Index("ix_analysis_records_user_id_created_at", "user_id", "created_at"),
+        Index("ix_analysis_records_job_id_created_at", "job_id", "created_at"),
+    )
+
+    id = Column(String, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    job_id = Column(Integer, ForeignKey("jobs.id"), nullable=True)
+    resume_hash = Column(String(64), index=True)
+    job_description_hash = Column(String(64))
+    model_version = Column(String)
+    overall_score = Column(Float, nullable=True)
+    result = Column(JSON)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -1,11 +1,32 @@
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException
-from fastapi.responses import JSONResponse
-from typing import Optional, Dict, Any
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Depends, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from typing import Optional, Dict, Any, List, AsyncIterator
+from datetime import datetime
+import asyncio
+import hashlib
 import json
+import orjson
 import os
+import shutil
+import uuid
 from pathlib import Path
-import httpx
 from pydantic import BaseModel
+from app.db.session import AsyncSessionLocal, SessionLocal, get_async_db, get_db
+from app.api.responses import FastJSONResponse
+from app.core.security import authenticate_access_token, get_current_user
+from app.core.password_hashing import password_hasher
+from app.core.token_revocation import revocation_cache, refresh_token_purger
+from app.models.models import User, Job, ResumeUpload
+from app.services.resume_store import resume_store
+from app.services.analysis_jobs import analysis_queue, job_status, get_job_or_404
+from app.services.resume_analysis import ResumeAnalysisService, analysis_flights
+from app.services.analysis_cache import analysis_cache, hash_job_description
+from app.services.analysis_store import analysis_store, analysis_record, decode_cursor, get_analysis_or_404
+from app.services.ds_client import ds_client
+from app.services.progress import progress_bus, sse_event, TERMINAL_STAGES
 
 router = APIRouter(
     prefix="/dashboard",
@@ -15,6 +36,21 @@ router = APIRouter(
 UPLOAD_DIR = Path("uploads/resumes")
 UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
 
+# Resumes waiting for a background analysis job
+JOB_UPLOAD_DIR = Path("uploads/analysis-jobs")
+JOB_UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+
+analysis_service = ResumeAnalysisService()
+
+# Resume/job pairs per batch analysis request
+MAX_BATCH_ITEMS = 500
+
+# Records per analysis history page
+MAX_HISTORY_PAGE_SIZE = 500
+
+# Idle progress streams send a keepalive this often, in seconds
+PROGRESS_KEEPALIVE_SECONDS = 15
+
 class ResumeAnalysisResponse(BaseModel):
     overall_score: float
     skills_match: Dict[str, Any]
@@ -22,119 +58,377 @@ class ResumeAnalysisResponse(BaseModel):
     education_match: Dict[str, Any]
     recommendations: list[str]
     detailed_scores: Dict[str, Any]  # For additional scoring components
+    analysis_id: Optional[str] = None
+
+class BatchAnalysisRequest(BaseModel):
+    # Many resumes against one job ...
+    job_id: Optional[int] = None
+    job_description: Optional[str] = None
+    resume_ids: List[str] = []
+    # ... or one resume against many jobs
+    resume_id: Optional[str] = None
+    job_ids: List[int] = []
 
 @router.post("/analyze-resume", response_model=ResumeAnalysisResponse)
 async def analyze_resume(
     resume: UploadFile = File(...),
-    job_description: str = Form(...)
+    job_description: str = Form(...),
+    current_user: User = Depends(get_current_user)
 ):
     """
     Analyze a resume against a job description and return scoring results.
     """
     try:
-        # Save the uploaded resume
-        resume_path = UPLOAD_DIR / resume.filename
+        # Save the uploaded resume under a unique name so concurrent uploads don't collide
+        resume_path = UPLOAD_DIR / f"{uuid.uuid4()}{Path(resume.filename).suffix}"
         with open(resume_path, "wb") as buffer:
             content = await resume.read()
             buffer.write(content)
         
-        # Prepare data for data science service
-        data = {
-            "resume_path": str(resume_path),
-            "job_description": job_description
-        }
-        
         # Call data science service
-        async with httpx.AsyncClient() as client:
-            # Using the data science service from the provided repo
-            response = await client.post(
-                "http://localhost:5000/analyze",  # Update this URL to match your data science service
-                json=data,
-                timeout=30.0  # Increased timeout for processing
-            )
-            
-            if response.status_code != 200:
-                raise HTTPException(
-                    status_code=500,
-                    detail="Error from data science service"
-                )
-            
-            analysis_result = response.json()
-            
-            # Save individual scoring components as JSON files
-            output_dir = Path("outputs")
-            output_dir.mkdir(exist_ok=True)
-            
-            # Save overall score
-            with open(output_dir / "overall_score.json", "w") as f:
-                json.dump({"overall_score": analysis_result["overall_score"]}, f)
-            
-            # Save skills match
-            with open(output_dir / "skills_match.json", "w") as f:
-                json.dump(analysis_result["skills_match"], f)
-            
-            # Save experience match
-            with open(output_dir / "experience_match.json", "w") as f:
-                json.dump(analysis_result["experience_match"], f)
-            
-            # Save education match
-            with open(output_dir / "education_match.json", "w") as f:
-                json.dump(analysis_result["education_match"], f)
-            
-            # Save recommendations
-            with open(output_dir / "recommendations.json", "w") as f:
-                json.dump({"recommendations": analysis_result["recommendations"]}, f)
-            
-            # Save detailed scores if available
-            if "detailed_scores" in analysis_result:
-                with open(output_dir / "detailed_scores.json", "w") as f:
-                    json.dump(analysis_result["detailed_scores"], f)
+        resume_hash = hashlib.sha256(content).hexdigest()
+        analysis_result = await analysis_service.analyze_resume(resume_path, job_description, resume_hash=resume_hash)
+        
+        analysis_id = await analysis_store.save_detached(
+            analysis_result,
+            resume_hash=resume_hash,
+            job_description_hash=hash_job_description(job_description),
+            user_id=current_user.id
+        )
         
         # Clean up the uploaded file
         os.remove(resume_path)
         
-        return analysis_result
+        return {**analysis_result, "analysis_id": analysis_id}
         
+    except HTTPException:
+        # Upstream errors (e.g. 503 with Retry-After) keep their status
+        if os.path.exists(resume_path):
+            os.remove(resume_path)
+        raise
     except Exception as e:
         # Clean up file if it exists
         if os.path.exists(resume_path):
             os.remove(resume_path)
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.get("/analysis-history")
-async def get_analysis_history():
+@router.post("/analyze-batch")
+async def analyze_batch(
+    request: BatchAnalysisRequest,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
     """
-    Get history of resume analyses
+    Analyze stored resumes against one job (job_id or job_description plus
+    resume_ids), or one stored resume against several jobs (resume_id plus
+    job_ids). Results are streamed back as NDJSON, one line per pair as soon
+    as it is scored, followed by a summary line.
     """
+    many_resumes = request.job_id is not None or request.job_description is not None
+    many_jobs = request.resume_id is not None
+    if many_resumes == many_jobs:
+        raise HTTPException(
+            status_code=400,
+            detail="Give job_id or job_description with resume_ids, or resume_id with job_ids"
+        )
+    if request.job_id is not None and request.job_description is not None:
+        raise HTTPException(status_code=400, detail="Give either job_id or job_description, not both")
+    
+    resume_ids = request.resume_ids if many_resumes else [request.resume_id]
+    job_ids = request.job_ids if many_jobs else [request.job_id]
+    if not resume_ids or not job_ids:
+        raise HTTPException(status_code=400, detail="Nothing to analyze")
+    if len(resume_ids) * len(job_ids) > MAX_BATCH_ITEMS:
+        raise HTTPException(status_code=400, detail=f"Too many items. Maximum is {MAX_BATCH_ITEMS} per request.")
+    
+    # Resume id -> content hash, for the caller's own uploads only
+    uploads = dict((await db.execute(
+        select(ResumeUpload.id, ResumeUpload.blob_sha256).where(
+            ResumeUpload.id.in_(resume_ids),
+            ResumeUpload.user_id == current_user.id
+        )
+    )).all())
+    missing = [resume_id for resume_id in resume_ids if resume_id not in uploads]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Resumes not found: {', '.join(missing)}")
+    
+    if request.job_description is not None:
+        job_descriptions = {None: request.job_description}
+    else:
+        # Someone else's job is reported as missing, like someone else's resume
+        job_descriptions = dict((await db.execute(
+            select(Job.id, Job.description).where(Job.id.in_(job_ids), Job.created_by == current_user.id)
+        )).all())
+        missing = [str(job_id) for job_id in job_ids if job_id not in job_descriptions]
+        if missing:
+            raise HTTPException(status_code=404, detail=f"Jobs not found: {', '.join(missing)}")
+    
+    items = [
+        {
+            "resume_path": resume_store.blob_path(uploads[resume_id]),
+            "resume_hash": uploads[resume_id],
+            "job_description": job_description,
+            "ref": {"resume_id": resume_id, "job_id": job_id}
+        }
+        for resume_id in resume_ids
+        for job_id, job_description in job_descriptions.items()
+    ]
+    
+    async def results():
+        summary = {"total": len(items), "completed": 0, "cached": 0, "failed": 0}
+        async for outcome in analysis_service.analyze_batch(items):
+            if outcome["status"] == "completed":
+                outcome["analysis_id"] = await analysis_store.save_detached(
+                    outcome["result"],
+                    resume_hash=uploads[outcome["resume_id"]],
+                    job_description_hash=hash_job_description(job_descriptions[outcome["job_id"]]),
+                    user_id=current_user.id,
+                    job_id=outcome["job_id"]
+                )
+            summary[outcome["status"]] += 1
+            summary["cached"] += outcome.get("cached", False)
+            yield json.dumps(outcome) + "\n"
+        yield json.dumps({"status": "summary", "summary": summary}) + "\n"
+    
+    return StreamingResponse(results(), media_type="application/x-ndjson")
+
+@router.post("/analysis-jobs", status_code=202)
+async def submit_analysis_job(
+    resume: UploadFile = File(...),
+    job_description: str = Form(...),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Queue a resume analysis and return its job id right away.
+    Poll GET /dashboard/analysis-jobs/{job_id} for the result.
+    """
+    job_id = str(uuid.uuid4())
+    resume_path = JOB_UPLOAD_DIR / f"{job_id}{Path(resume.filename).suffix}"
     try:
-        output_dir = Path("outputs")
-        if not output_dir.exists():
-            return {"analyses": []}
-            
-        analyses = []
-        for file in output_dir.glob("*.json"):
-            with open(file, "r") as f:
-                analyses.append({
-                    "file": file.name,
-                    "data": json.load(f)
-                })
-        return {"analyses": analyses}
+        with open(resume_path, "wb") as buffer:
+            await asyncio.to_thread(shutil.copyfileobj, resume.file, buffer)
+        job = await analysis_queue.submit(resume_path, job_description, job_id=job_id, user_id=current_user.id)
     except Exception as e:
+        if os.path.exists(resume_path):
+            os.remove(resume_path)
         raise HTTPException(status_code=500, detail=str(e))
+    
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "status_url": f"/dashboard/analysis-jobs/{job.id}"
+    }
 
-@router.get("/analysis/{analysis_id}")
-async def get_analysis(analysis_id: str):
+@router.get("/analysis-jobs/{job_id}")
+def get_analysis_job(
+    job_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
     """
-    Get specific analysis result by ID
+    Get status, timings and (once finished) the result of one of the
+    caller's analysis jobs
+    """
+    return job_status(get_job_or_404(db, job_id, current_user.id))
+
+def finished_job_event(job_id: str, status: Dict[str, Any]) -> Optional[Dict[str, Any]]:
     """
+    The terminal progress event for a job status read from the database,
+    or None while the job is still queued or running
+    """
+    if status["status"] not in ("completed", "failed"):
+        return None
+    stage = "scored" if status["status"] == "completed" else "failed"
+    return {"id": 0, "topic": job_id, "stage": stage, "result": status["result"], "error": status["error"]}
+
+def load_job_status(job_id: str, user_id: Optional[int] = None) -> Dict[str, Any]:
+    db = SessionLocal()
     try:
-        output_dir = Path("outputs")
-        file_path = output_dir / f"{analysis_id}.json"
+        return job_status(get_job_or_404(db, job_id, user_id))
+    finally:
+        db.close()
+
+async def job_progress(job_id: str, snapshot: Dict[str, Any], last_event_id: Optional[int]) -> AsyncIterator[Optional[Dict[str, Any]]]:
+    """
+    Progress events for an analysis job until it is scored or fails.
+    Yields None when nothing happened for PROGRESS_KEEPALIVE_SECONDS.
+
+    The progress bus only carries this process's events, so the job row is
+    re-read on every keepalive: a job run by a worker in another process
+    still ends the stream once it has finished.
+    """
+    with progress_bus.subscribe(job_id, last_event_id) as queue:
+        finished = finished_job_event(job_id, snapshot)
+        if finished and queue.empty():
+            # Finished before we subscribed and nothing is buffered: answer from the database
+            yield finished
+            return
         
-        if not file_path.exists():
-            raise HTTPException(status_code=404, detail="Analysis not found")
-            
-        with open(file_path, "r") as f:
-            return json.load(f)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e)) 
\ No newline at end of file
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=PROGRESS_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                try:
+                    finished = finished_job_event(job_id, await asyncio.to_thread(load_job_status, job_id))
+                except HTTPException:
+                    # The job row is gone
+                    return
+                if finished and queue.empty():
+                    yield finished
+                    return
+                yield None
+                continue
+            yield event
+            if event["stage"] in TERMINAL_STAGES:
+                return
+
+@router.get("/analysis-jobs/{job_id}/events")
+def stream_analysis_job_events(
+    job_id: str,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Server-Sent Events stream of an analysis job's progress: uploaded,
+    scanned, extracted, analyzing, then scored (with the result) or failed.
+    Reconnecting clients send Last-Event-ID and only get what they missed.
+    Only the user who submitted the job can follow it.
+    """
+    snapshot = job_status(get_job_or_404(db, job_id, current_user.id))
+    last_event_id = request.headers.get("last-event-id")
+    last_event_id = int(last_event_id) if last_event_id and last_event_id.isdigit() else None
+    
+    async def events():
+        async for event in job_progress(job_id, snapshot, last_event_id):
+            yield sse_event(event) if event else ": keepalive\n\n"
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.websocket("/analysis-jobs/{job_id}/ws")
+async def analysis_job_events_websocket(websocket: WebSocket, job_id: str, token: Optional[str] = None):
+    """
+    The same progress events as /events, as JSON WebSocket messages.
+    Browsers cannot set an Authorization header on a WebSocket, so the
+    access token is passed as ?token=.
+    """
+    # No database dependencies: they would hold pooled connections for as
+    # long as the socket stays open
+    try:
+        if not token:
+            raise HTTPException(status_code=401, detail="Not authenticated")
+        async with AsyncSessionLocal() as db:
+            current_user = await authenticate_access_token(token, db)
+    except HTTPException:
+        await websocket.close(code=4401)
+        return
+    try:
+        snapshot = await asyncio.to_thread(load_job_status, job_id, current_user.id)
+    except HTTPException:
+        await websocket.close(code=4404)
+        return
+    
+    await websocket.accept()
+    try:
+        async for event in job_progress(job_id, snapshot, None):
+            await websocket.send_json(event or {"stage": "keepalive"})
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
+
+@router.get("/metrics")
+def get_metrics(db: Session = Depends(get_db)):
+    """
+    Operational metrics for the analysis pipeline
+    """
+    return {
+        "analysis_jobs": analysis_queue.stats(db),
+        "analysis_cache": analysis_cache.stats(),
+        "analysis_coalescing": analysis_flights.stats(),
+        "data_science_upstream": ds_client.stats(),
+        "progress_streams": progress_bus.stats(),
+        "password_hashing": password_hasher.stats(),
+        "refresh_tokens": {
+            "revocation_cache": revocation_cache.stats(),
+            "purge": refresh_token_purger.stats()
+        }
+    }
+
+@router.delete("/analysis-cache")
+async def invalidate_analysis_cache(
+    resume_hash: Optional[str] = None,
+    job_description_hash: Optional[str] = None,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Invalidate cached analysis results for a resume (SHA-256 of its content),
+    a job description (SHA-256 of its normalized text), both, or everything
+    when neither is given. Other processes drop their in-memory copies within
+    ANALYSIS_CACHE_GENERATION_CHECK_SECONDS.
+    """
+    removed = await analysis_cache.invalidate(resume_hash, job_description_hash)
+    return {"message": "Analysis cache invalidated", "removed": removed}
+
+@router.get("/analysis-history")
+def get_analysis_history(
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    job_id: Optional[int] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    min_score: Optional[float] = None,
+    format: str = "json",
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get the caller's resume analyses, newest first, one page at a time.
+    Pass the returned next_cursor to get the following page. With
+    format=ndjson every matching record (up to limit, if given) is streamed
+    as it is read instead.
+    """
+    if format not in ("json", "ndjson"):
+        raise HTTPException(status_code=400, detail="format must be json or ndjson")
+    if cursor:
+        # Reject a bad cursor before any of the response is sent
+        decode_cursor(cursor)
+    
+    filters = {
+        "job_id": job_id,
+        "user_id": current_user.id,
+        "created_after": created_after,
+        "created_before": created_before,
+        "min_score": min_score
+    }
+    
+    if format == "ndjson":
+        def records():
+            for record in analysis_store.stream(filters, cursor, limit):
+                yield orjson.dumps(analysis_record(record)) + b"\n"
+        return StreamingResponse(records(), media_type="application/x-ndjson")
+    
+    limit = min(max(limit or 50, 1), MAX_HISTORY_PAGE_SIZE)
+    records, next_cursor = analysis_store.page(db, filters, limit, cursor)
+    # Already JSON-ready: skip jsonable_encoder's walk over every result
+    return FastJSONResponse({
+        "analyses": [analysis_record(record) for record in records],
+        "next_cursor": next_cursor
+    })
+
+@router.get("/analysis/{analysis_id}")
+def get_analysis(
+    analysis_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get specific analysis result by ID
+    """
+    record = get_analysis_or_404(db, analysis_id)
+    if record.user_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Not authorized to view this analysis")
+    return analysis_record(record)
@@ -88,6 +88,9 @@ class JobOut(JobBase):
 class JobList(BaseModel):
     jobs: List[JobOut]
     total: int
+    # False when total is the database's estimate (see exact_total)
+    total_exact: bool = True
+    next_cursor: Optional[str] = None
 
 # Skill schema
 class Skill(BaseModel):
@@ -133,3 +136,17 @@ class CandidateOut(CandidateBase):
 class CandidateList(BaseModel):
     candidates: List[CandidateOut]
     total: int
+    total_exact: bool = True
+    next_cursor: Optional[str] = None
+
+class CandidateImportError(BaseModel):
+    # Position of the record in the JSON array, NDJSON lines or CSV rows
+    index: int
+    errors: List[str]
+
+class CandidateImportResult(BaseModel):
+    imported: int
+    failed: int
+    # Ids of the imported candidates, ascending
+    candidate_ids: List[int]
+    errors: List[CandidateImportError]
@@ -0,0 +1,266 @@
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+import asyncio
+import hashlib
+import re
+import time
+import unicodedata
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from app.db.session import SessionLocal
+from app.models.models import AnalysisCacheEntry, AnalysisCacheGeneration
+from app.config import settings
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Run the persistent-tier eviction every this many writes
+EVICTION_INTERVAL = 100
+
+def hash_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def normalize_job_description(job_description: str) -> str:
+    """
+    Formatting-only differences (unicode forms, whitespace, line endings)
+    should not produce a different cache key
+    """
+    text = unicodedata.normalize("NFKC", job_description)
+    return re.sub(r"\s+", " ", text).strip()
+
+def hash_job_description(job_description: str) -> str:
+    return hashlib.sha256(normalize_job_description(job_description).encode("utf-8")).hexdigest()
+
+class AnalysisCache:
+    """
+    Two-tier cache of analysis results keyed by resume content hash,
+    normalized job description hash and scoring model version.
+
+    The memory tier is a bounded LRU in front of the analysis_cache table,
+    which survives restarts and is shared between processes. Both tiers
+    expire entries after ttl_seconds (an entry loaded from the table only
+    lives as long as its row); the table is also trimmed to max_rows,
+    oldest first.
+
+    Invalidation deletes the rows and bumps a generation counter in the
+    database. Every process compares it with the generation its memory tier
+    was filled under at most every generation_check_seconds and clears the
+    tier when it changed, so another process's invalidation takes effect
+    here within that interval.
+    """
+
+    def __init__(
+        self,
+        model_version: str,
+        ttl_seconds: int,
+        memory_entries: int,
+        max_rows: int,
+        generation_check_seconds: float
+    ):
+        self.model_version = model_version
+        self.ttl_seconds = ttl_seconds
+        self.memory_entries = memory_entries
+        self.max_rows = max_rows
+        self.generation_check_seconds = generation_check_seconds
+        self._memory: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._generation: Optional[int] = None
+        self._generation_checked = 0.0
+        self._writes = 0
+        self.memory_hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def key(self, resume_hash: str, job_description_hash: str) -> str:
+        return f"{self.model_version}:{resume_hash}:{job_description_hash}"
+
+    async def get(self, resume_hash: str, job_description_hash: str) -> Optional[Dict[str, Any]]:
+        key = self.key(resume_hash, job_description_hash)
+        if time.monotonic() - self._generation_checked >= self.generation_check_seconds:
+            self._sync_generation(await asyncio.to_thread(self._read_generation))
+        entry = self._memory.get(key)
+        if entry is not None:
+            expires_at, result = entry
+            if expires_at > time.monotonic():
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return result
+            del self._memory[key]
+
+        loaded = await asyncio.to_thread(self._load, key)
+        if loaded is None:
+            self.misses += 1
+            return None
+
+        result, remaining = loaded
+        self.persistent_hits += 1
+        self._remember(key, result, remaining)
+        return result
+
+    async def put(self, resume_hash: str, job_description_hash: str, result: Dict[str, Any]):
+        key = self.key(resume_hash, job_description_hash)
+        self._remember(key, result)
+        await asyncio.to_thread(self._store, key, resume_hash, job_description_hash, result)
+
+    async def invalidate(self, resume_hash: Optional[str] = None, job_description_hash: Optional[str] = None) -> int:
+        """
+        Drop cached results for a resume, a job description, both, or
+        (with no arguments) everything. Returns the number of persisted rows removed.
+        """
+        for key in list(self._memory):
+            _, cached_resume, cached_jd = key.rsplit(":", 2)
+            if resume_hash and cached_resume != resume_hash:
+                continue
+            if job_description_hash and cached_jd != job_description_hash:
+                continue
+            del self._memory[key]
+        removed, generation = await asyncio.to_thread(self._delete, resume_hash, job_description_hash)
+        if self._generation is not None and generation == self._generation + 1:
+            # Only our own bump: what is left in memory is still valid
+            self._generation = generation
+            self._generation_checked = time.monotonic()
+        else:
+            self._sync_generation(generation)
+        return removed
+
+    def _sync_generation(self, generation: int):
+        if generation != self._generation:
+            self._memory.clear()
+            self._generation = generation
+        self._generation_checked = time.monotonic()
+
+    def _remember(self, key: str, result: Dict[str, Any], ttl_seconds: Optional[float] = None):
+        ttl = self.ttl_seconds if ttl_seconds is None else min(ttl_seconds, self.ttl_seconds)
+        self._memory[key] = (time.monotonic() + ttl, result)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _load(self, key: str) -> Optional[Tuple[Dict[str, Any], float]]:
+        """
+        The stored result and the seconds until its row expires
+        """
+        db = SessionLocal()
+        try:
+            entry = db.query(AnalysisCacheEntry).filter(
+                AnalysisCacheEntry.key == key,
+                AnalysisCacheEntry.expires_at > datetime.utcnow()
+            ).first()
+            if entry is None:
+                return None
+            # Stored as naive UTC; drivers with real time zone support return it aware
+            expires_at = entry.expires_at
+            now = datetime.now(timezone.utc) if expires_at.tzinfo else datetime.utcnow()
+            return entry.result, (expires_at - now).total_seconds()
+        finally:
+            db.close()
+
+    def _read_generation(self) -> int:
+        db = SessionLocal()
+        try:
+            generation = db.query(AnalysisCacheGeneration.generation).filter(
+                AnalysisCacheGeneration.id == 1
+            ).scalar()
+            return generation or 0
+        finally:
+            db.close()
+
+    def _bump_generation(self, db) -> int:
+        bumped = db.query(AnalysisCacheGeneration).filter(AnalysisCacheGeneration.id == 1).update(
+            {AnalysisCacheGeneration.generation: AnalysisCacheGeneration.generation + 1},
+            synchronize_session=False
+        )
+        if not bumped:
+            db.add(AnalysisCacheGeneration(id=1, generation=1))
+        return db.query(AnalysisCacheGeneration.generation).filter(
+            AnalysisCacheGeneration.id == 1
+        ).scalar()
+
+    def _store(self, key: str, resume_hash: str, job_description_hash: str, result: Dict[str, Any]):
+        db = SessionLocal()
+        try:
+            db.merge(AnalysisCacheEntry(
+                key=key,
+                resume_hash=resume_hash,
+                job_description_hash=job_description_hash,
+                model_version=self.model_version,
+                result=result,
+                expires_at=datetime.utcnow() + timedelta(seconds=self.ttl_seconds)
+            ))
+            try:
+                db.commit()
+            except IntegrityError:
+                # Stored concurrently by another request; either copy will do
+                db.rollback()
+
+            self._writes += 1
+            if self._writes % EVICTION_INTERVAL == 0:
+                self._evict(db)
+        finally:
+            db.close()
+
+    def _evict(self, db):
+        removed = db.query(AnalysisCacheEntry).filter(
+            AnalysisCacheEntry.expires_at <= datetime.utcnow()
+        ).delete(synchronize_session=False)
+
+        overflow = db.query(AnalysisCacheEntry).count() - self.max_rows
+        if overflow > 0:
+            oldest = select(AnalysisCacheEntry.key).order_by(
+                AnalysisCacheEntry.created_at
+            ).limit(overflow).scalar_subquery()
+            removed += db.query(AnalysisCacheEntry).filter(
+                AnalysisCacheEntry.key.in_(oldest)
+            ).delete(synchronize_session=False)
+
+        db.commit()
+        self.evictions += removed
+
+    def _delete(self, resume_hash: Optional[str], job_description_hash: Optional[str]) -> Tuple[int, int]:
+        """
+        Delete matching rows and bump the generation in one transaction.
+        Returns the rows removed and the new generation.
+        """
+        db = SessionLocal()
+        try:
+            query = db.query(AnalysisCacheEntry)
+            if resume_hash:
+                query = query.filter(AnalysisCacheEntry.resume_hash == resume_hash)
+            if job_description_hash:
+                query = query.filter(AnalysisCacheEntry.job_description_hash == job_description_hash)
+            removed = query.delete(synchronize_session=False)
+            try:
+                generation = self._bump_generation(db)
+                db.commit()
+            except IntegrityError:
+                # Two first-ever invalidations raced to create the row
+                db.rollback()
+                return self._delete(resume_hash, job_description_hash)
+            return removed, generation
+        finally:
+            db.close()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.memory_hits + self.persistent_hits + self.misses
+        return {
+            "model_version": self.model_version,
+            "memory_entries": len(self._memory),
+            "memory_hits": self.memory_hits,
+            "persistent_hits": self.persistent_hits,
+            "misses": self.misses,
+            "hit_ratio": (self.memory_hits + self.persistent_hits) / lookups if lookups else None,
+            "evictions": self.evictions
+        }
+
+analysis_cache = AnalysisCache(
+    model_version=settings.SCORING_MODEL_VERSION,
+    ttl_seconds=settings.ANALYSIS_CACHE_TTL_SECONDS,
+    memory_entries=settings.ANALYSIS_CACHE_MEMORY_ENTRIES,
+    max_rows=settings.ANALYSIS_CACHE_MAX_ROWS,
+    generation_check_seconds=settings.ANALYSIS_CACHE_GENERATION_CHECK_SECONDS
+)
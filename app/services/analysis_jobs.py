@@ -0,0 +1,398 @@
+from collections import deque
+from datetime import timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import asyncio
+import os
+import socket
+import time
+import uuid
+from fastapi import HTTPException
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.db.session import SessionLocal
+from app.models.models import AnalysisJob, utcnow
+from app.services.resume_analysis import ResumeAnalysisService
+from app.services.analysis_cache import hash_file, hash_job_description
+from app.services.analysis_store import analysis_store
+from app.services.progress import progress_bus
+from app.services.virus_scanner import scan_service, ScannerUnavailable
+from app.config import settings
+
+# Number of finished jobs kept for the timing metrics
+TIMING_WINDOW = 1000
+
+class AnalysisJobQueue:
+    """
+    Durable queue of resume analyses backed by the analysis_jobs table.
+
+    Submitting only inserts a row, so clients get a job id immediately. A pool
+    of asyncio workers claims queued rows (oldest first) and runs them against
+    the data science service.
+
+    Several processes can share the table, so a claim is a lease: the row
+    records which queue owns it and the worker renews heartbeat_at while it
+    runs. Running rows whose lease was not renewed for lease_seconds (their
+    process died) are put back in the queue, so jobs survive crashes and
+    restarts without being taken from live workers.
+    """
+
+    def __init__(self, workers: int, poll_interval: float, max_attempts: int, lease_seconds: float):
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.lease_seconds = lease_seconds
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._busy = 0
+        self._completed = 0
+        self._failed = 0
+        self._wait_times = deque(maxlen=TIMING_WINDOW)
+        self._run_times = deque(maxlen=TIMING_WINDOW)
+        self._analysis_service = ResumeAnalysisService()
+
+    async def submit(
+        self,
+        resume_path: Path,
+        job_description: str,
+        job_id: Optional[str] = None,
+        user_id: Optional[int] = None
+    ) -> AnalysisJob:
+        """
+        Insert the job (on a worker thread, with its own session) and wake
+        a worker. Returns the detached row.
+        """
+        def insert():
+            db = SessionLocal()
+            try:
+                job = AnalysisJob(
+                    id=job_id or str(uuid.uuid4()),
+                    user_id=user_id,
+                    status="queued",
+                    resume_path=str(resume_path),
+                    job_description=job_description
+                )
+                db.add(job)
+                db.commit()
+                db.refresh(job)
+                return job
+            finally:
+                db.close()
+
+        job = await asyncio.to_thread(insert)
+        progress_bus.publish(job.id, "uploaded", status=job.status)
+        if self._wakeup:
+            self._wakeup.set()
+        return job
+
+    async def start(self):
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._reaper()))
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        # Hand our unfinished jobs back now instead of when their lease runs out
+        released = await asyncio.to_thread(self._requeue_claims, AnalysisJob.claimed_by == self.owner)
+        if released:
+            print(f"Released {released} unfinished analysis jobs")
+
+    async def _reaper(self):
+        while True:
+            cutoff = utcnow() - timedelta(seconds=self.lease_seconds)
+            requeued = await asyncio.to_thread(
+                self._requeue_claims,
+                AnalysisJob.heartbeat_at.is_(None) | (AnalysisJob.heartbeat_at < cutoff)
+            )
+            if requeued:
+                print(f"Requeued {requeued} analysis jobs whose worker stopped renewing its lease")
+                self._wakeup.set()
+            await asyncio.sleep(self.lease_seconds / 2)
+
+    async def _heartbeat(self, job_id: str):
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            if not await asyncio.to_thread(self._renew_lease, job_id):
+                print(f"Lost the lease on analysis job {job_id}")
+                return
+
+    async def _worker(self):
+        while True:
+            job = await asyncio.to_thread(self._claim_next)
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            self._busy += 1
+            started = time.monotonic()
+            heartbeat = asyncio.create_task(self._heartbeat(job["id"]))
+            try:
+                await self._run(job)
+            finally:
+                heartbeat.cancel()
+                self._busy -= 1
+                self._run_times.append(time.monotonic() - started)
+
+    async def _run(self, job: Dict[str, Any]):
+        resume_path = Path(job["resume_path"])
+        try:
+            resume_hash = await asyncio.to_thread(hash_file, resume_path)
+            try:
+                verdict = await scan_service.scan(str(resume_path), resume_hash, resume_path.suffix.lower())
+            except ScannerUnavailable as e:
+                raise HTTPException(status_code=503, detail=f"Virus scanner unavailable: {str(e)}")
+            if not verdict.clean:
+                raise HTTPException(status_code=400, detail="File failed virus scan")
+            progress_bus.publish(job["id"], "scanned")
+            
+            job_description_hash = hash_job_description(job["job_description"])
+            progress_bus.publish(
+                job["id"], "extracted", resume_hash=resume_hash, job_description_hash=job_description_hash
+            )
+            
+            progress_bus.publish(job["id"], "analyzing")
+            result = await self._analysis_service.analyze_resume(
+                resume_path, job["job_description"], resume_hash=resume_hash
+            )
+        except asyncio.CancelledError:
+            # Shutting down: stop() puts the row back in the queue
+            raise
+        except HTTPException as e:
+            if e.status_code != 503:
+                self._failed += 1
+                await asyncio.to_thread(self._finish, job["id"], "failed", None, e.detail)
+                progress_bus.publish(job["id"], "failed", error=e.detail)
+                return
+            # Upstream is shedding load: put the job back without spending an
+            # attempt and hold this worker off until the upstream may recover
+            retry_after = float((e.headers or {}).get("Retry-After", self.poll_interval))
+            await asyncio.to_thread(self._requeue, job["id"])
+            progress_bus.publish(job["id"], "requeued", retry_after=retry_after)
+            await asyncio.sleep(retry_after)
+            return
+        except Exception as e:
+            error = getattr(e, "detail", str(e))
+            self._failed += 1
+            await asyncio.to_thread(self._finish, job["id"], "failed", None, error)
+            progress_bus.publish(job["id"], "failed", error=error)
+            return
+
+        # The analysis record shares the job's id, so it is also
+        # available from GET /dashboard/analysis/{job_id}
+        await analysis_store.save_detached(
+            result,
+            resume_hash=resume_hash,
+            job_description_hash=job_description_hash,
+            user_id=job["user_id"],
+            analysis_id=job["id"]
+        )
+        self._completed += 1
+        await asyncio.to_thread(self._finish, job["id"], "completed", result, None)
+        progress_bus.publish(job["id"], "scored", analysis_id=job["id"], result=result)
+
+    def _requeue_claims(self, condition) -> int:
+        """
+        Put running jobs matching condition back in the queue. The attempt
+        they used still counts.
+        """
+        db = SessionLocal()
+        try:
+            requeued = db.query(AnalysisJob).filter(AnalysisJob.status == "running", condition).update(
+                {
+                    AnalysisJob.status: "queued",
+                    AnalysisJob.started_at: None,
+                    AnalysisJob.claimed_by: None,
+                    AnalysisJob.heartbeat_at: None
+                },
+                synchronize_session=False
+            )
+            db.commit()
+            return requeued
+        finally:
+            db.close()
+
+    def _renew_lease(self, job_id: str) -> bool:
+        db = SessionLocal()
+        try:
+            renewed = self._owned(db, job_id).update(
+                {AnalysisJob.heartbeat_at: utcnow()}, synchronize_session=False
+            )
+            db.commit()
+            return bool(renewed)
+        finally:
+            db.close()
+
+    def _owned(self, db: Session, job_id: str):
+        """
+        The job, if it is still running under our lease
+        """
+        return db.query(AnalysisJob).filter(
+            AnalysisJob.id == job_id,
+            AnalysisJob.status == "running",
+            AnalysisJob.claimed_by == self.owner
+        )
+
+    def _requeue(self, job_id: str):
+        db = SessionLocal()
+        try:
+            self._owned(db, job_id).update(
+                {
+                    AnalysisJob.status: "queued",
+                    AnalysisJob.started_at: None,
+                    AnalysisJob.attempts: AnalysisJob.attempts - 1,
+                    AnalysisJob.claimed_by: None,
+                    AnalysisJob.heartbeat_at: None
+                },
+                synchronize_session=False
+            )
+            db.commit()
+        finally:
+            db.close()
+
+    def _claim_next(self) -> Optional[Dict[str, Any]]:
+        """
+        Atomically move the oldest queued job to running.
+        The conditional UPDATE makes this safe across workers and processes.
+        """
+        db = SessionLocal()
+        try:
+            while True:
+                candidate = db.query(AnalysisJob.id).filter(
+                    AnalysisJob.status == "queued"
+                ).order_by(AnalysisJob.created_at, AnalysisJob.id).first()
+                if candidate is None:
+                    return None
+
+                claimed = db.query(AnalysisJob).filter(
+                    AnalysisJob.id == candidate.id,
+                    AnalysisJob.status == "queued"
+                ).update(
+                    {
+                        AnalysisJob.status: "running",
+                        AnalysisJob.started_at: func.now(),
+                        AnalysisJob.attempts: AnalysisJob.attempts + 1,
+                        AnalysisJob.claimed_by: self.owner,
+                        AnalysisJob.heartbeat_at: utcnow()
+                    },
+                    synchronize_session=False
+                )
+                db.commit()
+                if not claimed:
+                    # Another worker got it first
+                    continue
+
+                job = db.query(AnalysisJob).filter(AnalysisJob.id == candidate.id).first()
+                if job.attempts > self.max_attempts:
+                    job.status = "failed"
+                    job.error = "Gave up after repeated interruptions"
+                    job.finished_at = func.now()
+                    db.commit()
+                    self._discard_resume(job.resume_path)
+                    continue
+
+                if job.created_at and job.started_at:
+                    self._wait_times.append((job.started_at - job.created_at).total_seconds())
+                return {
+                    "id": job.id,
+                    "user_id": job.user_id,
+                    "resume_path": job.resume_path,
+                    "job_description": job.job_description
+                }
+        finally:
+            db.close()
+
+    def _finish(self, job_id: str, status: str, result: Optional[Dict[str, Any]], error: Optional[str]):
+        db = SessionLocal()
+        try:
+            job = self._owned(db, job_id).first()
+            if job is None:
+                # Our lease expired and the job was requeued; its new run records the outcome
+                print(f"Not recording {status} for analysis job {job_id}: no longer holding its lease")
+                return
+            job.status = status
+            job.result = result
+            job.error = error
+            job.finished_at = func.now()
+            db.commit()
+            self._discard_resume(job.resume_path)
+        finally:
+            db.close()
+
+    @staticmethod
+    def _discard_resume(resume_path: str):
+        if resume_path and os.path.exists(resume_path):
+            os.remove(resume_path)
+
+    def stats(self, db: Session) -> Dict[str, Any]:
+        counts = dict(
+            db.query(AnalysisJob.status, func.count(AnalysisJob.id)).group_by(AnalysisJob.status).all()
+        )
+        return {
+            "queue_depth": counts.get("queued", 0),
+            "running": counts.get("running", 0),
+            "workers": self.workers,
+            "busy_workers": self._busy,
+            "worker_utilization": self._busy / self.workers if self.workers else 0.0,
+            "completed_since_start": self._completed,
+            "failed_since_start": self._failed,
+            "wait_seconds": summarize_timings(self._wait_times),
+            "run_seconds": summarize_timings(self._run_times)
+        }
+
+def summarize_timings(samples) -> Dict[str, Optional[float]]:
+    if not samples:
+        return {"count": 0, "avg": None, "p95": None, "max": None}
+    ordered = sorted(samples)
+    return {
+        "count": len(ordered),
+        "avg": sum(ordered) / len(ordered),
+        "p95": ordered[max(int(len(ordered) * 0.95) - 1, 0)],
+        "max": ordered[-1]
+    }
+
+def job_status(job: AnalysisJob) -> Dict[str, Any]:
+    def seconds_between(start, end):
+        if start is None or end is None:
+            return None
+        return (end - start).total_seconds()
+
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "attempts": job.attempts,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+        "queued_seconds": seconds_between(job.created_at, job.started_at),
+        "run_seconds": seconds_between(job.started_at, job.finished_at),
+        "result": job.result,
+        "error": job.error
+    }
+
+def get_job_or_404(db: Session, job_id: str, user_id: Optional[int] = None) -> AnalysisJob:
+    """
+    The job, or 404. With user_id, someone else's job is a 404 too, so job
+    ids cannot be probed.
+    """
+    query = db.query(AnalysisJob).filter(AnalysisJob.id == job_id)
+    if user_id is not None:
+        query = query.filter(AnalysisJob.user_id == user_id)
+    job = query.first()
+    if job is None:
+        raise HTTPException(status_code=404, detail="Analysis job not found")
+    return job
+
+analysis_queue = AnalysisJobQueue(
+    workers=settings.ANALYSIS_WORKERS,
+    poll_interval=settings.ANALYSIS_POLL_INTERVAL_SECONDS,
+    max_attempts=settings.ANALYSIS_MAX_ATTEMPTS,
+    lease_seconds=settings.ANALYSIS_LEASE_SECONDS
+)
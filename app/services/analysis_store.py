@@ -0,0 +1,164 @@
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, Optional, Tuple
+import asyncio
+import uuid
+from fastapi import HTTPException
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Query, Session
+from app.db.session import SessionLocal
+from app.db.pagination import encode_keyset_cursor, decode_keyset_cursor
+from app.models.models import AnalysisRecord
+from app.config import settings
+
+class AnalysisStore:
+    """
+    One analysis_records row per analysis, instead of the shared result files
+    that every analysis used to overwrite.
+
+    Rows get a fresh uuid (or the id of the job that produced them), so
+    concurrent writes never touch the same row, and each insert is its own
+    transaction. Lookups by id go through the primary key; listings by user
+    or job use the (user_id, created_at) and (job_id, created_at) indexes.
+    """
+
+    def __init__(self, model_version: str):
+        self.model_version = model_version
+
+    def save(
+        self,
+        db: Session,
+        result: Dict[str, Any],
+        resume_hash: Optional[str] = None,
+        job_description_hash: Optional[str] = None,
+        user_id: Optional[int] = None,
+        job_id: Optional[int] = None,
+        analysis_id: Optional[str] = None
+    ) -> AnalysisRecord:
+        record = AnalysisRecord(
+            id=analysis_id or str(uuid.uuid4()),
+            user_id=user_id,
+            job_id=job_id,
+            resume_hash=resume_hash,
+            job_description_hash=job_description_hash,
+            model_version=self.model_version,
+            overall_score=result.get("overall_score"),
+            result=result,
+            # Set here rather than by the database so it has microsecond
+            # precision everywhere; history pages are keyed on it
+            created_at=datetime.now(timezone.utc)
+        )
+        if analysis_id:
+            # A job re-run after an interruption replaces its earlier record
+            record = db.merge(record)
+        else:
+            db.add(record)
+        db.commit()
+        db.refresh(record)
+        return record
+
+    async def save_detached(self, result: Dict[str, Any], **kwargs) -> str:
+        """
+        save() with its own session, for background work. Returns the record id.
+        """
+        def save():
+            db = SessionLocal()
+            try:
+                return self.save(db, result, **kwargs).id
+            finally:
+                db.close()
+        return await asyncio.to_thread(save)
+
+    def get(self, db: Session, analysis_id: str) -> Optional[AnalysisRecord]:
+        return db.get(AnalysisRecord, analysis_id)
+
+    def history(self, db: Session, filters: Dict[str, Any], cursor: Optional[str] = None) -> Query:
+        """
+        Records matching filters, newest first, starting after cursor.
+
+        Pages are keyed on (created_at, id) rather than offsets, so every page
+        is an index range scan no matter how deep into the history it is.
+        Yields plain rows with the record's columns, not ORM objects: they
+        are only turned into response dicts (see analysis_record).
+        """
+        query = db.query(*AnalysisRecord.__table__.columns)
+        if filters.get("user_id") is not None:
+            query = query.filter(AnalysisRecord.user_id == filters["user_id"])
+        if filters.get("job_id") is not None:
+            query = query.filter(AnalysisRecord.job_id == filters["job_id"])
+        if filters.get("created_after") is not None:
+            query = query.filter(AnalysisRecord.created_at >= filters["created_after"])
+        if filters.get("created_before") is not None:
+            query = query.filter(AnalysisRecord.created_at < filters["created_before"])
+        if filters.get("min_score") is not None:
+            query = query.filter(AnalysisRecord.overall_score >= filters["min_score"])
+
+        if cursor:
+            created_at, record_id = decode_cursor(cursor)
+            query = query.filter(or_(
+                AnalysisRecord.created_at < created_at,
+                and_(AnalysisRecord.created_at == created_at, AnalysisRecord.id < record_id)
+            ))
+
+        return query.order_by(AnalysisRecord.created_at.desc(), AnalysisRecord.id.desc())
+
+    def page(
+        self,
+        db: Session,
+        filters: Dict[str, Any],
+        limit: int,
+        cursor: Optional[str] = None
+    ) -> Tuple[list, Optional[str]]:
+        """
+        One page of history plus the cursor for the next one (None on the last page)
+        """
+        records = self.history(db, filters, cursor).limit(limit + 1).all()
+        next_cursor = encode_cursor(records[limit - 1]) if len(records) > limit else None
+        return records[:limit], next_cursor
+
+    def stream(
+        self,
+        filters: Dict[str, Any],
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None,
+        chunk_size: int = 200
+    ) -> Iterator:
+        """
+        Iterate over matching history with its own session, fetching
+        chunk_size rows at a time so memory stays flat for any history size.
+        """
+        db = SessionLocal()
+        try:
+            query = self.history(db, filters, cursor).execution_options(stream_results=True)
+            if limit is not None:
+                query = query.limit(limit)
+            for record in query.yield_per(chunk_size):
+                yield record
+        finally:
+            db.close()
+
+def encode_cursor(record: AnalysisRecord) -> str:
+    return encode_keyset_cursor(record.created_at, record.id)
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    return decode_keyset_cursor(cursor)
+
+def analysis_record(record: AnalysisRecord) -> Dict[str, Any]:
+    return {
+        "analysis_id": record.id,
+        "user_id": record.user_id,
+        "job_id": record.job_id,
+        "resume_hash": record.resume_hash,
+        "job_description_hash": record.job_description_hash,
+        "model_version": record.model_version,
+        "overall_score": record.overall_score,
+        "created_at": record.created_at.isoformat() if record.created_at else None,
+        "result": record.result
+    }
+
+def get_analysis_or_404(db: Session, analysis_id: str) -> AnalysisRecord:
+    record = analysis_store.get(db, analysis_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Analysis not found")
+    return record
+
+analysis_store = AnalysisStore(model_version=settings.SCORING_MODEL_VERSION)
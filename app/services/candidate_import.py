@@ -0,0 +1,168 @@
+"""
+Bulk candidate import from a JSON array, NDJSON or CSV body.
+
+Records are validated with CandidateCreate, each distinct job is checked
+once, and the valid records are written with multi-row INSERT ... RETURNING
+statements, one transaction per chunk. Invalid records are reported by
+their position in the input instead of failing the whole import.
+"""
+import csv
+import io
+import json
+from typing import Any, Dict, List, Optional, Tuple
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.models.models import Candidate, Job, utcnow
+from app.schemas import CandidateCreate
+from app.services.skill_index import index_candidate_skills
+
+IMPORT_FORMATS = {
+    "application/json": "json",
+    "application/x-ndjson": "ndjson",
+    "application/ndjson": "ndjson",
+    "text/csv": "csv",
+}
+
+# Limits per import request
+MAX_IMPORT_SIZE = 50 * 1024 * 1024
+MAX_IMPORT_RECORDS = 100000
+
+# CSV cells holding JSON arrays
+CSV_JSON_COLUMNS = ("skills", "github_links")
+
+class ImportFormatError(ValueError):
+    """
+    The body as a whole cannot be read (bad JSON array, unknown format)
+    """
+
+def import_format(content_type: Optional[str], requested: Optional[str] = None) -> str:
+    if requested:
+        if requested not in IMPORT_FORMATS.values():
+            raise ImportFormatError(f"Unknown format {requested!r}. Use json, ndjson or csv.")
+        return requested
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    if media_type not in IMPORT_FORMATS:
+        raise ImportFormatError(
+            "Send application/json, application/x-ndjson or text/csv, or pass format=json|ndjson|csv"
+        )
+    return IMPORT_FORMATS[media_type]
+
+def _json_records(body: bytes):
+    try:
+        records = json.loads(body)
+    except ValueError as e:
+        raise ImportFormatError(f"Invalid JSON: {e}")
+    if not isinstance(records, list):
+        raise ImportFormatError("Expected a JSON array of candidates")
+    for record in records:
+        yield record, None
+
+def _ndjson_records(body: bytes):
+    for line in body.splitlines():
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line), None
+        except ValueError as e:
+            yield None, f"Invalid JSON: {e}"
+
+def _csv_records(body: bytes):
+    try:
+        text = body.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise ImportFormatError("CSV must be UTF-8")
+    for row in csv.DictReader(io.StringIO(text)):
+        # Empty cells are missing values, so optional fields get their defaults
+        record = {key: value for key, value in row.items() if key and value not in (None, "")}
+        try:
+            for column in CSV_JSON_COLUMNS:
+                if column in record:
+                    record[column] = json.loads(record[column])
+        except ValueError as e:
+            yield None, f"{column}: invalid JSON: {e}"
+            continue
+        yield record, None
+
+def _error_message(error: Dict[str, Any]) -> str:
+    location = ".".join(str(part) for part in error["loc"])
+    return f"{location}: {error['msg']}" if location else error["msg"]
+
+def validate_records(body: bytes, fmt: str, max_records: int = MAX_IMPORT_RECORDS) -> Tuple[List[Tuple[int, Dict[str, Any]]], List[Dict[str, Any]]]:
+    """
+    Parse and validate an import body. Returns (index, candidate row) for
+    every valid record, ready for insert(Candidate), and one error entry
+    per invalid record. CPU-bound: run it off the event loop.
+    """
+    records = {"json": _json_records, "ndjson": _ndjson_records, "csv": _csv_records}[fmt](body)
+    rows = []
+    errors = []
+    for index, (record, error) in enumerate(records):
+        if index >= max_records:
+            raise ImportFormatError(f"Too many candidates. Maximum is {max_records} per import.")
+        if error is not None:
+            errors.append({"index": index, "errors": [error]})
+            continue
+        try:
+            candidate = CandidateCreate.model_validate(record)
+        except ValidationError as e:
+            errors.append({"index": index, "errors": [_error_message(error) for error in e.errors()]})
+            continue
+        # JSON mode: skills and github_links go into JSON columns as plain values
+        rows.append((index, candidate.model_dump(mode="json")))
+    return rows, errors
+
+def _insert_candidates(connection: Connection, rows: List[Dict[str, Any]]) -> List[int]:
+    # The inserted rows come back in no particular order: asking for input
+    # order makes SQLAlchemy insert one row per statement on SQLite. They
+    # carry what the skill index needs, so they do not have to be matched up.
+    inserted = connection.execute(
+        insert(Candidate).returning(Candidate.id, Candidate.job_id, Candidate.created_at, Candidate.skills), rows
+    ).mappings().all()
+    # A Core insert skips the mapper events that keep candidate_skills in sync
+    index_candidate_skills(connection, inserted, replace=False)
+    return [candidate["id"] for candidate in inserted]
+
+async def import_candidates(
+    db: AsyncSession,
+    rows: List[Tuple[int, Dict[str, Any]]],
+    errors: List[Dict[str, Any]],
+    user_id: int
+) -> List[int]:
+    """
+    Insert validated rows into jobs owned by user_id. Rows for other jobs,
+    and every row of a chunk the database rejects, are added to errors.
+    Returns the new candidate ids, ascending.
+    """
+    job_ids = {row["job_id"] for _, row in rows}
+    owners = dict((await db.execute(select(Job.id, Job.created_by).where(Job.id.in_(job_ids)))).all()) if job_ids else {}
+
+    accepted = []
+    for index, row in rows:
+        if row["job_id"] not in owners:
+            errors.append({"index": index, "errors": ["job_id: Job not found"]})
+        elif owners[row["job_id"]] != user_id:
+            errors.append({"index": index, "errors": ["job_id: Not authorized to add candidates to this job"]})
+        else:
+            # Set here rather than by the column default so it can be copied into candidate_skills
+            row["created_at"] = utcnow()
+            accepted.append((index, row))
+
+    candidate_ids = []
+    chunk_size = max(settings.CANDIDATE_IMPORT_CHUNK_SIZE, 1)
+    for offset in range(0, len(accepted), chunk_size):
+        chunk = accepted[offset:offset + chunk_size]
+        try:
+            connection = await db.connection()
+            candidate_ids.extend(await connection.run_sync(_insert_candidates, [row for _, row in chunk]))
+            await db.commit()
+        except SQLAlchemyError as e:
+            await db.rollback()
+            print(f"Candidate import chunk of {len(chunk)} failed: {e}")
+            errors.extend({"index": index, "errors": ["Not imported: the database rejected this batch"]} for index, _ in chunk)
+
+    errors.sort(key=lambda error: error["index"])
+    return sorted(candidate_ids)
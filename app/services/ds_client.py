@@ -0,0 +1,99 @@
+from typing import Any, Dict, Optional
+import asyncio
+import httpx
+from app.services.resilience import AIMDLimiter, CircuitBreaker
+from app.config import settings
+
+class DataScienceClient:
+    """
+    Application-scoped HTTP client for the data science service.
+
+    One pooled httpx.AsyncClient is shared by every caller, so analyses reuse
+    keep-alive connections instead of opening a new TCP connection each time.
+    It is opened and closed by the FastAPI lifespan; code running outside an
+    app (scripts, benchmarks) gets one lazily on first use.
+
+    Every call passes through a circuit breaker and an adaptive concurrency
+    limiter, which raise UpstreamUnavailable instead of queueing requests
+    against an upstream that is down or slowing down. Timeouts, connection
+    errors and 5xx responses count as failures.
+    """
+
+    def __init__(self):
+        self._client: Optional[httpx.AsyncClient] = None
+        self.limiter = AIMDLimiter(
+            initial_limit=settings.DS_LIMIT_INITIAL,
+            min_limit=settings.DS_LIMIT_MIN,
+            max_limit=settings.DS_LIMIT_MAX,
+            latency_target=settings.DS_LATENCY_TARGET_SECONDS,
+            queue_timeout=settings.DS_LIMIT_QUEUE_TIMEOUT_SECONDS
+        )
+        self.breaker = CircuitBreaker(
+            failure_threshold=settings.DS_BREAKER_FAILURE_THRESHOLD,
+            reset_timeout=settings.DS_BREAKER_RESET_SECONDS
+        )
+        # Per-endpoint read timeouts, in seconds
+        self.timeouts = {
+            "analyze": settings.DS_ANALYZE_TIMEOUT_SECONDS,
+            "analyze_batch": settings.DS_ANALYZE_BATCH_TIMEOUT_SECONDS,
+            "history": settings.DS_HISTORY_TIMEOUT_SECONDS,
+            "analysis": settings.DS_HISTORY_TIMEOUT_SECONDS,
+        }
+
+    async def start(self):
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=settings.DS_SERVICE_URL,
+                http2=settings.DS_HTTP2,
+                limits=httpx.Limits(
+                    max_connections=settings.DS_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.DS_MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=settings.DS_KEEPALIVE_EXPIRY_SECONDS
+                ),
+                timeout=httpx.Timeout(
+                    settings.DS_ANALYZE_TIMEOUT_SECONDS,
+                    connect=settings.DS_CONNECT_TIMEOUT_SECONDS
+                )
+            )
+
+    async def stop(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def request(self, method: str, path: str, endpoint: str, cost: int = 1, **kwargs) -> httpx.Response:
+        """
+        Send a request through the breaker and the limiter. cost is how many
+        single analyses the call stands for (the batch size for /analyze-batch).
+        """
+        await self.start()
+        timeout = httpx.Timeout(self.timeouts[endpoint], connect=settings.DS_CONNECT_TIMEOUT_SECONDS)
+
+        self.breaker.before_call()
+        try:
+            async with self.limiter.slot(cost):
+                response = await self._client.request(method, path, timeout=timeout, **kwargs)
+        except httpx.TransportError:
+            self.breaker.record_failure()
+            raise
+        except (asyncio.CancelledError, Exception):
+            # Cancelled, shed by the limiter (UpstreamUnavailable) or failed
+            # on our side: no verdict on the upstream, but a half-open probe
+            # must not stay in flight or the breaker never lets another through
+            self.breaker.abandon_probe()
+            raise
+
+        if response.status_code >= 500:
+            self.limiter.record_failure()
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+        return response
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "concurrency_limiter": self.limiter.stats(),
+            "circuit_breaker": self.breaker.stats()
+        }
+
+ds_client = DataScienceClient()
@@ -0,0 +1,87 @@
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Iterator, Optional, Set
+import asyncio
+import json
+import time
+
+# Stages after which nothing more is published for a topic
+TERMINAL_STAGES = {"scored", "failed"}
+
+class ProgressBus:
+    """
+    In-process publish/subscribe for analysis progress events.
+
+    Each topic (an analysis job id) keeps its subscribers' queues and the last
+    few events, so a client that subscribes late or reconnects with
+    Last-Event-ID still sees what it missed. Publishing touches only the
+    subscribers of that one topic, and an idle subscriber is just a coroutine
+    suspended on its queue, so thousands of them cost next to nothing.
+    A subscriber that falls behind loses its oldest events rather than
+    growing without bound.
+    """
+
+    def __init__(self, max_topics: int, history_size: int, subscriber_queue_size: int):
+        self.max_topics = max_topics
+        self.history_size = history_size
+        self.subscriber_queue_size = subscriber_queue_size
+        self._history: "OrderedDict[str, Deque[Dict[str, Any]]]" = OrderedDict()
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._next_id: Dict[str, int] = {}
+        self.published = 0
+        self.dropped = 0
+
+    def publish(self, topic: str, stage: str, **data) -> Dict[str, Any]:
+        event_id = self._next_id.get(topic, 0) + 1
+        self._next_id[topic] = event_id
+        event = {"id": event_id, "topic": topic, "stage": stage, "at": time.time(), **data}
+
+        history = self._history.get(topic)
+        if history is None:
+            history = self._history[topic] = deque(maxlen=self.history_size)
+        self._history.move_to_end(topic)
+        history.append(event)
+        while len(self._history) > self.max_topics:
+            oldest, _ = self._history.popitem(last=False)
+            self._next_id.pop(oldest, None)
+
+        for queue in self._subscribers.get(topic, ()):
+            if queue.full():
+                queue.get_nowait()
+                self.dropped += 1
+            queue.put_nowait(event)
+        self.published += 1
+        return event
+
+    @contextmanager
+    def subscribe(self, topic: str, last_event_id: Optional[int] = None) -> Iterator[asyncio.Queue]:
+        """
+        Queue of the topic's events, starting with the buffered ones newer
+        than last_event_id
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.subscriber_queue_size)
+        for event in self._history.get(topic, ()):
+            if last_event_id is None or event["id"] > last_event_id:
+                queue.put_nowait(event)
+        self._subscribers.setdefault(topic, set()).add(queue)
+        try:
+            yield queue
+        finally:
+            subscribers = self._subscribers.get(topic)
+            if subscribers is not None:
+                subscribers.discard(queue)
+                if not subscribers:
+                    del self._subscribers[topic]
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "topics": len(self._history),
+            "subscribers": sum(len(queues) for queues in self._subscribers.values()),
+            "published": self.published,
+            "dropped": self.dropped
+        }
+
+def sse_event(event: Dict[str, Any]) -> str:
+    return f"id: {event['id']}\nevent: {event['stage']}\ndata: {json.dumps(event)}\n\n"
+
+progress_bus = ProgressBus(max_topics=10000, history_size=20, subscriber_queue_size=100)
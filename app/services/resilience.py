@@ -0,0 +1,184 @@
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, Dict, Optional
+import asyncio
+import math
+import time
+
+class UpstreamUnavailable(Exception):
+    """
+    The upstream is unhealthy or saturated; retry after `retry_after` seconds
+    """
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class AIMDLimiter:
+    """
+    Adaptive concurrency limit for calls to one upstream.
+
+    The limit grows additively (about +1 per limit's worth of fast successes)
+    while observed latency stays under latency_target, and shrinks
+    multiplicatively when a call is slow or fails. Callers over the limit wait
+    up to queue_timeout for a slot and are then shed with UpstreamUnavailable,
+    so a slow upstream sees less load instead of a growing pile of requests.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int,
+        min_limit: int,
+        max_limit: int,
+        latency_target: float,
+        queue_timeout: float,
+        backoff: float = 0.7
+    ):
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_target = latency_target
+        self.queue_timeout = queue_timeout
+        self.backoff = backoff
+        self.in_flight = 0
+        self.rejected = 0
+        self.latency_ewma: Optional[float] = None
+        self._condition = asyncio.Condition()
+
+    @asynccontextmanager
+    async def slot(self, cost: int = 1):
+        """
+        Hold one slot for a call. A call doing the work of `cost` single
+        calls (a batch) is sampled at its latency per unit of work, so a
+        batch taking longer than one call does not read as a slow upstream.
+        """
+        await self._acquire()
+        started = time.monotonic()
+        try:
+            yield
+        except Exception:
+            self._on_drop()
+            raise
+        else:
+            self._on_sample((time.monotonic() - started) / max(cost, 1))
+        finally:
+            await self._release()
+
+    def record_failure(self):
+        """
+        Count a call that returned but failed (e.g. a 5xx) as a drop
+        """
+        self._on_drop()
+
+    async def _acquire(self):
+        async with self._condition:
+            try:
+                await asyncio.wait_for(
+                    self._condition.wait_for(lambda: self.in_flight < math.floor(self.limit)),
+                    timeout=self.queue_timeout
+                )
+            except asyncio.TimeoutError:
+                self.rejected += 1
+                raise UpstreamUnavailable("Data science service is saturated", retry_after=1)
+            self.in_flight += 1
+
+    async def _release(self):
+        async with self._condition:
+            self.in_flight -= 1
+            self._condition.notify()
+
+    def _on_sample(self, latency: float):
+        self.latency_ewma = latency if self.latency_ewma is None else 0.8 * self.latency_ewma + 0.2 * latency
+        if latency > self.latency_target:
+            self._decrease()
+        else:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+    def _on_drop(self):
+        self._decrease()
+
+    def _decrease(self):
+        self.limit = max(self.min_limit, self.limit * self.backoff)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "limit": math.floor(self.limit),
+            "in_flight": self.in_flight,
+            "rejected": self.rejected,
+            "latency_ewma_seconds": self.latency_ewma,
+            "latency_target_seconds": self.latency_target
+        }
+
+class CircuitBreaker:
+    """
+    Classic closed / open / half-open breaker.
+
+    After failure_threshold consecutive failures the breaker opens and calls
+    fail fast for reset_timeout seconds. It then lets a single probe through
+    (half-open): success closes it again, failure re-opens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.rejected = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self.transition_counts = {self.CLOSED: 0, self.OPEN: 0, self.HALF_OPEN: 0}
+        self.transitions = deque(maxlen=20)
+
+    def before_call(self):
+        if self.state == self.OPEN:
+            remaining = self._opened_at + self.reset_timeout - time.monotonic()
+            if remaining > 0:
+                self.rejected += 1
+                raise UpstreamUnavailable("Data science service is unavailable", retry_after=remaining)
+            self._transition(self.HALF_OPEN)
+
+        if self.state == self.HALF_OPEN:
+            if self._probe_in_flight:
+                self.rejected += 1
+                raise UpstreamUnavailable("Data science service is recovering", retry_after=1)
+            self._probe_in_flight = True
+
+    def record_success(self):
+        self._probe_in_flight = False
+        self.consecutive_failures = 0
+        if self.state != self.CLOSED:
+            self._transition(self.CLOSED)
+
+    def record_failure(self):
+        self._probe_in_flight = False
+        self.consecutive_failures += 1
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            self._opened_at = time.monotonic()
+            if self.state != self.OPEN:
+                self._transition(self.OPEN)
+
+    def abandon_probe(self):
+        """
+        The half-open probe ended without a verdict on the upstream
+        (cancelled, shed by the limiter, or failed on our side)
+        """
+        self._probe_in_flight = False
+
+    def _transition(self, state: str):
+        print(f"Circuit breaker: {self.state} -> {state}")
+        self.transitions.append({"from": self.state, "to": state, "at": time.time()})
+        self.transition_counts[state] += 1
+        self.state = state
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "rejected": self.rejected,
+            "transition_counts": self.transition_counts,
+            "recent_transitions": list(self.transitions)
+        }
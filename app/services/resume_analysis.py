@@ -1,15 +1,171 @@
-from typing import Dict, Any
+from typing import Dict, Any, AsyncIterator, List, Optional
+import asyncio
+import math
 import httpx
 from pathlib import Path
 import os
 from fastapi import HTTPException
+from app.services.ds_client import DataScienceClient, ds_client
+from app.services.analysis_cache import AnalysisCache, analysis_cache, hash_file, hash_job_description
+from app.services.resilience import UpstreamUnavailable
+from app.services.singleflight import SingleFlight
+from app.config import settings
+
+# Shared by all service instances so identical concurrent analyses coalesce
+analysis_flights = SingleFlight()
+
+def upstream_unavailable_exception(error: UpstreamUnavailable) -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail=str(error),
+        headers={"Retry-After": str(max(1, math.ceil(error.retry_after)))}
+    )
 
 class ResumeAnalysisService:
-    def __init__(self):
-        # TODO: Move to environment variables
-        self.ds_service_url = "http://localhost:5000"
+    def __init__(
+        self,
+        client: DataScienceClient = ds_client,
+        cache: AnalysisCache = analysis_cache,
+        flights: SingleFlight = analysis_flights
+    ):
+        self.client = client
+        self.cache = cache
+        self.flights = flights
+        
+    async def analyze_resume(self, resume_path: Path, job_description: str, resume_hash: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Analyze a resume against a job description, answering from the result
+        cache when the same resume content was already scored against the same
+        job description. Concurrent misses for the same pair share a single
+        upstream call. Pass resume_hash when the caller already knows it.
+        """
+        if resume_hash is None:
+            resume_hash = await asyncio.to_thread(hash_file, resume_path)
+        job_description_hash = hash_job_description(job_description)
+        
+        cached = await self.cache.get(resume_hash, job_description_hash)
+        if cached is not None:
+            return cached
         
-    async def analyze_resume(self, resume_path: Path, job_description: str) -> Dict[str, Any]:
+        async def analyze_and_cache():
+            result = await self._request_analysis(resume_path, job_description)
+            await self.cache.put(resume_hash, job_description_hash, result)
+            return result
+        
+        return await self.flights.do((resume_hash, job_description_hash), analyze_and_cache)
+        
+    async def analyze_batch(
+        self,
+        items: List[Dict[str, Any]],
+        batch_size: int = settings.ANALYSIS_BATCH_SIZE,
+        concurrency: int = settings.ANALYSIS_BATCH_CONCURRENCY
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Analyze many (resume, job description) pairs, yielding one outcome per
+        item as soon as it is known.
+
+        Each item needs resume_path, resume_hash and job_description; its "ref"
+        dict is copied into the outcome so callers can tell results apart.
+        Cached pairs are answered first; the rest go to the data science
+        service in batches of batch_size, each distinct job description sent
+        once per batch, with up to `concurrency` batches in flight.
+        """
+        pending: Dict[tuple, List[Dict[str, Any]]] = {}
+        for item in items:
+            key = (item["resume_hash"], hash_job_description(item["job_description"]))
+            if key in pending:
+                pending[key].append(item)
+                continue
+            cached = await self.cache.get(*key)
+            if cached is not None:
+                yield {**item.get("ref", {}), "status": "completed", "cached": True, "result": cached}
+            else:
+                pending[key] = [item]
+
+        keys = list(pending)
+        batches = [keys[i:i + batch_size] for i in range(0, len(keys), batch_size)]
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def run_batch(batch_keys):
+            async with semaphore:
+                try:
+                    results = await self._request_batch_analysis([pending[key][0] for key in batch_keys])
+                except HTTPException as e:
+                    return batch_keys, None, e.detail
+                for key, result in zip(batch_keys, results):
+                    await self.cache.put(*key, result)
+                return batch_keys, results, None
+
+        tasks = [asyncio.create_task(run_batch(batch)) for batch in batches]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                batch_keys, results, error = await finished
+                for position, key in enumerate(batch_keys):
+                    for item in pending[key]:
+                        if error is None:
+                            yield {**item.get("ref", {}), "status": "completed", "cached": False, "result": results[position]}
+                        else:
+                            yield {**item.get("ref", {}), "status": "failed", "error": error}
+        finally:
+            # Client went away: stop the batches that are still running
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _request_batch_analysis(self, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Send one batch to the data science service's /analyze-batch endpoint.
+        Results come back in item order.
+        """
+        job_descriptions: Dict[str, str] = {}
+        payload_items = []
+        for item in items:
+            job_description_hash = hash_job_description(item["job_description"])
+            job_descriptions.setdefault(job_description_hash, item["job_description"])
+            payload_items.append({
+                "resume_path": str(item["resume_path"]),
+                "job_description_id": job_description_hash
+            })
+
+        try:
+            response = await self.client.request(
+                "POST",
+                "/analyze-batch",
+                endpoint="analyze_batch",
+                cost=len(items),
+                json={"job_descriptions": job_descriptions, "items": payload_items}
+            )
+
+            if response.status_code != 200:
+                raise HTTPException(
+                    status_code=500,
+                    detail=f"Data science service error: {response.text}"
+                )
+
+            results = response.json()["results"]
+            if len(results) != len(items):
+                raise HTTPException(
+                    status_code=500,
+                    detail="Data science service returned an incomplete batch"
+                )
+            return results
+
+        except HTTPException:
+            raise
+        except UpstreamUnavailable as e:
+            raise upstream_unavailable_exception(e)
+        except httpx.TimeoutException:
+            raise HTTPException(
+                status_code=504,
+                detail="Data science service timeout"
+            )
+        except Exception as e:
+            raise HTTPException(
+                status_code=500,
+                detail=f"Error communicating with data science service: {str(e)}"
+            )
+
+    async def _request_analysis(self, resume_path: Path, job_description: str) -> Dict[str, Any]:
         """
         Send resume and job description to data science service for analysis
         """
@@ -21,21 +177,20 @@ class ResumeAnalysisService:
             }
             
             # Make request to data science service
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.ds_service_url}/analyze",
-                    json=data,
-                    timeout=30.0  # 30 second timeout
+            response = await self.client.request("POST", "/analyze", endpoint="analyze", json=data)
+            
+            if response.status_code != 200:
+                raise HTTPException(
+                    status_code=500,
+                    detail=f"Data science service error: {response.text}"
                 )
+            
+            return response.json()
                 
-                if response.status_code != 200:
-                    raise HTTPException(
-                        status_code=500,
-                        detail=f"Data science service error: {response.text}"
-                    )
-                
-                return response.json()
-                
+        except HTTPException:
+            raise
+        except UpstreamUnavailable as e:
+            raise upstream_unavailable_exception(e)
         except httpx.TimeoutException:
             raise HTTPException(
                 status_code=504,
@@ -52,20 +207,20 @@ class ResumeAnalysisService:
         Get history of resume analyses
         """
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.ds_service_url}/history",
-                    timeout=10.0
+            response = await self.client.request("GET", "/history", endpoint="history")
+            
+            if response.status_code != 200:
+                raise HTTPException(
+                    status_code=500,
+                    detail="Error fetching analysis history"
                 )
                 
-                if response.status_code != 200:
-                    raise HTTPException(
-                        status_code=500,
-                        detail="Error fetching analysis history"
-                    )
-                    
-                return response.json()
+            return response.json()
                 
+        except HTTPException:
+            raise
+        except UpstreamUnavailable as e:
+            raise upstream_unavailable_exception(e)
         except Exception as e:
             raise HTTPException(
                 status_code=500,
@@ -77,20 +232,20 @@ class ResumeAnalysisService:
         Get specific analysis result by ID
         """
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.ds_service_url}/analysis/{analysis_id}",
-                    timeout=10.0
+            response = await self.client.request("GET", f"/analysis/{analysis_id}", endpoint="analysis")
+            
+            if response.status_code != 200:
+                raise HTTPException(
+                    status_code=404,
+                    detail="Analysis not found"
                 )
                 
-                if response.status_code != 200:
-                    raise HTTPException(
-                        status_code=404,
-                        detail="Analysis not found"
-                    )
-                    
-                return response.json()
+            return response.json()
                 
+        except HTTPException:
+            raise
+        except UpstreamUnavailable as e:
+            raise upstream_unavailable_exception(e)
         except Exception as e:
             raise HTTPException(
                 status_code=500,
@@ -0,0 +1,235 @@
+from pathlib import Path
+from typing import AsyncIterator, BinaryIO, Callable, Dict, Any, List, Optional, Tuple
+import asyncio
+import hashlib
+import os
+import zipfile
+from app.db.session import SessionLocal
+from app.models.models import ResumeUpload
+from app.services.resume_store import resume_store
+from app.services.virus_scanner import scan_service, ScannerUnavailable
+from app.services.resume_analysis import ResumeAnalysisService
+from app.services.analysis_cache import hash_job_description
+from app.services.analysis_store import analysis_store
+from app.config import settings
+
+COPY_CHUNK_SIZE = 1024 * 1024
+
+class IngestError(Exception):
+    """
+    A single file failed one of the pipeline stages
+    """
+
+    def __init__(self, stage: str, message: str):
+        super().__init__(message)
+        self.stage = stage
+
+def copy_and_hash(source: BinaryIO, dest_path: Path, max_size: int) -> Tuple[int, str]:
+    """
+    Copy a file object to dest_path, hashing it on the way.
+    Runs in a worker thread; hashlib releases the GIL on large chunks so
+    several copies proceed in parallel across cores.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    with open(dest_path, "wb") as out:
+        while True:
+            chunk = source.read(COPY_CHUNK_SIZE)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > max_size:
+                raise IngestError("validated", f"File too large. Maximum size is {max_size // (1024 * 1024)}MB.")
+            digest.update(chunk)
+            out.write(chunk)
+    return size, digest.hexdigest()
+
+# Both run on a worker thread with their own session; the returned upload
+# is detached but loaded
+
+def reference_existing_blob(user_id: int, content_hash: str, filename: str) -> Optional[ResumeUpload]:
+    db = SessionLocal()
+    try:
+        blob = resume_store.get_blob(db, content_hash)
+        if blob is None:
+            return None
+        return resume_store.add_reference(db, blob, user_id, filename)
+    finally:
+        db.close()
+
+def store_new_blob(user_id: int, temp_path: Path, content_hash: str, size: int, filename: str) -> ResumeUpload:
+    db = SessionLocal()
+    try:
+        blob = resume_store.commit_blob(db, temp_path, content_hash, size)
+        return resume_store.add_reference(db, blob, user_id, filename)
+    finally:
+        db.close()
+
+class IngestItem:
+    """
+    One resume in a bulk request. `opener` returns a readable binary file
+    object and is called from a worker thread during the hash stage;
+    `release` frees whatever backs the item once the pipeline is done with it.
+    """
+
+    def __init__(self, filename: str, opener: Callable[[], BinaryIO], release: Optional[Callable[[], None]] = None):
+        self.filename = filename
+        self.opener = opener
+        self._release = release
+
+    def close(self) -> None:
+        if self._release:
+            release, self._release = self._release, None
+            release()
+
+def detach_upload(filename: str, file: BinaryIO) -> IngestItem:
+    """
+    Keep a multipart upload readable after the request handler returns.
+    FastAPI closes form files before a streaming response is sent, so hold a
+    duplicate descriptor of the spooled temp file instead of copying it.
+    """
+    fd = os.dup(file.fileno())
+
+    def opener() -> BinaryIO:
+        source = os.fdopen(os.dup(fd), "rb")
+        source.seek(0)
+        return source
+
+    return IngestItem(filename, opener, release=lambda: os.close(fd))
+
+class ResumeIngestPipeline:
+    """
+    Runs every item through validate -> hash -> scan -> store -> analyze.
+
+    Items are processed concurrently, at most `concurrency` at a time; the
+    blocking parts (copying/hashing, DB writes) run in worker threads and
+    scanning uses the scanner's own bounded pool, so throughput is limited by
+    cores and disks rather than by the number of HTTP requests. Progress is
+    reported as one event per file and stage.
+    """
+
+    def __init__(
+        self,
+        user_id: int,
+        allowed_extensions: set,
+        max_file_size: int,
+        job_description: Optional[str] = None,
+        job_id: Optional[int] = None,
+        concurrency: int = settings.BULK_UPLOAD_CONCURRENCY
+    ):
+        self.user_id = user_id
+        self.allowed_extensions = allowed_extensions
+        self.max_file_size = max_file_size
+        self.job_description = job_description
+        self.job_id = job_id
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._analysis_service = ResumeAnalysisService()
+
+    async def run(self, items: List[IngestItem]) -> AsyncIterator[Dict[str, Any]]:
+        events: asyncio.Queue = asyncio.Queue()
+        summary = {"total": len(items), "stored": 0, "duplicates": 0, "failed": 0}
+
+        async def worker(index: int, item: IngestItem):
+            try:
+                async with self._semaphore:
+                    outcome = await self._process(index, item, events)
+                    summary[outcome] += 1
+            except Exception as e:
+                summary["failed"] += 1
+                await events.put({
+                    "index": index,
+                    "file": item.filename,
+                    "stage": "failed",
+                    "failed_stage": getattr(e, "stage", None),
+                    "error": str(e)
+                })
+            finally:
+                item.close()
+
+        tasks = [asyncio.create_task(worker(index, item)) for index, item in enumerate(items)]
+        done = asyncio.gather(*tasks)
+        done.add_done_callback(lambda _: events.put_nowait(None))
+        try:
+            while True:
+                event = await events.get()
+                if event is None:
+                    break
+                yield event
+            yield {"stage": "completed", "summary": summary}
+        finally:
+            # Client went away: stop whatever is still running
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            for item in items:
+                item.close()
+
+    async def _process(self, index: int, item: IngestItem, events: asyncio.Queue) -> str:
+        def report(stage: str, **details):
+            events.put_nowait({"index": index, "file": item.filename, "stage": stage, **details})
+
+        extension = os.path.splitext(item.filename)[1].lower()
+        if extension not in self.allowed_extensions:
+            raise IngestError("validated", "Only PDF, DOC, and DOCX files are allowed")
+        report("validated")
+
+        temp_path = resume_store.temp_path()
+        try:
+            size, content_hash = await asyncio.to_thread(self._copy_item, item, temp_path)
+            report("hashed", size=size, sha256=content_hash)
+
+            stored = await asyncio.to_thread(reference_existing_blob, self.user_id, content_hash, item.filename)
+            outcome = "duplicates"
+            if stored is None:
+                outcome = "stored"
+                try:
+                    verdict = await scan_service.scan(str(temp_path), content_hash, extension)
+                except ScannerUnavailable as e:
+                    raise IngestError("scanned", f"Virus scanner unavailable: {str(e)}")
+                if not verdict.clean:
+                    raise IngestError("scanned", "File failed virus scan")
+                report("scanned")
+
+                stored = await asyncio.to_thread(
+                    store_new_blob, self.user_id, temp_path, content_hash, size, item.filename
+                )
+            report("stored", duplicate=outcome == "duplicates", file_id=stored.id, blob_id=content_hash)
+        finally:
+            if temp_path.exists():
+                os.remove(temp_path)
+
+        if self.job_description:
+            try:
+                analysis = await self._analysis_service.analyze_resume(
+                    resume_store.blob_path(content_hash), self.job_description, resume_hash=content_hash
+                )
+            except Exception as e:
+                raise IngestError("analyzed", getattr(e, "detail", str(e)))
+            analysis_id = await analysis_store.save_detached(
+                analysis,
+                resume_hash=content_hash,
+                job_description_hash=hash_job_description(self.job_description),
+                user_id=self.user_id,
+                job_id=self.job_id
+            )
+            report("analyzed", analysis_id=analysis_id, analysis=analysis)
+
+        return outcome
+
+    def _copy_item(self, item: IngestItem, temp_path: Path) -> Tuple[int, str]:
+        with item.opener() as source:
+            return copy_and_hash(source, temp_path, self.max_file_size)
+
+def archive_items(archive: zipfile.ZipFile, max_files: int) -> List[IngestItem]:
+    """
+    One IngestItem per regular file in a zip archive
+    """
+    items = []
+    for info in archive.infolist():
+        name = os.path.basename(info.filename)
+        if info.is_dir() or not name or name.startswith(".") or info.filename.startswith("__MACOSX/"):
+            continue
+        if len(items) >= max_files:
+            raise IngestError("validated", f"Too many files. Maximum is {max_files} per request.")
+        items.append(IngestItem(name, lambda info=info: archive.open(info)))
+    return items
@@ -0,0 +1,117 @@
+from pathlib import Path
+from typing import Optional
+import os
+import threading
+import uuid
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.models.models import ResumeBlob, ResumeUpload
+from app.config import settings
+
+class ResumeStore:
+    """
+    Content-addressed storage for resume files.
+
+    Each distinct file is stored once under blobs/<aa>/<bb>/<sha256>, where
+    aa and bb are the first two byte pairs of its SHA-256. Every user upload
+    is a ResumeUpload row pointing at a shared ResumeBlob, and the blob keeps a
+    reference count so the file is removed once the last upload is deleted.
+
+    Storing and deleting the same blob are serialized per hash (striped
+    locks), so a release cannot unlink a file that a concurrent upload has
+    just put back. The lock is per process; across processes release also
+    re-checks the row before it unlinks.
+    """
+
+    LOCK_STRIPES = 64
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+        self.blob_dir = self.root / "blobs"
+        self.tmp_dir = self.root / "tmp"
+        self._locks = [threading.Lock() for _ in range(self.LOCK_STRIPES)]
+
+    def _lock(self, sha256: str) -> threading.Lock:
+        return self._locks[int(sha256[:8], 16) % self.LOCK_STRIPES]
+
+    def blob_path(self, sha256: str) -> Path:
+        return self.blob_dir / sha256[:2] / sha256[2:4] / sha256
+
+    def temp_path(self) -> Path:
+        """
+        Path for an upload that is still being received
+        """
+        self.tmp_dir.mkdir(parents=True, exist_ok=True)
+        return self.tmp_dir / f"{uuid.uuid4()}.part"
+
+    def get_blob(self, db: Session, sha256: str) -> Optional[ResumeBlob]:
+        return db.query(ResumeBlob).filter(ResumeBlob.sha256 == sha256).first()
+
+    def commit_blob(self, db: Session, temp_path: Path, sha256: str, size: int) -> ResumeBlob:
+        """
+        Move a fully received and scanned temp file into the blob tree
+        """
+        path = self.blob_path(sha256)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock(sha256):
+            # Row first: a release that sees it leaves the file alone
+            blob = ResumeBlob(sha256=sha256, size=size, ref_count=0)
+            db.add(blob)
+            try:
+                db.commit()
+            except IntegrityError:
+                # A concurrent upload of the same content stored it first
+                db.rollback()
+                blob = self.get_blob(db, sha256)
+            # Same content either way; this also restores a file that a
+            # release removed just before the row came back
+            os.replace(temp_path, path)
+        return blob
+
+    def add_reference(self, db: Session, blob: ResumeBlob, user_id: int, filename: str) -> Optional[ResumeUpload]:
+        """
+        Record a user's logical upload of an existing blob.
+        Returns None if the blob was released in the meantime.
+        """
+        updated = db.query(ResumeBlob).filter(ResumeBlob.sha256 == blob.sha256).update(
+            {ResumeBlob.ref_count: ResumeBlob.ref_count + 1},
+            synchronize_session=False
+        )
+        if not updated:
+            db.rollback()
+            return None
+        upload = ResumeUpload(
+            id=str(uuid.uuid4()),
+            user_id=user_id,
+            blob_sha256=blob.sha256,
+            original_filename=filename
+        )
+        db.add(upload)
+        db.commit()
+        db.refresh(upload)
+        return upload
+
+    def release(self, db: Session, upload: ResumeUpload) -> None:
+        """
+        Drop a logical upload and delete the blob when nothing references it
+        """
+        sha256 = upload.blob_sha256
+        with self._lock(sha256):
+            db.delete(upload)
+            db.query(ResumeBlob).filter(ResumeBlob.sha256 == sha256).update(
+                {ResumeBlob.ref_count: ResumeBlob.ref_count - 1},
+                synchronize_session=False
+            )
+            deleted = db.query(ResumeBlob).filter(
+                ResumeBlob.sha256 == sha256,
+                ResumeBlob.ref_count <= 0
+            ).delete(synchronize_session=False)
+            db.commit()
+
+            # Another upload may have stored the same content again since
+            if deleted and self.get_blob(db, sha256) is None:
+                path = self.blob_path(sha256)
+                if path.exists():
+                    os.remove(path)
+
+resume_store = ResumeStore(settings.UPLOAD_DIR)
@@ -0,0 +1,58 @@
+from typing import Any, Awaitable, Callable, Dict, Hashable
+import asyncio
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key into one in-flight call.
+
+    The first caller for a key starts the work as its own task; callers that
+    arrive while it is running wait on the same task and get the same result
+    or exception. A waiter that is cancelled only stops waiting: the shared
+    call keeps running for the others, and is cancelled only when every
+    waiter has gone away.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, "_Call"] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        call = self._calls.get(key)
+        if call is None or call.abandoned:
+            call = _Call(asyncio.create_task(fn()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda _: self._forget(key, call))
+            self.calls += 1
+        else:
+            self.coalesced += 1
+
+        call.waiters += 1
+        try:
+            # shield: cancelling this waiter must not cancel the shared task
+            return await asyncio.shield(call.task)
+        except asyncio.CancelledError:
+            if call.task.cancelled():
+                raise
+            call.waiters -= 1
+            if call.waiters == 0:
+                call.abandoned = True
+                call.task.cancel()
+            raise
+
+    def _forget(self, key: Hashable, call: "_Call"):
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "in_flight": len(self._calls),
+            "upstream_calls": self.calls,
+            "coalesced_requests": self.coalesced
+        }
+
+class _Call:
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+        self.abandoned = False
@@ -0,0 +1,139 @@
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+from sqlalchemy import Select, delete, event, insert, inspect, select
+from sqlalchemy.engine import Connection, Engine
+from app.models.models import Candidate, CandidateSkill
+
+# Candidates re-indexed per transaction when backfilling
+BACKFILL_CHUNK_SIZE = 1000
+
+# Candidate listings filtered by skill are keyed on these copies of
+# (Candidate.created_at, Candidate.id), so the skill index drives the scan
+SKILL_LISTING_KEY = (CandidateSkill.created_at, CandidateSkill.candidate_id)
+
+def skill_name(name: str) -> str:
+    return name.strip().lower()
+
+def skill_rows(
+    candidate_id: int,
+    job_id: Optional[int],
+    created_at: Optional[datetime],
+    skills: Optional[Iterable[Dict[str, Any]]]
+) -> List[Dict[str, Any]]:
+    """
+    candidate_skills rows for one candidate's skills JSON. Entries without
+    a name are skipped; repeated names keep their strongest entry, so a
+    candidate matches a skill filter through at most one row.
+    """
+    rows: Dict[str, Dict[str, Any]] = {}
+    for skill in skills or []:
+        name = skill_name(str(skill.get("name") or ""))
+        if not name:
+            continue
+        row = {
+            "candidate_id": candidate_id,
+            "job_id": job_id,
+            "created_at": created_at,
+            "name": name,
+            "years_experience": float(skill.get("yearsExperience") or 0),
+            "confidence": float(skill.get("confidence") or 0),
+        }
+        previous = rows.get(name)
+        if previous is None or row["years_experience"] > previous["years_experience"]:
+            rows[name] = row
+    return list(rows.values())
+
+def index_candidate_skills(connection: Connection, candidates: Iterable[Dict[str, Any]], replace: bool = True):
+    """
+    (Re)write the candidate_skills rows of candidates, given as dicts with
+    id, job_id, created_at and skills. For writers that bypass the ORM
+    (bulk inserts); ORM writes are picked up by the mapper events below.
+    """
+    candidates = list(candidates)
+    if replace and candidates:
+        connection.execute(
+            delete(CandidateSkill.__table__).where(
+                CandidateSkill.__table__.c.candidate_id.in_([candidate["id"] for candidate in candidates])
+            )
+        )
+    rows = [
+        row
+        for candidate in candidates
+        for row in skill_rows(candidate["id"], candidate.get("job_id"), candidate.get("created_at"), candidate.get("skills"))
+    ]
+    if rows:
+        connection.execute(insert(CandidateSkill.__table__), rows)
+
+@event.listens_for(Candidate, "after_insert")
+@event.listens_for(Candidate, "after_update")
+def _index_candidate(mapper, connection, target):
+    state = inspect(target)
+    if state.attrs.skills.history.has_changes() or state.attrs.job_id.history.has_changes():
+        index_candidate_skills(connection, [{
+            "id": target.id,
+            "job_id": target.job_id,
+            "created_at": target.created_at,
+            "skills": target.skills
+        }])
+
+@event.listens_for(Candidate, "after_delete")
+def _unindex_candidate(mapper, connection, target):
+    # Not left to ON DELETE CASCADE: SQLite ignores it unless foreign keys are on
+    connection.execute(delete(CandidateSkill.__table__).where(CandidateSkill.__table__.c.candidate_id == target.id))
+
+def skill_matches(
+    skill: str,
+    min_years: Optional[float] = None,
+    min_confidence: Optional[float] = None,
+    job_id: Optional[int] = None
+) -> Select:
+    """
+    The candidate_skills rows of candidates with skill: one per candidate,
+    so also what to count for a total
+    """
+    matches = select(CandidateSkill.candidate_id).where(CandidateSkill.name == skill_name(skill))
+    if job_id is not None:
+        matches = matches.where(CandidateSkill.job_id == job_id)
+    if min_years is not None:
+        matches = matches.where(CandidateSkill.years_experience >= min_years)
+    if min_confidence is not None:
+        matches = matches.where(CandidateSkill.confidence >= min_confidence)
+    return matches
+
+def skill_filter(
+    stmt: Select,
+    skill: str,
+    min_years: Optional[float] = None,
+    min_confidence: Optional[float] = None,
+    job_id: Optional[int] = None
+) -> Select:
+    """
+    Narrow a select(Candidate) to candidates with skill. Page it with
+    keyset_page(..., key=SKILL_LISTING_KEY).
+    """
+    matches = skill_matches(skill, min_years, min_confidence, job_id).whereclause
+    return stmt.join(CandidateSkill, CandidateSkill.candidate_id == Candidate.id).where(matches)
+
+def backfill_candidate_skills(engine: Engine):
+    """
+    Index candidates written before candidate_skills existed. Only runs
+    while the table is empty, so it is a single cheap query afterwards.
+    """
+    with engine.connect() as connection:
+        if connection.execute(select(CandidateSkill.id).limit(1)).first() is not None:
+            return
+        if connection.execute(select(Candidate.id).limit(1)).first() is None:
+            return
+
+    print("Indexing existing candidate skills")
+    last_id = 0
+    while True:
+        with engine.begin() as connection:
+            candidates = connection.execute(
+                select(Candidate.id, Candidate.job_id, Candidate.created_at, Candidate.skills)
+                .where(Candidate.id > last_id).order_by(Candidate.id).limit(BACKFILL_CHUNK_SIZE)
+            ).mappings().all()
+            if not candidates:
+                return
+            index_candidate_skills(connection, candidates, replace=False)
+        last_id = candidates[-1]["id"]
@@ -0,0 +1,220 @@
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple, Optional
+import asyncio
+import struct
+import time
+import zipfile
+import aiofiles
+from app.config import settings
+
+SCAN_CHUNK_SIZE = 64 * 1024
+
+class ScanVerdict(NamedTuple):
+    clean: bool
+    reason: Optional[str] = None
+
+class ScannerUnavailable(Exception):
+    """
+    Raised when a scan could not be performed; the file must not be trusted
+    """
+
+class VirusScanner(ABC):
+    """
+    Base class for scanner backends
+    """
+
+    name = "base"
+
+    @abstractmethod
+    async def scan(self, file_path: str, extension: str) -> ScanVerdict:
+        """
+        Scan the file; raise ScannerUnavailable if that is not possible
+        """
+
+class SignatureScanner(VirusScanner):
+    """
+    In-process scanner: byte signatures plus a few resume-specific heuristics
+    (file type must match its extension, no active content in PDFs, no macros
+    in Office documents). Scans run on a bounded thread pool so the event loop
+    never does the file I/O or pattern matching itself.
+    """
+
+    name = "signature"
+
+    SIGNATURES = {
+        b"X5O!P%@AP[4\\PZX54(P^)7CC)7}$EICAR-STANDARD-ANTIVIRUS-TEST-FILE!$H+H*": "Eicar-Test-Signature",
+    }
+
+    PDF_ACTIVE_CONTENT = (b"/JavaScript", b"/Launch")
+
+    MAGIC_BYTES = {
+        ".pdf": b"%PDF-",
+        ".docx": b"PK\x03\x04",
+        ".doc": b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1",
+    }
+
+    def __init__(self, max_workers: int):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="virus-scan")
+        self._overlap = max(len(signature) for signature in self.SIGNATURES) - 1
+
+    async def scan(self, file_path: str, extension: str) -> ScanVerdict:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._scan_sync, file_path, extension.lower())
+
+    def _scan_sync(self, file_path: str, extension: str) -> ScanVerdict:
+        with open(file_path, "rb") as f:
+            head = f.read(len(self.MAGIC_BYTES.get(extension, b"")))
+            if extension in self.MAGIC_BYTES and head != self.MAGIC_BYTES[extension]:
+                return ScanVerdict(False, f"Content does not match {extension} file type")
+
+            f.seek(0)
+            tail = b""
+            while True:
+                chunk = f.read(SCAN_CHUNK_SIZE)
+                if not chunk:
+                    break
+                # Keep the end of the previous chunk so signatures spanning a boundary still match
+                window = tail + chunk
+                for signature, name in self.SIGNATURES.items():
+                    if signature in window:
+                        return ScanVerdict(False, name)
+                if extension == ".pdf":
+                    for marker in self.PDF_ACTIVE_CONTENT:
+                        if marker in window:
+                            return ScanVerdict(False, f"PDF contains active content ({marker.decode()})")
+                if extension == ".doc" and b"_VBA_PROJECT" in window:
+                    return ScanVerdict(False, "Document contains macros")
+                tail = window[-self._overlap:]
+
+        if extension == ".docx":
+            try:
+                with zipfile.ZipFile(file_path) as archive:
+                    if any(entry.lower().endswith("vbaproject.bin") for entry in archive.namelist()):
+                        return ScanVerdict(False, "Document contains macros")
+            except zipfile.BadZipFile:
+                return ScanVerdict(False, "Corrupt .docx archive")
+
+        return ScanVerdict(True)
+
+class ClamdScanner(VirusScanner):
+    """
+    Streams the file to a clamd-compatible daemon using the INSTREAM command.
+    Talks to a unix socket when one is configured, TCP otherwise, so any local
+    stand-in that speaks the protocol can replace clamd.
+    """
+
+    name = "clamd"
+
+    def __init__(self, host: str, port: int, socket_path: Optional[str], max_concurrency: int, timeout: float):
+        self.host = host
+        self.port = port
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def scan(self, file_path: str, extension: str) -> ScanVerdict:
+        async with self._semaphore:
+            try:
+                return await asyncio.wait_for(self._instream(file_path), timeout=self.timeout)
+            except (OSError, asyncio.TimeoutError) as e:
+                raise ScannerUnavailable(f"clamd scan failed: {str(e) or type(e).__name__}")
+
+    async def _instream(self, file_path: str) -> ScanVerdict:
+        if self.socket_path:
+            reader, writer = await asyncio.open_unix_connection(self.socket_path)
+        else:
+            reader, writer = await asyncio.open_connection(self.host, self.port)
+        try:
+            writer.write(b"zINSTREAM\0")
+            async with aiofiles.open(file_path, "rb") as f:
+                while True:
+                    chunk = await f.read(SCAN_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    writer.write(struct.pack("!L", len(chunk)) + chunk)
+                    await writer.drain()
+            writer.write(struct.pack("!L", 0))
+            await writer.drain()
+            reply = (await reader.readuntil(b"\0")).rstrip(b"\0").decode(errors="replace")
+        finally:
+            writer.close()
+
+        # Replies look like "stream: OK" or "stream: Eicar-Test-Signature FOUND"
+        status = reply.split(":", 1)[-1].strip()
+        if status == "OK":
+            return ScanVerdict(True)
+        if status.endswith("FOUND"):
+            return ScanVerdict(False, status[:-len("FOUND")].strip())
+        raise ScannerUnavailable(f"Unexpected clamd reply: {reply}")
+
+class ScanVerdictCache:
+    """
+    Bounded TTL cache of verdicts keyed by content hash (and file type, since
+    the heuristics depend on it)
+    """
+
+    def __init__(self, ttl_seconds: int, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple[float, ScanVerdict]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[ScanVerdict]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, verdict = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return verdict
+
+    def put(self, key: str, verdict: ScanVerdict) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, verdict)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+class ScanService:
+    """
+    Front door for virus scanning: answers from the verdict cache when the
+    content was scanned before, otherwise runs the configured backend.
+    """
+
+    def __init__(self, scanner: VirusScanner, cache: ScanVerdictCache):
+        self.scanner = scanner
+        self.cache = cache
+        self.scans = 0
+        self.cache_hits = 0
+
+    async def scan(self, file_path: str, content_hash: str, extension: str) -> ScanVerdict:
+        key = f"{content_hash}{extension.lower()}"
+        verdict = self.cache.get(key)
+        if verdict is not None:
+            self.cache_hits += 1
+            return verdict
+
+        verdict = await self.scanner.scan(file_path, extension)
+        self.scans += 1
+        self.cache.put(key, verdict)
+        return verdict
+
+def create_scanner() -> VirusScanner:
+    if settings.VIRUS_SCANNER == "clamd":
+        return ClamdScanner(
+            host=settings.CLAMD_HOST,
+            port=settings.CLAMD_PORT,
+            socket_path=settings.CLAMD_SOCKET,
+            max_concurrency=settings.SCAN_WORKERS,
+            timeout=settings.SCAN_TIMEOUT_SECONDS
+        )
+    if settings.VIRUS_SCANNER == "signature":
+        return SignatureScanner(max_workers=settings.SCAN_WORKERS)
+    raise ValueError(f"Unknown VIRUS_SCANNER backend: {settings.VIRUS_SCANNER}")
+
+scan_service = ScanService(
+    create_scanner(),
+    ScanVerdictCache(settings.SCAN_CACHE_TTL_SECONDS, settings.SCAN_CACHE_MAX_ENTRIES)
+)
@@ -0,0 +1,115 @@
+"""
+Benchmark analyses/sec against a local stub of the data science service.
+
+Compares a new httpx.AsyncClient per analysis (the previous behaviour) with
+ResumeAnalysisService on the shared pooled client:
+
+    python benchmarks/analysis_client_benchmark.py --requests 2000 --concurrency 50
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import subprocess
+import sys
+import time
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.join(ROOT, "uploads", "benchmark-analysis-client")
+sys.path.insert(0, ROOT)
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{BENCH_DIR}/benchmark.db")
+
+STUB_RESULT = {
+    "overall_score": 0.82,
+    "skills_match": {"python": 0.9},
+    "experience_match": {"years": 5},
+    "education_match": {"degree": "BSc"},
+    "recommendations": ["Strong backend profile"],
+    "detailed_scores": {},
+}
+
+
+def stub_app():
+    from fastapi import FastAPI
+
+    app = FastAPI()
+
+    @app.post("/analyze")
+    async def analyze():
+        return STUB_RESULT
+
+    return app
+
+
+async def per_call_client(url: str, data: dict):
+    async with httpx.AsyncClient() as client:
+        response = await client.post(f"{url}/analyze", json=data, timeout=30.0)
+        response.raise_for_status()
+        return response.json()
+
+
+async def run(label: str, call, total: int, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            await call()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    elapsed = time.perf_counter() - started
+    print(f"{label:<22} {total / elapsed:8.1f} analyses/s")
+
+
+async def main_async(args, url: str):
+    from app.services.ds_client import ds_client
+    from app.services.resume_analysis import ResumeAnalysisService
+
+    data = {"resume_path": "/tmp/resume.pdf", "job_description": "Senior Python developer"}
+    service = ResumeAnalysisService()
+
+    await run("client per request", lambda: per_call_client(url, data), args.requests, args.concurrency)
+    await ds_client.start()
+    # Go straight to the upstream call: analyze_resume would answer every
+    # repeat from the result cache and never touch the client.
+    await run("shared pooled client", lambda: service._request_analysis(data["resume_path"], data["job_description"]),
+              args.requests, args.concurrency)
+    await ds_client.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+
+    url = f"http://127.0.0.1:{args.port}"
+    os.environ["DS_SERVICE_URL"] = url
+    shutil.rmtree(BENCH_DIR, ignore_errors=True)
+    os.makedirs(BENCH_DIR)
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "--factory", "benchmarks.analysis_client_benchmark:stub_app",
+         "--port", str(args.port), "--log-level", "warning"],
+        cwd=ROOT,
+    )
+    try:
+        for _ in range(50):
+            if server.poll() is not None:
+                raise SystemExit("stub data science service failed to start")
+            try:
+                httpx.get(f"{url}/docs")
+                break
+            except httpx.TransportError:
+                time.sleep(0.1)
+        asyncio.run(main_async(args, url))
+    finally:
+        server.terminate()
+        server.wait()
+        shutil.rmtree(BENCH_DIR, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
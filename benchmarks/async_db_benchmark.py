@@ -0,0 +1,160 @@
+"""
+Compare sync (threadpool) and async database endpoints at high concurrency.
+
+Starts the API in a separate uvicorn process with the async /api/jobs
+routes plus sync copies of the same reads on the old get_db/threadpool
+path under /sync/jobs, seeds --jobs rows and drives both with the same
+load. SQLite by default; pass --database-url to bench against Postgres
+(the async engine then uses asyncpg):
+
+    python benchmarks/async_db_benchmark.py --requests 5000 --concurrency 200
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.join(ROOT, "uploads", "benchmark-async-db")
+sys.path.insert(0, ROOT)
+
+
+def build_app():
+    from typing import Optional
+    from fastapi import APIRouter, Depends, FastAPI, HTTPException
+    from sqlalchemy.orm import Session
+    from app.api.routes import api_router
+    from app.db.session import engine, get_db
+    from app.models.models import Base, Job
+    from app.schemas import JobList, JobOut
+
+    Base.metadata.create_all(bind=engine)
+
+    # The pre-async implementations, for comparison
+    sync_router = APIRouter()
+
+    @sync_router.get("/jobs/", response_model=JobList)
+    def read_jobs(skip: int = 0, limit: int = 100, search: Optional[str] = None, db: Session = Depends(get_db)):
+        query = db.query(Job)
+        if search:
+            query = query.filter(Job.title.ilike(f"%{search}%"))
+        return {"jobs": query.offset(skip).limit(limit).all(), "total": query.count()}
+
+    @sync_router.get("/jobs/{job_id}", response_model=JobOut)
+    def read_job(job_id: int, db: Session = Depends(get_db)):
+        db_job = db.query(Job).filter(Job.id == job_id).first()
+        if db_job is None:
+            raise HTTPException(status_code=404, detail="Job not found")
+        return db_job
+
+    app = FastAPI()
+    app.include_router(api_router, prefix="/api")
+    app.include_router(sync_router, prefix="/sync")
+    return app
+
+
+async def run_load(base_url: str, paths, total: int, concurrency: int):
+    latencies = []
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120.0) as client:
+        async def one(i):
+            nonlocal errors
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    response = await client.get(paths[i % len(paths)])
+                    ok = response.status_code == 200
+                except httpx.TransportError:
+                    ok = False
+                latencies.append(time.perf_counter() - started)
+                # Pool timeouts surface as 500s or dropped connections;
+                # count them rather than stop
+                if not ok:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(total)))
+        elapsed = time.perf_counter() - started
+
+    return latencies, errors, elapsed
+
+
+def report(label: str, total: int, latencies, errors: int, elapsed: float):
+    latencies.sort()
+    print(f"{label:<12} {total / elapsed:7.1f} req/s   "
+          f"p50 {statistics.median(latencies) * 1000:6.1f} ms   "
+          f"p99 {latencies[int(len(latencies) * 0.99) - 1] * 1000:6.1f} ms   "
+          f"errors {errors}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--jobs", type=int, default=1000, help="rows to seed")
+    parser.add_argument("--database-url", default=None, help="default: scratch SQLite file")
+    parser.add_argument("--port", type=int, default=8767)
+    args = parser.parse_args()
+
+    shutil.rmtree(BENCH_DIR, ignore_errors=True)
+    os.makedirs(BENCH_DIR)
+    env = dict(os.environ, DATABASE_URL=args.database_url or f"sqlite:///{BENCH_DIR}/benchmark.db")
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "--factory", "benchmarks.async_db_benchmark:build_app",
+         "--port", str(args.port), "--log-level", "warning"],
+        cwd=ROOT,
+        env=env,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        base_url = f"http://127.0.0.1:{args.port}"
+        for _ in range(50):
+            if server.poll() is not None:
+                raise SystemExit("benchmark server failed to start")
+            try:
+                httpx.get(f"{base_url}/docs")
+                break
+            except httpx.TransportError:
+                time.sleep(0.1)
+
+        credentials = {"email": "bench-async@example.com", "password": "benchmark-password"}
+        response = httpx.post(f"{base_url}/api/auth/register", json=credentials, timeout=30.0)
+        if response.status_code == 400:
+            response = httpx.post(f"{base_url}/api/auth/login", json=credentials, timeout=30.0)
+        response.raise_for_status()
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        with httpx.Client(base_url=base_url, headers=headers) as client:
+            job_ids = [
+                client.post("/api/jobs/", json={
+                    "title": f"Engineer {i}", "description": "Benchmark job", "company": "Bench", "location": "Remote"
+                }).raise_for_status().json()["id"]
+                for i in range(args.jobs)
+            ]
+
+        print(f"{args.requests} requests @ concurrency {args.concurrency}, {args.jobs} jobs")
+        for kind, paths in [
+            ("by id", [f"/jobs/{job_id}" for job_id in job_ids]),
+            ("list", ["/jobs/?limit=20", "/jobs/?limit=20&search=Engineer 1"]),
+        ]:
+            for prefix in ("/sync", "/api"):
+                latencies, errors, elapsed = asyncio.run(run_load(
+                    base_url, [prefix + path for path in paths], args.requests, args.concurrency
+                ))
+                report(f"{prefix[1:]} {kind}", args.requests, latencies, errors, elapsed)
+    finally:
+        server.terminate()
+        server.wait()
+        shutil.rmtree(BENCH_DIR, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Bulk candidate import throughput: POST /candidates/import versus one POST /candidates/ per record.
+
+Runs the API in-process against a scratch database (SQLite by default,
+--database-url for Postgres), then imports --rows synthetic candidates as
+a JSON array, as NDJSON and as CSV, and creates --single-rows of them one
+request at a time the way an import had to be done before:
+
+    python benchmarks/candidate_import_benchmark.py --rows 10000
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import random
+import shutil
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.join(ROOT, "uploads", "benchmark-candidate-import")
+sys.path.insert(0, ROOT)
+
+SKILLS = "Python Java Go Rust TypeScript React Django FastAPI Kubernetes Docker AWS PostgreSQL Redis Kafka".split()
+
+
+def candidates(rows: int, job_id: int):
+    rng = random.Random(42)
+    return [
+        {
+            "name": f"Candidate {i}",
+            "email": f"candidate{i}@example.com",
+            "phone": "+1 555 0100",
+            "job_id": job_id,
+            "skills": [
+                {"name": name, "yearsExperience": round(rng.uniform(0, 12), 1), "context": "", "confidence": round(rng.random(), 2)}
+                for name in rng.sample(SKILLS, 5)
+            ],
+            "github_links": [],
+        }
+        for i in range(rows)
+    ]
+
+
+def as_csv(records):
+    out = io.StringIO()
+    writer = csv.DictWriter(out, fieldnames=["name", "email", "phone", "job_id", "skills", "github_links"])
+    writer.writeheader()
+    for record in records:
+        writer.writerow(dict(record, skills=json.dumps(record["skills"]), github_links=json.dumps(record["github_links"])))
+    return out.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=10000, help="candidates per bulk import")
+    parser.add_argument("--single-rows", type=int, default=500, help="candidates created one request at a time")
+    parser.add_argument("--database-url", help="defaults to a scratch SQLite file")
+    args = parser.parse_args()
+
+    shutil.rmtree(BENCH_DIR, ignore_errors=True)
+    os.makedirs(BENCH_DIR)
+    os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{BENCH_DIR}/benchmark.db"
+
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    try:
+        with TestClient(app) as client:
+            token = client.post("/api/auth/register", json={"email": "importer@example.com", "password": "benchmark"}).json()["access_token"]
+            headers = {"Authorization": f"Bearer {token}"}
+            job = {"title": "Engineer", "description": "Python", "company": "Bench", "location": "Remote"}
+            job_id = client.post("/api/jobs/", json=job, headers=headers).json()["id"]
+            records = candidates(args.rows, job_id)
+
+            bodies = [
+                ("json", "application/json", json.dumps(records)),
+                ("ndjson", "application/x-ndjson", "\n".join(json.dumps(record) for record in records)),
+                ("csv", "text/csv", as_csv(records)),
+            ]
+            print(f"{'method':18} {'rows':>7} {'seconds':>8} {'rows/s':>9}")
+            for label, content_type, body in bodies:
+                started = time.perf_counter()
+                response = client.post(
+                    "/api/candidates/import", content=body,
+                    headers=dict(headers, **{"Content-Type": content_type})
+                )
+                elapsed = time.perf_counter() - started
+                result = response.json()
+                if response.status_code != 200 or result["failed"]:
+                    print(f"{label}: unexpected response {response.status_code} {str(result)[:200]}")
+                    continue
+                print(f"{'import ' + label:18} {result['imported']:>7} {elapsed:>8.2f} {result['imported'] / elapsed:>9.0f}")
+
+            started = time.perf_counter()
+            for record in records[:args.single_rows]:
+                client.post("/api/candidates/", json=record)
+            elapsed = time.perf_counter() - started
+            single = min(args.single_rows, len(records))
+            print(f"{'one per request':18} {single:>7} {elapsed:>8.2f} {single / elapsed:>9.0f}")
+    finally:
+        shutil.rmtree(BENCH_DIR, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Job search latency: leading-wildcard ILIKE versus the full-text index.
+
+Fills a scratch database with --rows synthetic jobs, builds the search
+index, then runs the same searches both ways, each as GET /jobs/ runs
+them (total + first page). SQLite (FTS5) by default; pass --database-url
+to bench against Postgres (GIN expression index):
+
+    python benchmarks/job_search_benchmark.py --rows 1000000
+"""
+import argparse
+import asyncio
+import os
+import random
+import shutil
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.join(ROOT, "uploads", "benchmark-job-search")
+sys.path.insert(0, ROOT)
+
+WORDS = (
+    "python java golang rust typescript react django fastapi kubernetes docker aws gcp azure "
+    "postgres redis kafka spark airflow terraform linux backend frontend fullstack data machine "
+    "learning platform mobile ios android security devops reliability senior junior staff lead "
+    "engineer developer analyst scientist architect manager designer remote hybrid onsite startup "
+    "fintech healthcare ecommerce payments search infrastructure distributed systems api cloud"
+).split()
+# Description words follow a Zipf distribution over a 5000 word vocabulary,
+# with the technical terms spread through its middle, so a search term shows
+# up in a few percent of jobs rather than in most of them
+VOCABULARY = [f"word{i}" for i in range(5000)]
+for position, word in enumerate(WORDS):
+    VOCABULARY[50 + position * 7] = word
+WEIGHTS = [1 / (rank + 1) for rank in range(len(VOCABULARY))]
+SEARCHES = ["python", "senior rust engineer", "kubernetes", "machine learning", "payments api", "haskell"]
+
+
+def fill(engine, rows: int, chunk: int = 10000):
+    from sqlalchemy import insert
+    from app.models.models import Job
+
+    rng = random.Random(42)
+    started = time.perf_counter()
+    with engine.begin() as connection:
+        for offset in range(0, rows, chunk):
+            connection.execute(insert(Job), [
+                {
+                    "title": " ".join(rng.sample(WORDS, 3)).title(),
+                    "company": f"{rng.choice(WORDS).title()} {rng.choice(['Labs', 'Inc', 'Systems', 'Works'])}",
+                    "location": "Remote",
+                    "description": " ".join(rng.choices(VOCABULARY, WEIGHTS, k=120)),
+                    "created_by": 1,
+                }
+                for _ in range(min(chunk, rows - offset))
+            ])
+    print(f"inserted {rows} jobs in {time.perf_counter() - started:.1f} s")
+
+
+async def timed(repeats: int, fn):
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        result = await fn()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings), result
+
+
+async def run_searches(repeats: int):
+    from sqlalchemy import select
+    from app.db.session import AsyncSessionLocal, async_engine
+    from app.db import job_search
+    from app.db.pagination import count_total
+    from app.models.models import Job
+    from app.api.endpoints.jobs import JOB_COLUMNS
+
+    async with AsyncSessionLocal() as db:
+        dialect = db.bind.dialect.name
+        print(f"{'search':<22} {'ILIKE total+page':>18} {'full-text total+page':>22} {'hits':>8}")
+        for search in SEARCHES:
+            async def ilike():
+                query = select(Job).where(
+                    Job.title.ilike(f"%{search}%") | Job.company.ilike(f"%{search}%") | Job.description.ilike(f"%{search}%")
+                )
+                total, _ = await count_total(db, query, exact=True)
+                (await db.execute(query.limit(20))).scalars().all()
+                return total
+
+            async def full_text():
+                query, rank = job_search.search_jobs(select(*JOB_COLUMNS), search, dialect)
+                total, _ = await count_total(db, query)
+                job_search.next_ranked_page((await db.execute(job_search.ranked_page(query, rank, None, 20))).all(), 20)
+                return total
+
+            ilike_seconds, _ = await timed(repeats, ilike)
+            fts_seconds, hits = await timed(repeats, full_text)
+            print(f"{search:<22} {ilike_seconds * 1000:15.1f} ms {fts_seconds * 1000:19.1f} ms {hits:>8}")
+    await async_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--database-url", default=None, help="default: scratch SQLite file")
+    args = parser.parse_args()
+
+    shutil.rmtree(BENCH_DIR, ignore_errors=True)
+    os.makedirs(BENCH_DIR)
+    os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{BENCH_DIR}/benchmark.db"
+    try:
+        from app.db.session import engine
+        from app.db.job_search import install_job_search
+        from app.models.models import Base
+
+        Base.metadata.create_all(bind=engine)
+        fill(engine, args.rows)
+        started = time.perf_counter()
+        install_job_search(engine)
+        print(f"built search index in {time.perf_counter() - started:.1f} s")
+        asyncio.run(run_searches(args.repeats))
+    finally:
+        shutil.rmtree(BENCH_DIR, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+List endpoint latency: rows + orjson (FastJSONResponse) versus ORM objects through the response_model.
+
+Runs the API in-process against a scratch database with --rows jobs,
+candidates (five skills and two GitHub links each) and analysis records,
+plus copies of the previous list implementations under /legacy (ORM
+entities, validated against response_model / run through
+jsonable_encoder), and times full pages of each:
+
+    python benchmarks/list_serialization_benchmark.py --rows 2000 --limit 100 500
+"""
+import argparse
+import os
+import random
+import shutil
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.join(ROOT, "uploads", "benchmark-list-serialization")
+sys.path.insert(0, ROOT)
+
+SKILLS = "Python Java Go Rust TypeScript React Django FastAPI Kubernetes Docker AWS PostgreSQL Redis Kafka".split()
+
+
+def build_app():
+    from fastapi import APIRouter, Depends, FastAPI
+    from sqlalchemy import select
+    from sqlalchemy.ext.asyncio import AsyncSession
+    from sqlalchemy.orm import Session
+    from app.api.routes import api_router
+    from app.db.pagination import count_total, keyset_page, next_page
+    from app.db.session import get_async_db, get_db
+    from app.models.models import AnalysisRecord, Candidate, Job
+    from app.routers.dashboard import router as dashboard_router
+    from app.schemas import CandidateList, JobList
+    from app.services.analysis_store import analysis_record
+
+    # The previous implementations, for comparison
+    legacy = APIRouter()
+
+    @legacy.get("/jobs/", response_model=JobList)
+    async def read_jobs(limit: int = 100, db: AsyncSession = Depends(get_async_db)):
+        total, total_exact = await count_total(db, select(Job))
+        jobs, next_cursor = next_page((await db.execute(keyset_page(select(Job), Job, None, limit))).scalars().all(), limit)
+        return {"jobs": jobs, "total": total, "total_exact": total_exact, "next_cursor": next_cursor}
+
+    @legacy.get("/candidates/", response_model=CandidateList)
+    async def read_candidates(limit: int = 100, db: AsyncSession = Depends(get_async_db)):
+        total, total_exact = await count_total(db, select(Candidate))
+        query = keyset_page(select(Candidate), Candidate, None, limit)
+        candidates, next_cursor = next_page((await db.execute(query)).scalars().all(), limit)
+        return {"candidates": candidates, "total": total, "total_exact": total_exact, "next_cursor": next_cursor}
+
+    @legacy.get("/analysis-history")
+    def get_analysis_history(limit: int = 50, db: Session = Depends(get_db)):
+        records = db.query(AnalysisRecord).order_by(
+            AnalysisRecord.created_at.desc(), AnalysisRecord.id.desc()
+        ).limit(limit + 1).all()
+        return {"analyses": [analysis_record(record) for record in records[:limit]], "next_cursor": None}
+
+    app = FastAPI()
+    app.include_router(api_router, prefix="/api")
+    app.include_router(dashboard_router)
+    app.include_router(legacy, prefix="/legacy")
+    return app
+
+
+def fill(rows: int, user_id: int):
+    from sqlalchemy import insert
+    from app.db.session import engine
+    from app.models.models import AnalysisRecord, Job, utcnow
+    from app.services.candidate_import import _insert_candidates
+
+    rng = random.Random(42)
+    with engine.begin() as connection:
+        job_ids = connection.execute(insert(Job).returning(Job.id), [
+            {
+                "title": f"Engineer {i}", "description": "Build and run services. " * 100,
+                "company": "Bench", "location": "Remote", "created_by": user_id, "created_at": utcnow(),
+            }
+            for i in range(rows)
+        ]).scalars().all()
+        _insert_candidates(connection, [
+            {
+                "name": f"Candidate {i}", "email": f"candidate{i}@example.com", "phone": None, "resume_url": None,
+                "job_id": rng.choice(job_ids), "created_at": utcnow(),
+                "skills": [
+                    {"name": name, "yearsExperience": round(rng.uniform(0, 12), 1), "context": "Worked on it", "confidence": round(rng.random(), 2)}
+                    for name in rng.sample(SKILLS, 5)
+                ],
+                "github_links": [
+                    {"url": f"https://github.com/c{i}", "username": f"c{i}", "repositoryCount": 12,
+                     "profileCreatedAt": "2019-04-01T10:00:00Z", "extractedFrom": "resume"}
+                ] * 2,
+            }
+            for i in range(rows)
+        ])
+        connection.execute(insert(AnalysisRecord), [
+            {
+                "id": f"analysis-{i}", "user_id": user_id, "job_id": rng.choice(job_ids), "model_version": "v1",
+                "overall_score": rng.random() * 100, "created_at": utcnow(),
+                "result": {
+                    "overall_score": 70.0,
+                    "skills_match": {name: rng.random() for name in SKILLS},
+                    "experience_match": {"years": 5, "required": 3, "score": 0.9},
+                    "education_match": {"degree": "BSc", "score": 0.8},
+                    "recommendations": ["Ask about system design"] * 5,
+                    "detailed_scores": {f"component_{n}": rng.random() for n in range(20)},
+                },
+            }
+            for i in range(rows)
+        ])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--limit", type=int, nargs="+", default=[100, 500])
+    parser.add_argument("--repeats", type=int, default=30)
+    args = parser.parse_args()
+
+    shutil.rmtree(BENCH_DIR, ignore_errors=True)
+    os.makedirs(BENCH_DIR)
+    os.environ["DATABASE_URL"] = f"sqlite:///{BENCH_DIR}/benchmark.db"
+
+    from fastapi.testclient import TestClient
+    from app.db.session import engine
+    from app.models.models import Base
+
+    Base.metadata.create_all(bind=engine)
+    app = build_app()
+    try:
+        with TestClient(app) as client:
+            response = client.post("/api/auth/register", json={"email": "bench@example.com", "password": "benchmark"})
+            headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+            fill(args.rows, response.json()["id"])
+
+            def timed(path):
+                timings = []
+                for _ in range(args.repeats):
+                    started = time.perf_counter()
+                    response = client.get(path, headers=headers)
+                    timings.append(time.perf_counter() - started)
+                    assert response.status_code == 200, response.text[:200]
+                return statistics.median(timings) * 1000, len(response.content)
+
+            print(f"{'endpoint':20} {'limit':>5} {'response_model':>15} {'rows + orjson':>14} {'speedup':>8} {'KB':>6}")
+            for limit in args.limit:
+                for label, current, previous in [
+                    ("jobs", f"/api/jobs/?limit={limit}", f"/legacy/jobs/?limit={limit}"),
+                    ("candidates", f"/api/candidates/?limit={limit}", f"/legacy/candidates/?limit={limit}"),
+                    ("analysis history", f"/dashboard/analysis-history?limit={limit}", f"/legacy/analysis-history?limit={limit}"),
+                ]:
+                    previous_ms, _ = timed(previous)
+                    current_ms, size = timed(current)
+                    print(f"{label:20} {limit:>5} {previous_ms:12.1f} ms {current_ms:11.1f} ms {previous_ms / current_ms:7.1f}x {size / 1024:6.0f}")
+    finally:
+        shutil.rmtree(BENCH_DIR, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Benchmark authenticated list requests with the principal cache on and off.
+
+GET /api/jobs does not require authentication, so this drives
+GET /api/candidates/ (the list endpoint that does) or --path. Each run
+starts the API in a separate uvicorn process on a scratch SQLite database,
+registers a user and fires concurrent requests with its bearer token:
+
+    python benchmarks/principal_cache_benchmark.py --requests 5000 --concurrency 50
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.join(ROOT, "uploads", "benchmark-auth")
+sys.path.insert(0, ROOT)
+
+
+def build_app():
+    from fastapi import FastAPI
+    from app.api.routes import api_router
+    from app.db.session import engine
+    from app.models.models import Base
+
+    Base.metadata.create_all(bind=engine)
+    app = FastAPI()
+    app.include_router(api_router, prefix="/api")
+    return app
+
+
+async def run_load(base_url: str, path: str, token: str, total: int, concurrency: int):
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, headers=headers, timeout=60.0) as client:
+        async def one():
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.get(path)
+                latencies.append(time.perf_counter() - started)
+                response.raise_for_status()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(total)))
+        elapsed = time.perf_counter() - started
+
+    return latencies, elapsed
+
+
+def bench(cache_enabled: bool, args) -> None:
+    shutil.rmtree(BENCH_DIR, ignore_errors=True)
+    os.makedirs(BENCH_DIR)
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{BENCH_DIR}/benchmark.db",
+        PRINCIPAL_CACHE_ENABLED="true" if cache_enabled else "false",
+    )
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "--factory", "benchmarks.principal_cache_benchmark:build_app",
+         "--port", str(args.port), "--log-level", "warning"],
+        cwd=ROOT,
+        env=env,
+    )
+    try:
+        base_url = f"http://127.0.0.1:{args.port}"
+        for _ in range(50):
+            if server.poll() is not None:
+                raise SystemExit("benchmark server failed to start")
+            try:
+                httpx.get(f"{base_url}/docs")
+                break
+            except httpx.TransportError:
+                time.sleep(0.1)
+
+        credentials = {"email": "bench@example.com", "password": "benchmark-password"}
+        response = httpx.post(f"{base_url}/api/auth/register", json=credentials, timeout=30.0)
+        response.raise_for_status()
+        token = response.json()["access_token"]
+
+        latencies, elapsed = asyncio.run(run_load(base_url, args.path, token, args.requests, args.concurrency))
+        latencies.sort()
+
+        label = "on " if cache_enabled else "off"
+        print(f"principal cache {label}: {args.requests / elapsed:7.1f} req/s   "
+              f"p50 {statistics.median(latencies) * 1000:5.1f} ms   "
+              f"p99 {latencies[int(len(latencies) * 0.99) - 1] * 1000:5.1f} ms")
+    finally:
+        server.terminate()
+        server.wait()
+        shutil.rmtree(BENCH_DIR, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--path", default="/api/candidates/", help="authenticated endpoint to hit")
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+
+    print(f"GET {args.path} x {args.requests} @ concurrency {args.concurrency}")
+    bench(False, args)
+    bench(True, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Cost of idle progress subscribers and of publishing to them.
+
+Parks --subscribers coroutines on the progress bus (as SSE/WebSocket
+clients waiting on analysis jobs would be), measures the CPU used while
+they sit idle, then the time to fan one event out to all of them:
+
+    python benchmarks/progress_fanout_benchmark.py --subscribers 5000 --idle-seconds 5
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+
+async def subscriber(bus, topic, ready, received):
+    with bus.subscribe(topic) as queue:
+        ready.release()
+        while True:
+            event = await queue.get()
+            received.append(time.perf_counter())
+            if event["stage"] == "scored":
+                return
+
+
+async def run(args):
+    from app.services.progress import ProgressBus
+
+    bus = ProgressBus(max_topics=10000, history_size=20, subscriber_queue_size=100)
+    ready = asyncio.Semaphore(0)
+    received = []
+    topics = [f"job-{i % args.topics}" for i in range(args.subscribers)]
+    tasks = [asyncio.create_task(subscriber(bus, topic, ready, received)) for topic in topics]
+    for _ in tasks:
+        await ready.acquire()
+
+    cpu_before = time.process_time()
+    await asyncio.sleep(args.idle_seconds)
+    idle_cpu = time.process_time() - cpu_before
+
+    started = time.perf_counter()
+    for topic in set(topics):
+        bus.publish(topic, "analyzing")
+        bus.publish(topic, "scored", result={"overall_score": 0.8})
+    publish_seconds = time.perf_counter() - started
+    await asyncio.gather(*tasks)
+    delivered_seconds = max(received) - started
+
+    print(f"subscribers:            {args.subscribers} over {args.topics} topics")
+    print(f"idle CPU:               {idle_cpu * 1000:.1f} ms over {args.idle_seconds:.0f} s "
+          f"({idle_cpu / args.idle_seconds * 100:.2f}% of a core)")
+    print(f"publish (2 per topic):  {publish_seconds * 1000:.1f} ms")
+    print(f"all events delivered:   {delivered_seconds * 1000:.1f} ms")
+    print(f"bus stats:              {bus.stats()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--subscribers", type=int, default=5000)
+    parser.add_argument("--topics", type=int, default=500)
+    parser.add_argument("--idle-seconds", type=float, default=5.0)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+SQL statements per request for the authenticated CRUD endpoints.
+
+Runs the API in-process against a scratch database, seeds a job with
+--candidates candidates, and counts the statements the async engine
+executes for each request (the caller's principal is already cached, as it
+is for every request but the first per token). The count must not grow
+with the data, so each endpoint has a budget; any request over it makes
+the script exit non-zero:
+
+    python benchmarks/query_count_benchmark.py --candidates 200
+"""
+import argparse
+import os
+import shutil
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.join(ROOT, "uploads", "benchmark-query-count")
+sys.path.insert(0, ROOT)
+
+# (label, method, path, expected status, statement budget)
+REQUESTS = [
+    ("user profile", "GET", "/api/users/me", 200, 0),
+    ("job", "GET", "/api/jobs/{job_id}", 200, 1),
+    ("update job", "PUT", "/api/jobs/{job_id}", 200, 2),
+    ("candidate", "GET", "/api/candidates/{candidate_id}", 200, 1),
+    ("other user's candidate", "GET", "/api/candidates/{other_candidate_id}", 403, 1),
+    ("missing candidate", "GET", "/api/candidates/999999", 404, 1),
+    ("candidates of job", "GET", "/api/candidates/?job_id={job_id}&exact_total=true", 200, 2),
+    ("candidates of job, by skill", "GET", "/api/candidates/?job_id={job_id}&skill=python&exact_total=true", 200, 2),
+    ("candidates of other user's job", "GET", "/api/candidates/?job_id={other_job_id}", 403, 3),
+    ("candidates of missing job", "GET", "/api/candidates/?job_id=999999", 404, 3),
+    ("delete candidate", "DELETE", "/api/candidates/{candidate_id}", 200, 3),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--candidates", type=int, default=50, help="candidates seeded per job")
+    args = parser.parse_args()
+
+    shutil.rmtree(BENCH_DIR, ignore_errors=True)
+    os.makedirs(BENCH_DIR)
+    os.environ["DATABASE_URL"] = f"sqlite:///{BENCH_DIR}/benchmark.db"
+
+    from fastapi.testclient import TestClient
+    from sqlalchemy import event
+    from app.main import app
+    from app.db.session import async_engine
+
+    statements = []
+    event.listen(async_engine.sync_engine, "before_cursor_execute", lambda *a: statements.append(a[2]))
+
+    failures = 0
+    try:
+        with TestClient(app) as client:
+            def sign_up(email):
+                response = client.post("/api/auth/register", json={"email": email, "password": "benchmark"})
+                return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+            def seed(headers):
+                job = {"title": "Engineer", "description": "Python", "company": "Bench", "location": "Remote"}
+                job_id = client.post("/api/jobs/", json=job, headers=headers).json()["id"]
+                candidate_ids = [
+                    client.post("/api/candidates/", json={
+                        "name": f"Candidate {i}", "email": f"candidate{i}@example.com", "job_id": job_id,
+                        "skills": [{"name": "Python", "yearsExperience": 3, "context": "", "confidence": 0.9}],
+                    }).json()["id"]
+                    for i in range(args.candidates)
+                ]
+                return job_id, candidate_ids
+
+            headers = sign_up("owner@example.com")
+            other_headers = sign_up("other@example.com")
+            job_id, candidate_ids = seed(headers)
+            other_job_id, other_candidate_ids = seed(other_headers)
+            values = {
+                "job_id": job_id, "candidate_id": candidate_ids[0],
+                "other_job_id": other_job_id, "other_candidate_id": other_candidate_ids[0],
+            }
+            job_update = {"title": "Senior Engineer", "description": "Python", "company": "Bench", "location": "Remote"}
+
+            print(f"{'request':34} {'status':>6} {'statements':>10} {'budget':>6}")
+            for label, method, path, expected_status, budget in REQUESTS:
+                statements.clear()
+                response = client.request(
+                    method, path.format(**values), headers=headers,
+                    json=job_update if method == "PUT" else None
+                )
+                count = len(statements)
+                ok = response.status_code == expected_status and count <= budget
+                failures += not ok
+                print(f"{label:34} {response.status_code:>6} {count:>10} {budget:>6}{'' if ok else '  <-- unexpected'}")
+                if not ok:
+                    for statement in statements:
+                        print(f"    {' '.join(statement.split())[:160]}")
+    finally:
+        shutil.rmtree(BENCH_DIR, ignore_errors=True)
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+Skill filter latency: candidate_skills index versus filtering skills JSON in Python.
+
+Fills a scratch database with --rows synthetic candidates (about five
+skills each) spread over --jobs jobs, then answers "candidates with >= N
+years of a skill", across all jobs and within one job, the way
+GET /candidates/?skill=&min_years= does (total + first page), and the way
+it had to be done before (load the candidates, filter their skills JSON):
+
+    python benchmarks/skill_search_benchmark.py --rows 1000000
+"""
+import argparse
+import asyncio
+import os
+import random
+import shutil
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.join(ROOT, "uploads", "benchmark-skill-search")
+sys.path.insert(0, ROOT)
+
+SKILLS = (
+    "Python Java Go Rust TypeScript JavaScript React Django FastAPI Kubernetes Docker AWS GCP Azure "
+    "PostgreSQL Redis Kafka Spark Airflow Terraform Linux SQL Pandas PyTorch TensorFlow Swift Kotlin "
+    "C++ C# Ruby Rails PHP Scala Elixir Haskell GraphQL"
+).split()
+QUERIES = [("Python", 3, None), ("Rust", 5, None), ("Kubernetes", 2, 0.8), ("Haskell", 8, None)]
+
+
+def fill(engine, rows: int, jobs: int, chunk: int = 5000):
+    from sqlalchemy import insert, select
+    from app.models.models import Candidate, Job, utcnow
+    from app.services.skill_index import index_candidate_skills
+
+    rng = random.Random(42)
+    started = time.perf_counter()
+    with engine.begin() as connection:
+        connection.execute(insert(Job), [
+            {"title": f"Job {i}", "description": "", "company": "Bench", "location": "Remote", "created_by": 1}
+            for i in range(jobs)
+        ])
+        job_ids = connection.execute(select(Job.id)).scalars().all()
+    for offset in range(0, rows, chunk):
+        with engine.begin() as connection:
+            candidates = [
+                {
+                    "name": f"Candidate {offset + i}",
+                    "email": f"candidate{offset + i}@example.com",
+                    "job_id": rng.choice(job_ids),
+                    "skills": [
+                        {
+                            "name": name,
+                            "yearsExperience": round(rng.uniform(0, 12), 1),
+                            "context": "",
+                            "confidence": round(rng.random(), 2),
+                        }
+                        # Skewed towards the front of the list, like real skill popularity
+                        for name in {SKILLS[min(int(rng.expovariate(0.12)), len(SKILLS) - 1)] for _ in range(6)}
+                    ],
+                    "github_links": [],
+                    "created_at": utcnow(),
+                }
+                for i in range(min(chunk, rows - offset))
+            ]
+            ids = connection.execute(insert(Candidate).returning(Candidate.id), candidates).scalars().all()
+            index_candidate_skills(connection, [
+                {"id": candidate_id, **candidate}
+                for candidate_id, candidate in zip(ids, candidates)
+            ], replace=False)
+    print(f"inserted {rows} candidates in {time.perf_counter() - started:.1f} s")
+    return job_ids
+
+
+async def timed(repeats: int, fn):
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        result = await fn()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings), result
+
+
+async def run_queries(job_id: int, repeats: int, scan: bool):
+    from sqlalchemy import select
+    from app.db.session import AsyncSessionLocal, async_engine
+    from app.db.pagination import count_total, keyset_page, next_page
+    from app.models.models import Candidate
+    from app.services.skill_index import SKILL_LISTING_KEY, skill_filter, skill_matches
+
+    async with AsyncSessionLocal() as db:
+        print(f"{'query':<34} {'index total+page':>17} {'JSON scan':>12} {'matches':>8}")
+        for skill, min_years, min_confidence in QUERIES:
+            for scope in (None, job_id):
+                async def indexed():
+                    query = select(Candidate)
+                    if scope is not None:
+                        query = query.where(Candidate.job_id == scope)
+                    query = skill_filter(query, skill, min_years, min_confidence, scope)
+                    total, _ = await count_total(db, skill_matches(skill, min_years, min_confidence, scope))
+                    page_query = keyset_page(query, Candidate, None, 20, SKILL_LISTING_KEY)
+                    next_page((await db.execute(page_query)).scalars().all(), 20)
+                    return total
+
+                async def json_scan():
+                    query = select(Candidate.id, Candidate.skills)
+                    if scope is not None:
+                        query = query.where(Candidate.job_id == scope)
+                    return sum(
+                        1 for row in await db.execute(query)
+                        if any(
+                            s["name"].lower() == skill.lower() and s["yearsExperience"] >= min_years
+                            and (min_confidence is None or s["confidence"] >= min_confidence)
+                            for s in row.skills
+                        )
+                    )
+
+                label = f"{skill} >= {min_years}y" + (f" conf >= {min_confidence}" if min_confidence else "")
+                label += " (one job)" if scope is not None else ""
+                indexed_seconds, matches = await timed(repeats, indexed)
+                scan_column = "skipped"
+                if scan:
+                    scan_seconds, _ = await timed(1, json_scan)
+                    scan_column = f"{scan_seconds * 1000:.0f} ms"
+                print(f"{label:<34} {indexed_seconds * 1000:14.1f} ms {scan_column:>12} {matches:>8}")
+    await async_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--jobs", type=int, default=1000)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--no-scan", action="store_true", help="skip the slow JSON scan baseline")
+    parser.add_argument("--database-url", default=None, help="default: scratch SQLite file")
+    args = parser.parse_args()
+
+    shutil.rmtree(BENCH_DIR, ignore_errors=True)
+    os.makedirs(BENCH_DIR)
+    os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{BENCH_DIR}/benchmark.db"
+    try:
+        from app.db.session import engine
+        from app.models.models import Base
+
+        Base.metadata.create_all(bind=engine)
+        job_ids = fill(engine, args.rows, args.jobs)
+        if engine.dialect.name == "postgresql":
+            with engine.begin() as connection:
+                connection.exec_driver_sql("ANALYZE candidates, candidate_skills")
+        asyncio.run(run_queries(job_ids[0], args.repeats, not args.no_scan))
+    finally:
+        shutil.rmtree(BENCH_DIR, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Benchmark concurrent resume uploads against /api/resumes/upload-resume.
+
+Starts the resumes router in a separate uvicorn process (auth and virus
+scanning stubbed out, a scratch SQLite database for the resume store),
+fires concurrent 10MB uploads at it and reports throughput, p50/p99
+latency and the server's peak RSS. Every upload has distinct content
+unless --duplicates is given.
+
+Run it on two checkouts to compare before and after:
+
+    python benchmarks/upload_benchmark.py --requests 200 --concurrency 50
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_UPLOAD_DIR = os.path.join(ROOT, "uploads", "benchmark")
+sys.path.insert(0, ROOT)
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{BENCH_UPLOAD_DIR}/benchmark.db")
+
+
+def build_app():
+    from fastapi import FastAPI
+    from app.api.endpoints import resumes
+    from app.core.security import get_current_user
+    from app.db.session import engine
+    from app.models.models import Base
+    from app.services.resume_store import ResumeStore
+
+    class BenchUser:
+        id = 0
+
+    async def always_clean(*args, **kwargs):
+        return True
+
+    resumes.scan_file_for_viruses = always_clean
+    resumes.resume_store = ResumeStore(BENCH_UPLOAD_DIR)
+    Base.metadata.create_all(bind=engine)
+
+    app = FastAPI()
+    app.include_router(resumes.router, prefix="/api/resumes")
+    app.dependency_overrides[get_current_user] = lambda: BenchUser()
+    return app
+
+
+def peak_rss_mb(pid: int) -> float:
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+async def run_load(url: str, payload: bytes, total: int, concurrency: int, duplicates: bool):
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency)
+
+    async with httpx.AsyncClient(limits=limits, timeout=120.0) as client:
+        async def one(i: int):
+            marker = b"" if duplicates else str(i).encode()
+            content = b"%PDF-1.4\n%" + marker + b"\n" + payload
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.post(url, files={"file": ("resume.pdf", content, "application/pdf")})
+                latencies.append(time.perf_counter() - started)
+                response.raise_for_status()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(total)))
+        elapsed = time.perf_counter() - started
+
+    return latencies, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--size-mb", type=float, default=9.5)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--duplicates", action="store_true", help="upload identical content every time")
+    args = parser.parse_args()
+
+    os.makedirs(BENCH_UPLOAD_DIR, exist_ok=True)
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "--factory", "benchmarks.upload_benchmark:build_app",
+         "--port", str(args.port), "--log-level", "warning"],
+        cwd=ROOT,
+    )
+    try:
+        url = f"http://127.0.0.1:{args.port}/api/resumes/upload-resume"
+        for _ in range(50):
+            if server.poll() is not None:
+                raise SystemExit("benchmark server failed to start")
+            try:
+                httpx.get(f"http://127.0.0.1:{args.port}/docs")
+                break
+            except httpx.TransportError:
+                time.sleep(0.1)
+
+        payload = os.urandom(int(args.size_mb * 1024 * 1024))
+        latencies, elapsed = asyncio.run(run_load(url, payload, args.requests, args.concurrency, args.duplicates))
+        latencies.sort()
+
+        print(f"uploads:        {args.requests} x {args.size_mb}MB @ concurrency {args.concurrency}")
+        print(f"throughput:     {args.requests / elapsed:.1f} uploads/s")
+        print(f"p50 latency:    {statistics.median(latencies) * 1000:.0f} ms")
+        print(f"p99 latency:    {latencies[int(len(latencies) * 0.99) - 1] * 1000:.0f} ms")
+        print(f"server peak RSS: {peak_rss_mb(server.pid):.0f} MB")
+    finally:
+        server.terminate()
+        server.wait()
+        shutil.rmtree(BENCH_UPLOAD_DIR, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,33 +1,126 @@
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException
-from fastapi.responses import JSONResponse
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI, UploadFile, File, Form, HTTPException
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from fastapi.responses import HTMLResponse
 from fastapi.requests import Request
+import asyncio
+import base64
+import binascii
+import hashlib
 import httpx
 import json
 import os
+import sqlite3
+import sys
+import uuid
+from contextlib import closing
+from datetime import datetime, timezone
 from pathlib import Path
 from typing import Optional, Dict, Any
 from pydantic import BaseModel
 
+# The backend package is also named "app"; put the repository root first so
+# it is found instead of this file (run as dashboard.app, see __main__)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.security import get_current_user
+from app.db.session import engine
+from app.models.models import Base, User
+from app.services.analysis_cache import analysis_cache, hash_job_description
+from app.services.ds_client import ds_client
+from app.services.resilience import UpstreamUnavailable
+from app.services.resume_analysis import upstream_unavailable_exception
+
 # Create necessary directories
 BASE_DIR = Path(__file__).resolve().parent
 UPLOAD_DIR = BASE_DIR / "uploads"
-OUTPUT_DIR = BASE_DIR / "outputs"
+# One row per analysis; replaces the per-component files that each analysis overwrote
+ANALYSIS_DB_PATH = BASE_DIR / "analyses.db"
 STATIC_DIR = BASE_DIR / "static"
 TEMPLATES_DIR = BASE_DIR / "templates"
 
 # Create directories if they don't exist
 UPLOAD_DIR.mkdir(exist_ok=True)
-OUTPUT_DIR.mkdir(exist_ok=True)
 STATIC_DIR.mkdir(exist_ok=True)
 TEMPLATES_DIR.mkdir(exist_ok=True)
 
+def open_analysis_db() -> sqlite3.Connection:
+    conn = sqlite3.connect(ANALYSIS_DB_PATH, timeout=10)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+def init_analysis_db():
+    with closing(open_analysis_db()) as conn, conn:
+        # WAL lets history reads run while an analysis is being written
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS analyses (
+                id TEXT PRIMARY KEY,
+                resume_hash TEXT,
+                job_description_hash TEXT,
+                model_version TEXT,
+                overall_score REAL,
+                result TEXT NOT NULL,
+                created_at TEXT NOT NULL
+            )
+            """
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_analyses_created_at_id ON analyses (created_at, id)")
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_analyses_resume_hash ON analyses (resume_hash)")
+
+def utc_timestamp(value: datetime) -> str:
+    """Fixed-width UTC timestamp, so stored values sort and compare as text"""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.strftime("%Y-%m-%dT%H:%M:%S.%f")
+
+def save_analysis(result: Dict[str, Any], resume_hash: str, jd_hash: str) -> str:
+    """Store one analysis in its own row and return its id"""
+    analysis_id = str(uuid.uuid4())
+    with closing(open_analysis_db()) as conn, conn:
+        conn.execute(
+            "INSERT INTO analyses VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                analysis_id,
+                resume_hash,
+                jd_hash,
+                analysis_cache.model_version,
+                result.get("overall_score"),
+                json.dumps(result),
+                utc_timestamp(datetime.now(timezone.utc))
+            )
+        )
+    return analysis_id
+
+def analysis_row(row: sqlite3.Row) -> Dict[str, Any]:
+    return {
+        "analysis_id": row["id"],
+        "resume_hash": row["resume_hash"],
+        "job_description_hash": row["job_description_hash"],
+        "model_version": row["model_version"],
+        "overall_score": row["overall_score"],
+        "created_at": row["created_at"],
+        "result": json.loads(row["result"])
+    }
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await asyncio.to_thread(init_analysis_db)
+    # The analysis cache (and the users behind authentication) live in the backend's database
+    Base.metadata.create_all(bind=engine)
+    # The backend's pooled client, with its concurrency limiter and circuit breaker
+    await ds_client.start()
+    yield
+    await ds_client.stop()
+
 app = FastAPI(
     title="Resume Analysis Dashboard",
     description="Dashboard for analyzing resumes against job descriptions",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Mount static files and templates
@@ -40,6 +133,7 @@ class AnalysisResponse(BaseModel):
     experience_match: Dict[str, Any]
     education_match: Dict[str, Any]
     recommendations: list[str]
+    analysis_id: Optional[str] = None
 
 @app.get("/", response_class=HTMLResponse)
 async def home(request: Request):
@@ -53,14 +147,26 @@ async def analyze_resume(
 ):
     """Analyze a resume against a job description"""
     try:
+        # Unique names so concurrent requests don't overwrite each other's files
+        resume_path = UPLOAD_DIR / f"{uuid.uuid4()}{Path(resume.filename).suffix}"
+        jd_path = UPLOAD_DIR / f"{uuid.uuid4()}.txt"
+        
         # Save the uploaded resume
-        resume_path = UPLOAD_DIR / resume.filename
         with open(resume_path, "wb") as buffer:
             content = await resume.read()
             buffer.write(content)
         
+        # Same resume against the same job description: reuse the earlier
+        # result, from the backend's cache that the API also fills
+        resume_hash = hashlib.sha256(content).hexdigest()
+        jd_hash = hash_job_description(job_description)
+        analysis_result = await analysis_cache.get(resume_hash, jd_hash)
+        if analysis_result is not None:
+            os.remove(resume_path)
+            analysis_id = await asyncio.to_thread(save_analysis, analysis_result, resume_hash, jd_hash)
+            return {**analysis_result, "analysis_id": analysis_id}
+        
         # Save job description to a temporary file
-        jd_path = UPLOAD_DIR / "temp_jd.txt"
         with open(jd_path, "w", encoding="utf-8") as f:
             f.write(job_description)
         
@@ -71,47 +177,24 @@ async def analyze_resume(
         }
         
         # Call data science service
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                "http://localhost:5000/analyze",  # Data science service endpoint
-                json=data,
-                timeout=30.0
+        response = await ds_client.request("POST", "/analyze", endpoint="analyze", json=data)
+        
+        if response.status_code != 200:
+            raise HTTPException(
+                status_code=500,
+                detail="Error from data science service"
             )
-            
-            if response.status_code != 200:
-                raise HTTPException(
-                    status_code=500,
-                    detail="Error from data science service"
-                )
-            
-            analysis_result = response.json()
-            
-            # Save individual components as JSON files
-            # Save overall score
-            with open(OUTPUT_DIR / "overall_score.json", "w") as f:
-                json.dump({"overall_score": analysis_result["overall_score"]}, f)
-            
-            # Save skills match
-            with open(OUTPUT_DIR / "skills_match.json", "w") as f:
-                json.dump(analysis_result["skills_match"], f)
-            
-            # Save experience match
-            with open(OUTPUT_DIR / "experience_match.json", "w") as f:
-                json.dump(analysis_result["experience_match"], f)
-            
-            # Save education match
-            with open(OUTPUT_DIR / "education_match.json", "w") as f:
-                json.dump(analysis_result["education_match"], f)
-            
-            # Save recommendations
-            with open(OUTPUT_DIR / "recommendations.json", "w") as f:
-                json.dump({"recommendations": analysis_result["recommendations"]}, f)
         
+        analysis_result = response.json()
+        await analysis_cache.put(resume_hash, jd_hash, analysis_result)
+        
+        analysis_id = await asyncio.to_thread(save_analysis, analysis_result, resume_hash, jd_hash)
+    
         # Clean up the uploaded files
         os.remove(resume_path)
         os.remove(jd_path)
         
-        return analysis_result
+        return {**analysis_result, "analysis_id": analysis_id}
         
     except Exception as e:
         # Clean up files if they exist
@@ -119,40 +202,91 @@ async def analyze_resume(
             os.remove(resume_path)
         if os.path.exists(jd_path):
             os.remove(jd_path)
+        if isinstance(e, HTTPException):
+            raise
+        if isinstance(e, UpstreamUnavailable):
+            # Breaker open or limiter shedding: 503 with Retry-After, as the API does
+            raise upstream_unavailable_exception(e)
+        if isinstance(e, httpx.TimeoutException):
+            raise HTTPException(status_code=504, detail="Data science service timeout")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.delete("/analysis-cache")
+async def clear_analysis_cache(
+    resume_hash: Optional[str] = None,
+    job_description_hash: Optional[str] = None,
+    current_user: User = Depends(get_current_user)
+):
+    """Invalidate cached analysis results (all of them, or one resume's / job description's), in every process"""
+    removed = await analysis_cache.invalidate(resume_hash, job_description_hash)
+    return {"message": "Analysis cache invalidated", "removed": removed}
+
 @app.get("/analysis-history")
-async def get_analysis_history():
-    """Get history of resume analyses"""
-    try:
-        if not OUTPUT_DIR.exists():
-            return {"analyses": []}
-            
-        analyses = []
-        for file in OUTPUT_DIR.glob("*.json"):
-            with open(file, "r") as f:
-                analyses.append({
-                    "file": file.name,
-                    "data": json.load(f)
-                })
-        return {"analyses": analyses}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+def get_analysis_history(
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    min_score: Optional[float] = None,
+    format: str = "json"
+):
+    """Get resume analyses newest first, a page at a time (or streamed with format=ndjson)"""
+    if format not in ("json", "ndjson"):
+        raise HTTPException(status_code=400, detail="format must be json or ndjson")
+    
+    # Keyset pagination on (created_at, id): each page is an index range scan
+    clauses, params = [], []
+    if cursor:
+        try:
+            cursor_created_at, cursor_id = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8").split("|", 1)
+        except (ValueError, UnicodeError, binascii.Error):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        clauses.append("(created_at, id) < (?, ?)")
+        params += [cursor_created_at, cursor_id]
+    if created_after is not None:
+        clauses.append("created_at >= ?")
+        params.append(utc_timestamp(created_after))
+    if created_before is not None:
+        clauses.append("created_at < ?")
+        params.append(utc_timestamp(created_before))
+    if min_score is not None:
+        clauses.append("overall_score >= ?")
+        params.append(min_score)
+    sql = "SELECT * FROM analyses"
+    if clauses:
+        sql += " WHERE " + " AND ".join(clauses)
+    sql += " ORDER BY created_at DESC, id DESC"
+    
+    if format == "ndjson":
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        
+        def records():
+            with closing(open_analysis_db()) as conn:
+                for row in conn.execute(sql, params):
+                    yield json.dumps(analysis_row(row)) + "\n"
+        return StreamingResponse(records(), media_type="application/x-ndjson")
+    
+    limit = min(max(limit or 50, 1), 500)
+    with closing(open_analysis_db()) as conn:
+        rows = conn.execute(sql + " LIMIT ?", params + [limit + 1]).fetchall()
+    next_cursor = None
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        next_cursor = base64.urlsafe_b64encode(f"{last['created_at']}|{last['id']}".encode("utf-8")).decode("ascii")
+    return {"analyses": [analysis_row(row) for row in rows[:limit]], "next_cursor": next_cursor}
 
 @app.get("/analysis/{analysis_id}")
-async def get_analysis(analysis_id: str):
+def get_analysis(analysis_id: str):
     """Get specific analysis result by ID"""
-    try:
-        file_path = OUTPUT_DIR / f"{analysis_id}.json"
-        
-        if not file_path.exists():
-            raise HTTPException(status_code=404, detail="Analysis not found")
-            
-        with open(file_path, "r") as f:
-            return json.load(f)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    with closing(open_analysis_db()) as conn:
+        row = conn.execute("SELECT * FROM analyses WHERE id = ?", (analysis_id,)).fetchone()
+    if row is None:
+        raise HTTPException(status_code=404, detail="Analysis not found")
+    return analysis_row(row)
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run("app:app", host="localhost", port=8080, reload=True) 
\ No newline at end of file
+    # Imported as dashboard.app from the repository root, so that "app" is the backend package
+    uvicorn.run("dashboard.app:app", host="localhost", port=8080, reload=True, app_dir=str(BASE_DIR.parent)) 
\ No newline at end of file
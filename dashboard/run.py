@@ -2,6 +2,7 @@ import uvicorn
 import logging
 import sys
 import socket
+from pathlib import Path
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -19,8 +20,11 @@ if __name__ == "__main__":
             sys.exit(1)
             
         logger.info(f"Starting server on port {port}...")
+        # Run from the repository root as dashboard.app, so that "app" is the
+        # backend package whose data science client and cache it shares
         uvicorn.run(
-            "app:app",
+            "dashboard.app:app",
+            app_dir=str(Path(__file__).resolve().parent.parent),
             host="localhost",
             port=port,
             reload=True,
@@ -0,0 +1,60 @@
+"""
+Every test runs the API in-process against a scratch SQLite database. The
+settings are read when app.config is first imported, so the environment is
+set up here, before any test module imports the app.
+"""
+import os
+import shutil
+import sys
+import tempfile
+import uuid
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+TEST_DIR = tempfile.mkdtemp(prefix="zordie-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{TEST_DIR}/test.db"
+os.environ["UPLOAD_DIR"] = os.path.join(TEST_DIR, "uploads")
+# Fast password hashing; the hash strength is not under test
+os.environ["BCRYPT_ROUNDS"] = "4"
+os.environ["ANALYSIS_WORKERS"] = "0"
+# Routers create their upload directories relative to the working directory
+os.chdir(TEST_DIR)
+
+
+@pytest.fixture(scope="session")
+def client():
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+def sign_up(client):
+    """
+    Register a fresh user and return the Authorization header for them
+    """
+    def sign_up():
+        email = f"user-{uuid.uuid4().hex[:12]}@example.com"
+        response = client.post("/api/auth/register", json={"email": email, "password": "test-password"})
+        assert response.status_code == 200, response.text
+        return {"Authorization": f"Bearer {response.json()['access_token']}"}
+    return sign_up
+
+
+@pytest.fixture
+def create_job(client):
+    def create_job(headers, description="Python developer"):
+        job = {"title": "Engineer", "description": description, "company": "Test", "location": "Remote"}
+        response = client.post("/api/jobs/", json=job, headers=headers)
+        assert response.status_code == 200, response.text
+        return response.json()["id"]
+    return create_job
+
+
+def pytest_sessionfinish(session, exitstatus):
+    shutil.rmtree(TEST_DIR, ignore_errors=True)
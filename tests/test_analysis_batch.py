@@ -0,0 +1,77 @@
+"""
+POST /dashboard/analyze-batch only scores the caller's own resumes against
+the caller's own jobs.
+"""
+import json
+
+import pytest
+
+from app.routers import dashboard
+
+RESUME = ("resume.pdf", b"%PDF-1.4 batch analysis test resume", "application/pdf")
+
+
+@pytest.fixture
+def scored(monkeypatch):
+    """
+    Stand in for the data science service: every pair scores 80
+    """
+    calls = []
+
+    async def analyze_batch(items):
+        calls.append(items)
+        for item in items:
+            yield {**item["ref"], "status": "completed", "cached": False, "result": {"overall_score": 80.0}}
+
+    monkeypatch.setattr(dashboard.analysis_service, "analyze_batch", analyze_batch)
+    return calls
+
+
+def upload_resume(client, headers):
+    response = client.post("/api/resumes/upload-resume", files={"file": RESUME}, headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()["file_id"]
+
+
+def test_scores_own_resume_against_own_jobs(client, sign_up, create_job, scored):
+    headers = sign_up()
+    resume_id = upload_resume(client, headers)
+    job_ids = [create_job(headers), create_job(headers, "Go developer")]
+
+    response = client.post(
+        "/dashboard/analyze-batch", json={"resume_id": resume_id, "job_ids": job_ids}, headers=headers
+    )
+
+    assert response.status_code == 200, response.text
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted(line["job_id"] for line in lines[:-1]) == sorted(job_ids)
+    assert lines[-1]["summary"]["completed"] == 2
+    assert {item["job_description"] for item in scored[0]} == {"Python developer", "Go developer"}
+
+
+def test_other_users_job_is_not_found(client, sign_up, create_job, scored):
+    headers = sign_up()
+    resume_id = upload_resume(client, headers)
+    own_job = create_job(headers)
+    foreign_job = create_job(sign_up())
+
+    response = client.post(
+        "/dashboard/analyze-batch", json={"resume_id": resume_id, "job_ids": [own_job, foreign_job]}, headers=headers
+    )
+
+    assert response.status_code == 404
+    assert response.json()["detail"] == f"Jobs not found: {foreign_job}"
+    assert scored == []
+
+
+def test_other_users_resume_is_not_found(client, sign_up, create_job, scored):
+    headers = sign_up()
+    job_id = create_job(headers)
+    foreign_resume = upload_resume(client, sign_up())
+
+    response = client.post(
+        "/dashboard/analyze-batch", json={"job_id": job_id, "resume_ids": [foreign_resume]}, headers=headers
+    )
+
+    assert response.status_code == 404
+    assert scored == []
@@ -0,0 +1,93 @@
+"""
+Analysis jobs are only visible to the user who submitted them.
+"""
+import pytest
+from starlette.websockets import WebSocketDisconnect
+
+from app.db.session import SessionLocal
+from app.models.models import AnalysisJob
+from app.routers import dashboard
+
+RESUME = ("resume.pdf", b"%PDF-1.4 analysis job test resume", "application/pdf")
+
+
+def submit(client, headers):
+    response = client.post(
+        "/dashboard/analysis-jobs",
+        files={"resume": RESUME},
+        data={"job_description": "Python developer"},
+        headers=headers
+    )
+    assert response.status_code == 202, response.text
+    return response.json()["job_id"]
+
+
+def test_submitter_reads_job_status(client, sign_up):
+    headers = sign_up()
+    job_id = submit(client, headers)
+
+    response = client.get(f"/dashboard/analysis-jobs/{job_id}", headers=headers)
+
+    assert response.status_code == 200
+    assert response.json()["job_id"] == job_id
+    assert response.json()["status"] == "queued"
+
+
+def test_other_user_gets_404(client, sign_up):
+    job_id = submit(client, sign_up())
+
+    response = client.get(f"/dashboard/analysis-jobs/{job_id}", headers=sign_up())
+
+    assert response.status_code == 404
+
+
+def test_status_requires_authentication(client, sign_up):
+    job_id = submit(client, sign_up())
+
+    assert client.get(f"/dashboard/analysis-jobs/{job_id}").status_code in (401, 403)
+
+
+def test_event_stream_is_only_for_the_submitter(client, sign_up):
+    headers = sign_up()
+    job_id = submit(client, headers)
+
+    assert client.get(f"/dashboard/analysis-jobs/{job_id}/events").status_code in (401, 403)
+    assert client.get(f"/dashboard/analysis-jobs/{job_id}/events", headers=sign_up()).status_code == 404
+
+
+def test_websocket_requires_the_submitters_token(client, sign_up):
+    headers = sign_up()
+    job_id = submit(client, headers)
+    other_token = sign_up()["Authorization"].split()[1]
+
+    for query, code in [("", 4401), ("?token=not-a-jwt", 4401), (f"?token={other_token}", 4404)]:
+        with pytest.raises(WebSocketDisconnect) as closed:
+            with client.websocket_connect(f"/dashboard/analysis-jobs/{job_id}/ws{query}") as websocket:
+                websocket.receive_json()
+        assert closed.value.code == code
+
+
+def test_websocket_sends_the_submitter_a_finished_result(client, sign_up, monkeypatch):
+    # The job finishes behind the progress bus's back, as it would in another
+    # process; the next keepalive re-reads the row and ends the stream
+    monkeypatch.setattr(dashboard, "PROGRESS_KEEPALIVE_SECONDS", 0.1)
+    headers = sign_up()
+    job_id = submit(client, headers)
+    db = SessionLocal()
+    try:
+        job = db.get(AnalysisJob, job_id)
+        job.status = "completed"
+        job.result = {"overall_score": 75.0}
+        db.commit()
+    finally:
+        db.close()
+
+    token = headers["Authorization"].split()[1]
+    with client.websocket_connect(f"/dashboard/analysis-jobs/{job_id}/ws?token={token}") as websocket:
+        events = [websocket.receive_json()]
+        while events[-1]["stage"] not in ("scored", "failed"):
+            events.append(websocket.receive_json())
+
+    assert events[0]["stage"] == "uploaded"
+    assert events[-1]["stage"] == "scored"
+    assert events[-1]["result"] == {"overall_score": 75.0}
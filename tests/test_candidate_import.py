@@ -0,0 +1,104 @@
+"""
+POST /api/candidates/import imports the valid records and reports each
+invalid one by its position in the input.
+"""
+import json
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.config import settings
+from app.services import candidate_import
+
+
+def record(job_id, name, **fields):
+    return {"name": name, "email": f"{name.lower()}@example.com", "job_id": job_id, **fields}
+
+
+def import_body(client, headers, body, content_type):
+    response = client.post(
+        "/api/candidates/import", content=body, headers={**headers, "Content-Type": content_type}
+    )
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def failed_indexes(result):
+    return {error["index"]: error["errors"] for error in result["errors"]}
+
+
+def test_json_import_reports_each_bad_record(client, sign_up, create_job):
+    headers = sign_up()
+    job_id = create_job(headers)
+    foreign_job_id = create_job(sign_up())
+    records = [
+        record(job_id, "Ada"),
+        record(job_id, "Bad", email="not-an-email"),
+        {"email": "noname@example.com", "job_id": job_id},
+        record(foreign_job_id, "Foreign"),
+        record(10 ** 9, "Missing"),
+        record(job_id, "Grace"),
+    ]
+
+    result = import_body(client, headers, json.dumps(records), "application/json")
+
+    assert (result["imported"], result["failed"]) == (2, 4)
+    errors = failed_indexes(result)
+    assert sorted(errors) == [1, 2, 3, 4]
+    assert errors[1][0].startswith("email:")
+    assert errors[2] == ["name: Field required"]
+    assert errors[3] == ["job_id: Not authorized to add candidates to this job"]
+    assert errors[4] == ["job_id: Job not found"]
+    listed = client.get("/api/candidates/", params={"job_id": job_id}, headers=headers).json()
+    assert {c["id"] for c in listed["candidates"]} == set(result["candidate_ids"])
+
+
+def test_ndjson_and_csv_rows_fail_on_their_own(client, sign_up, create_job):
+    headers = sign_up()
+    job_id = create_job(headers)
+
+    lines = [json.dumps(record(job_id, "Line")), "{not json", json.dumps(record(job_id, "Other"))]
+    result = import_body(client, headers, "\n".join(lines), "application/x-ndjson")
+    assert (result["imported"], result["failed"]) == (2, 1)
+    assert failed_indexes(result)[1][0].startswith("Invalid JSON")
+
+    skills = json.dumps([{"name": "Elixir", "yearsExperience": 4, "context": "work", "confidence": 0.9}])
+    csv_body = "\n".join([
+        "name,email,job_id,skills",
+        f'Csv,csv@example.com,{job_id},"{skills.replace(chr(34), chr(34) * 2)}"',
+        f"Broken,broken@example.com,{job_id},[oops",
+    ])
+    result = import_body(client, headers, csv_body, "text/csv")
+    assert (result["imported"], result["failed"]) == (1, 1)
+    assert failed_indexes(result)[1][0].startswith("skills: invalid JSON")
+    # Imported rows are in the skill index too
+    matched = client.get("/api/candidates/", params={"job_id": job_id, "skill": "elixir"}, headers=headers).json()
+    assert [c["id"] for c in matched["candidates"]] == result["candidate_ids"]
+
+
+def test_a_rejected_chunk_fails_only_its_rows(client, sign_up, create_job, monkeypatch):
+    headers = sign_up()
+    job_id = create_job(headers)
+    insert_candidates = candidate_import._insert_candidates
+
+    def flaky_insert(connection, rows):
+        if any(row["name"] == "Rejected" for row in rows):
+            raise SQLAlchemyError("constraint failed")
+        return insert_candidates(connection, rows)
+
+    monkeypatch.setattr(settings, "CANDIDATE_IMPORT_CHUNK_SIZE", 2)
+    monkeypatch.setattr(candidate_import, "_insert_candidates", flaky_insert)
+    records = [record(job_id, name) for name in ("A", "B", "C", "Rejected", "E")]
+
+    result = import_body(client, headers, json.dumps(records), "application/json")
+
+    assert (result["imported"], result["failed"]) == (3, 2)
+    assert sorted(failed_indexes(result)) == [2, 3]
+
+
+def test_an_unreadable_body_is_rejected(client, sign_up):
+    headers = sign_up()
+    for body, content_type in [("{}", "application/json"), ("[1,", "application/json"), ("x", "text/plain")]:
+        response = client.post(
+            "/api/candidates/import", content=body, headers={**headers, "Content-Type": content_type}
+        )
+        assert response.status_code == 400, body
@@ -0,0 +1,111 @@
+"""
+The standalone dashboard (dashboard/app.py) calls the data science service
+through the backend's client, so its limiter and circuit breaker apply.
+"""
+import asyncio
+import hashlib
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app.services.analysis_cache import analysis_cache, hash_job_description
+from app.services.ds_client import ds_client
+from app.services.resilience import UpstreamUnavailable
+
+RESULT = {
+    "overall_score": 70.0,
+    "skills_match": {},
+    "experience_match": {},
+    "education_match": {},
+    "recommendations": [],
+}
+
+
+@pytest.fixture
+def dashboard(tmp_path, monkeypatch):
+    import dashboard.app as dashboard_app
+
+    monkeypatch.setattr(dashboard_app, "ANALYSIS_DB_PATH", tmp_path / "analyses.db")
+    monkeypatch.setattr(dashboard_app, "UPLOAD_DIR", tmp_path)
+    with TestClient(dashboard_app.app) as client:
+        yield client
+
+
+def analyze(client, resume=b"%PDF-1.4 dashboard resume"):
+    return client.post(
+        "/analyze",
+        files={"resume": ("resume.pdf", resume, "application/pdf")},
+        data={"job_description": "Python developer"},
+    )
+
+
+def test_analysis_goes_through_the_shared_client(dashboard, monkeypatch):
+    calls = []
+
+    async def request(method, path, endpoint, **kwargs):
+        calls.append((method, path, endpoint))
+        return httpx.Response(200, json=RESULT)
+
+    monkeypatch.setattr(ds_client, "request", request)
+
+    response = analyze(dashboard)
+
+    assert response.status_code == 200, response.text
+    assert response.json()["overall_score"] == 70.0
+    assert calls == [("POST", "/analyze", "analyze")]
+
+
+@pytest.mark.parametrize("message, retry_after, header", [
+    ("Data science service is unavailable", 12.3, "13"),
+    ("Data science service is saturated", 1, "1"),
+])
+def test_unavailable_upstream_is_a_503_with_retry_after(dashboard, monkeypatch, message, retry_after, header):
+    async def request(*args, **kwargs):
+        raise UpstreamUnavailable(message, retry_after=retry_after)
+
+    monkeypatch.setattr(ds_client, "request", request)
+
+    response = analyze(dashboard, resume=f"%PDF-1.4 {message}".encode())
+
+    assert response.status_code == 503
+    assert response.json()["detail"] == message
+    assert response.headers["Retry-After"] == header
+
+
+def test_results_are_shared_with_the_backend_cache(dashboard, monkeypatch):
+    calls = []
+
+    async def request(*args, **kwargs):
+        calls.append(args)
+        return httpx.Response(200, json=RESULT)
+
+    monkeypatch.setattr(ds_client, "request", request)
+    resume = b"%PDF-1.4 cached dashboard resume"
+
+    first = analyze(dashboard, resume)
+    second = analyze(dashboard, resume)
+
+    assert first.status_code == second.status_code == 200
+    assert len(calls) == 1
+    assert second.json()["analysis_id"] != first.json()["analysis_id"]
+    resume_hash = hashlib.sha256(resume).hexdigest()
+    assert asyncio.run(analysis_cache.get(resume_hash, hash_job_description("  Python developer "))) is not None
+
+
+def test_cache_invalidation_requires_auth_and_reaches_every_process(dashboard, sign_up, monkeypatch):
+    async def request(*args, **kwargs):
+        return httpx.Response(200, json=RESULT)
+
+    monkeypatch.setattr(ds_client, "request", request)
+    resume = b"%PDF-1.4 invalidated dashboard resume"
+    analyze(dashboard, resume)
+    resume_hash = hashlib.sha256(resume).hexdigest()
+    generation = analysis_cache._read_generation()
+
+    assert dashboard.delete(f"/analysis-cache?resume_hash={resume_hash}").status_code in (401, 403)
+    response = dashboard.delete(f"/analysis-cache?resume_hash={resume_hash}", headers=sign_up())
+
+    assert response.status_code == 200
+    assert response.json()["removed"] == 1
+    assert analysis_cache._read_generation() == generation + 1
@@ -0,0 +1,99 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.db.session import SessionLocal
+from app.models.models import Candidate, Job
+
+# Far enough ahead that the seeded rows sort before anything other tests create
+TIED_AT = datetime.utcnow() + timedelta(days=3650)
+
+
+def seed_jobs(count):
+    with SessionLocal() as db:
+        jobs = [
+            Job(title=f"Tied {i}", description="Tied", company="Test", location="Remote",
+                created_at=TIED_AT - timedelta(seconds=i // 3))
+            for i in range(count)
+        ]
+        db.add_all(jobs)
+        db.commit()
+        return [job.id for job in jobs]
+
+
+def seed_candidates(job_id, count):
+    with SessionLocal() as db:
+        candidates = [
+            Candidate(name=f"Candidate {i}", email=f"c{i}@example.com", job_id=job_id,
+                      created_at=TIED_AT - timedelta(seconds=i // 3))
+            for i in range(count)
+        ]
+        db.add_all(candidates)
+        db.commit()
+        return [candidate.id for candidate in candidates]
+
+
+def page_through(client, url, key, headers=None, limit=4):
+    seen, cursor = [], None
+    while True:
+        params = {"limit": limit}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get(url, params=params, headers=headers)
+        assert response.status_code == 200, response.text
+        body = response.json()
+        assert len(body[key]) <= limit
+        seen.extend(item["id"] for item in body[key])
+        cursor = body["next_cursor"]
+        if cursor is None:
+            return seen
+
+
+def test_job_pages_have_no_duplicates_or_gaps_across_ties(client):
+    seeded = seed_jobs(10)
+
+    seen = page_through(client, "/api/jobs/", "jobs")
+
+    assert len(seen) == len(set(seen))
+    # Newest first (seeded in threes per second), ties broken by id descending
+    newest_first = sorted(seeded, key=lambda job_id: (seeded.index(job_id) // 3, -job_id))
+    assert seen[:len(seeded)] == newest_first
+
+
+def test_candidate_pages_have_no_duplicates_or_gaps_across_ties(client, sign_up, create_job):
+    headers = sign_up()
+    job_id = create_job(headers)
+    seeded = seed_candidates(job_id, 11)
+
+    seen = page_through(client, f"/api/candidates/?job_id={job_id}", "candidates", headers)
+
+    assert len(seen) == len(set(seen))
+    assert set(seen) == set(seeded)
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "!!!", "eHx5"])
+def test_a_malformed_cursor_is_rejected(client, cursor):
+    response = client.get("/api/jobs/", params={"cursor": cursor})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
+
+
+def test_total_is_counted_where_there_is_no_estimate(client, sign_up, create_job):
+    create_job(sign_up())
+    body = client.get("/api/jobs/", params={"limit": 1}).json()
+    assert body["total_exact"] is True
+    assert body["total"] >= 1
+
+
+def test_total_uses_the_estimate_when_there_is_one(client, monkeypatch):
+    async def estimate(db, stmt):
+        return 12345
+
+    monkeypatch.setattr("app.db.pagination.estimate_count", estimate)
+
+    body = client.get("/api/jobs/", params={"limit": 1}).json()
+    assert (body["total"], body["total_exact"]) == (12345, False)
+
+    body = client.get("/api/jobs/", params={"limit": 1, "exact_total": True}).json()
+    assert body["total_exact"] is True
+    assert body["total"] != 12345
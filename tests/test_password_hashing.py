@@ -0,0 +1,23 @@
+import asyncio
+
+from app.core.password_hashing import PasswordHasher, password_context
+
+
+def test_a_dead_worker_is_replaced_and_the_call_retried():
+    hasher = PasswordHasher(rounds=4, workers=1, max_queued=4)
+
+    async def scenario():
+        await hasher.hash("first")
+        broken = hasher._pool
+        for process in list(broken._processes.values()):
+            process.kill()
+            process.join()
+
+        hashed = await hasher.hash("second")
+        assert password_context(4).verify("second", hashed)
+        assert hasher._pool is not None and hasher._pool is not broken
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        hasher.stop()
@@ -0,0 +1,77 @@
+"""
+SQL statement budgets per request for the authenticated CRUD endpoints.
+
+The budgets (shared with benchmarks/query_count_benchmark.py) must not grow
+with the data, so each job is seeded with enough candidates that a query
+per row would blow them.
+"""
+import pytest
+from sqlalchemy import event
+
+from benchmarks.query_count_benchmark import REQUESTS
+
+CANDIDATES_PER_JOB = 20
+
+
+@pytest.fixture(scope="module")
+def statements():
+    from app.db.session import async_engine
+
+    executed = []
+
+    def count(conn, cursor, statement, *args):
+        executed.append(statement)
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", count)
+    yield executed
+    event.remove(async_engine.sync_engine, "before_cursor_execute", count)
+
+
+@pytest.fixture(scope="module")
+def seeded(client):
+    def sign_up(email):
+        response = client.post("/api/auth/register", json={"email": email, "password": "query-count"})
+        assert response.status_code == 200, response.text
+        return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    def seed(headers):
+        job = {"title": "Engineer", "description": "Python", "company": "Test", "location": "Remote"}
+        job_id = client.post("/api/jobs/", json=job, headers=headers).json()["id"]
+        candidate_ids = [
+            client.post("/api/candidates/", json={
+                "name": f"Candidate {i}", "email": f"candidate{i}@example.com", "job_id": job_id,
+                "skills": [{"name": "Python", "yearsExperience": 3, "context": "", "confidence": 0.9}],
+            }).json()["id"]
+            for i in range(CANDIDATES_PER_JOB)
+        ]
+        return job_id, candidate_ids
+
+    headers = sign_up("query-count-owner@example.com")
+    job_id, candidate_ids = seed(headers)
+    other_job_id, other_candidate_ids = seed(sign_up("query-count-other@example.com"))
+    values = {
+        "job_id": job_id, "candidate_id": candidate_ids[0],
+        "other_job_id": other_job_id, "other_candidate_id": other_candidate_ids[0],
+    }
+    return headers, values
+
+
+# In table order: the last request deletes the candidate the others read
+@pytest.mark.parametrize(
+    "method, path, expected_status, budget",
+    [request[1:] for request in REQUESTS],
+    ids=[request[0] for request in REQUESTS],
+)
+def test_statement_budget(client, seeded, statements, method, path, expected_status, budget):
+    headers, values = seeded
+    job_update = {"title": "Senior Engineer", "description": "Python", "company": "Test", "location": "Remote"}
+
+    statements.clear()
+    response = client.request(
+        method, path.format(**values), headers=headers,
+        json=job_update if method == "PUT" else None
+    )
+
+    assert response.status_code == expected_status, response.text
+    executed = "\n".join(" ".join(statement.split())[:160] for statement in statements)
+    assert len(statements) <= budget, f"{len(statements)} statements, budget {budget}:\n{executed}"
@@ -0,0 +1,79 @@
+import logging
+import uuid
+
+import pytest
+
+from app.config import settings
+
+
+def register(client):
+    email = f"user-{uuid.uuid4().hex[:12]}@example.com"
+    response = client.post("/api/auth/register", json={"email": email, "password": "test-password"})
+    assert response.status_code == 200, response.text
+    return response.json()["refresh_token"]
+
+
+def refresh(client, token):
+    return client.post("/api/auth/refresh-token", headers={"Authorization": f"Bearer {token}"})
+
+
+@pytest.fixture
+def stateless(monkeypatch):
+    monkeypatch.setattr(settings, "REFRESH_TOKEN_STATELESS", True)
+
+
+def test_family_tokens_rotate(client, stateless):
+    token = register(client)
+    for _ in range(3):
+        response = refresh(client, token)
+        assert response.status_code == 200, response.text
+        assert response.json()["refresh_token"] != token
+        token = response.json()["refresh_token"]
+
+
+def test_replaying_a_family_token_revokes_the_family(client, stateless, caplog):
+    first = register(client)
+    second = refresh(client, first).json()["refresh_token"]
+
+    with caplog.at_level(logging.WARNING, logger="app.core.security"):
+        assert refresh(client, first).status_code == 401
+    assert any("reuse detected" in record.getMessage() for record in caplog.records)
+    # The thief and the owner share the family; neither can go on using it
+    assert refresh(client, second).status_code == 401
+
+
+def test_logout_ends_the_family(client, stateless):
+    token = register(client)
+    response = client.post("/api/auth/logout", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200, response.text
+    assert refresh(client, token).status_code == 401
+
+
+def test_stored_tokens_rotate_and_reject_replay(client):
+    first = register(client)
+    response = refresh(client, first)
+    assert response.status_code == 200, response.text
+    second = response.json()["refresh_token"]
+
+    assert refresh(client, first).status_code == 401
+    assert refresh(client, second).status_code == 200
+
+
+def test_logout_revokes_a_stored_token(client):
+    token = register(client)
+    response = client.post("/api/auth/logout", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200, response.text
+    assert refresh(client, token).status_code == 401
+
+
+def test_a_revocation_evicted_from_memory_is_found_in_the_database(client):
+    from app.core.token_revocation import revocation_cache
+
+    first = register(client)
+    assert refresh(client, first).status_code == 200
+    # The Bloom filter still flags it, so the replay falls through to refresh_tokens
+    revocation_cache._recent.clear()
+    checks = revocation_cache.db_checks
+
+    assert refresh(client, first).status_code == 401
+    assert revocation_cache.db_checks == checks + 1
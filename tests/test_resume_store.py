@@ -0,0 +1,74 @@
+"""
+Identical resume content is stored and scanned once, and the blob lives
+until the last upload referencing it is deleted.
+"""
+import uuid
+
+import pytest
+
+from app.api.endpoints import resumes
+from app.db.session import SessionLocal
+from app.models.models import ResumeBlob
+from app.services.resume_store import resume_store
+
+
+@pytest.fixture
+def scans(monkeypatch):
+    calls = []
+    scan = resumes.scan_service.scan
+
+    async def counting_scan(file_path, content_hash, extension):
+        calls.append(content_hash)
+        return await scan(file_path, content_hash, extension)
+
+    monkeypatch.setattr(resumes.scan_service, "scan", counting_scan)
+    return calls
+
+
+def upload(client, headers, content):
+    response = client.post(
+        "/api/resumes/upload-resume",
+        files={"file": ("resume.pdf", content, "application/pdf")},
+        headers=headers
+    )
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def ref_count(sha256):
+    with SessionLocal() as db:
+        blob = db.query(ResumeBlob).filter(ResumeBlob.sha256 == sha256).first()
+        return None if blob is None else blob.ref_count
+
+
+def test_identical_uploads_share_one_scanned_blob(client, sign_up, scans):
+    content = f"%PDF-1.4 dedup {uuid.uuid4()}".encode()
+
+    first = upload(client, sign_up(), content)
+    second = upload(client, sign_up(), content)
+
+    assert first["blob_id"] == second["blob_id"]
+    assert first["file_id"] != second["file_id"]
+    assert (first["duplicate"], second["duplicate"]) == (False, True)
+    assert scans == [first["blob_id"]]
+    assert ref_count(first["blob_id"]) == 2
+    assert resume_store.blob_path(first["blob_id"]).read_bytes() == content
+
+
+def test_the_blob_is_removed_with_its_last_reference(client, sign_up):
+    content = f"%PDF-1.4 release {uuid.uuid4()}".encode()
+    owners = [sign_up(), sign_up()]
+    uploads = [upload(client, headers, content) for headers in owners]
+    sha256 = uploads[0]["blob_id"]
+    path = resume_store.blob_path(sha256)
+
+    response = client.delete(f"/api/resumes/{uploads[0]['file_id']}", headers=owners[1])
+    assert response.status_code == 403
+
+    assert client.delete(f"/api/resumes/{uploads[0]['file_id']}", headers=owners[0]).status_code == 200
+    assert ref_count(sha256) == 1
+    assert path.exists()
+
+    assert client.delete(f"/api/resumes/{uploads[1]['file_id']}", headers=owners[1]).status_code == 200
+    assert ref_count(sha256) is None
+    assert not path.exists()
@@ -0,0 +1,134 @@
+import asyncio
+
+import pytest
+
+from app.services.resume_analysis import ResumeAnalysisService
+from app.services.singleflight import SingleFlight
+
+
+class Upstream:
+    """
+    Counts calls; each one waits until released
+    """
+
+    def __init__(self, result="result"):
+        self.calls = 0
+        self.result = result
+        self.release = asyncio.Event()
+
+    async def __call__(self):
+        self.calls += 1
+        await self.release.wait()
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
+
+def test_concurrent_calls_for_a_key_share_one_call():
+    async def scenario():
+        flights, upstream, other = SingleFlight(), Upstream(), Upstream("other")
+        waiters = [asyncio.create_task(flights.do("key", upstream)) for _ in range(5)]
+        different = asyncio.create_task(flights.do("other", other))
+        await asyncio.sleep(0)
+        upstream.release.set()
+        other.release.set()
+
+        assert await asyncio.gather(*waiters) == ["result"] * 5
+        assert await different == "other"
+        assert (upstream.calls, other.calls) == (1, 1)
+        assert flights.stats() == {"in_flight": 0, "upstream_calls": 2, "coalesced_requests": 4}
+
+        # Finished calls are forgotten: the next caller starts afresh
+        assert await flights.do("key", upstream) == "result"
+        assert upstream.calls == 2
+
+    asyncio.run(scenario())
+
+
+def test_waiters_share_the_exception():
+    async def scenario():
+        flights, upstream = SingleFlight(), Upstream(ValueError("upstream failed"))
+        waiters = [asyncio.create_task(flights.do("key", upstream)) for _ in range(3)]
+        await asyncio.sleep(0)
+        upstream.release.set()
+
+        results = await asyncio.gather(*waiters, return_exceptions=True)
+        assert all(isinstance(result, ValueError) for result in results)
+        assert upstream.calls == 1
+
+    asyncio.run(scenario())
+
+
+def test_a_cancelled_waiter_leaves_the_call_running_for_the_others():
+    async def scenario():
+        flights, upstream = SingleFlight(), Upstream()
+        leaving = asyncio.create_task(flights.do("key", upstream))
+        staying = asyncio.create_task(flights.do("key", upstream))
+        await asyncio.sleep(0)
+
+        leaving.cancel()
+        await asyncio.sleep(0)
+        upstream.release.set()
+
+        assert await staying == "result"
+        assert leaving.cancelled()
+        assert upstream.calls == 1
+
+    asyncio.run(scenario())
+
+
+def test_the_call_is_cancelled_when_every_waiter_leaves():
+    async def scenario():
+        flights, upstream = SingleFlight(), Upstream()
+        waiters = [asyncio.create_task(flights.do("key", upstream)) for _ in range(2)]
+        await asyncio.sleep(0)
+        shared = flights._calls["key"].task
+
+        for waiter in waiters:
+            waiter.cancel()
+        await asyncio.gather(*waiters, return_exceptions=True)
+        await asyncio.sleep(0)
+        assert shared.cancelled()
+
+        # A new caller does not join the abandoned call
+        upstream.release.set()
+        assert await flights.do("key", upstream) == "result"
+        assert upstream.calls == 2
+
+    asyncio.run(scenario())
+
+
+class MemoryCache:
+    def __init__(self):
+        self.entries = {}
+
+    async def get(self, resume_hash, job_description_hash):
+        return self.entries.get((resume_hash, job_description_hash))
+
+    async def put(self, resume_hash, job_description_hash, result):
+        self.entries[(resume_hash, job_description_hash)] = result
+
+
+def test_identical_concurrent_analyses_make_one_upstream_call():
+    async def scenario():
+        service = ResumeAnalysisService(cache=MemoryCache(), flights=SingleFlight())
+        upstream = Upstream({"overall_score": 75.0})
+
+        async def request_analysis(resume_path, job_description):
+            return await upstream()
+
+        service._request_analysis = request_analysis
+        analyses = [
+            asyncio.create_task(service.analyze_resume("resume.pdf", description, resume_hash="abc"))
+            for description in ["Python developer", "  Python \n developer ", "Python developer"]
+        ]
+        await asyncio.sleep(0)
+        upstream.release.set()
+
+        assert await asyncio.gather(*analyses) == [{"overall_score": 75.0}] * 3
+        assert upstream.calls == 1
+        # Answered from the cache afterwards
+        assert await service.analyze_resume("resume.pdf", "Python developer", resume_hash="abc") == {"overall_score": 75.0}
+        assert upstream.calls == 1
+
+    asyncio.run(scenario())
@@ -0,0 +1,82 @@
+"""
+GET /api/candidates/?skill= matches through the candidate_skills index,
+which follows every ORM write to Candidate.skills.
+"""
+from app.db.session import SessionLocal
+from app.models.models import Candidate
+
+
+def skill(name, years, confidence=0.9):
+    return {"name": name, "yearsExperience": years, "context": "work", "confidence": confidence}
+
+
+def add_candidate(client, job_id, name, skills):
+    candidate = {"name": name, "email": f"{name.lower()}@example.com", "job_id": job_id, "skills": skills}
+    response = client.post("/api/candidates/", json=candidate)
+    assert response.status_code == 200, response.text
+    return response.json()["id"]
+
+
+def matching(client, headers, job_id, **filters):
+    response = client.get("/api/candidates/", params={"job_id": job_id, **filters}, headers=headers)
+    assert response.status_code == 200, response.text
+    body = response.json()
+    ids = [candidate["id"] for candidate in body["candidates"]]
+    assert body["total"] == len(ids)
+    return set(ids)
+
+
+def test_skill_filters(client, sign_up, create_job):
+    headers = sign_up()
+    job_id = create_job(headers)
+    senior = add_candidate(client, job_id, "Senior", [skill("Python", 8), skill("SQL", 2, 0.4)])
+    junior = add_candidate(client, job_id, "Junior", [skill("python ", 1, 0.5)])
+    # Listed twice: still one match, judged on the stronger entry
+    twice = add_candidate(client, job_id, "Twice", [skill("Python", 1), skill("PYTHON", 5)])
+    add_candidate(client, job_id, "Other", [skill("Go", 10)])
+
+    assert matching(client, headers, job_id, skill="PyThOn") == {senior, junior, twice}
+    assert matching(client, headers, job_id, skill="python", min_years=5) == {senior, twice}
+    assert matching(client, headers, job_id, skill="python", min_confidence=0.8) == {senior, twice}
+    assert matching(client, headers, job_id, skill="sql", min_confidence=0.5) == set()
+    assert matching(client, headers, job_id, skill="rust") == set()
+
+
+def test_the_index_follows_skill_updates_and_deletes(client, sign_up, create_job):
+    headers = sign_up()
+    job_id = create_job(headers)
+    candidate_id = add_candidate(client, job_id, "Learner", [skill("Go", 1)])
+
+    with SessionLocal() as db:
+        db.get(Candidate, candidate_id).skills = [skill("Rust", 3)]
+        db.commit()
+    assert matching(client, headers, job_id, skill="go") == set()
+    assert matching(client, headers, job_id, skill="rust") == {candidate_id}
+
+    assert client.delete(f"/api/candidates/{candidate_id}", headers=headers).status_code == 200
+    assert matching(client, headers, job_id, skill="rust") == set()
+
+
+def test_skill_filtered_pages_do_not_repeat_candidates(client, sign_up, create_job):
+    headers = sign_up()
+    job_id = create_job(headers)
+    expected = {add_candidate(client, job_id, f"Dev{i}", [skill("Python", i)]) for i in range(7)}
+
+    seen, cursor = [], None
+    while True:
+        params = {"job_id": job_id, "skill": "python", "limit": 3}
+        if cursor:
+            params["cursor"] = cursor
+        body = client.get("/api/candidates/", params=params, headers=headers).json()
+        seen.extend(candidate["id"] for candidate in body["candidates"])
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+    assert len(seen) == len(set(seen))
+    assert set(seen) == expected
+
+
+def test_thresholds_need_a_skill(client, sign_up):
+    headers = sign_up()
+    response = client.get("/api/candidates/", params={"min_years": 3}, headers=headers)
+    assert response.status_code == 400